@@ -1,35 +1,25 @@
 import pandas as pd
-import numpy as np
 from sklearn.svm import SVC
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import make_pipeline
 import os
 import joblib
 
+from carregar_dataset import ler_dataset
+from modelo_predicao import COLUNAS_ATRIBUTOS, carregar_motor
+from motor_linear import exportar_artefato
+
 
 def Modelar_Salvar_SVM():
     """
     Treina o modelo SVM Linear com o dataset de potência e salva em .sav
     """
-    # Carregar dataset
-    colunas = ["potencia", "corrente_max_A", "corrente_min_A", "corrente_media_A"]
-    df = pd.read_csv("dataset.xls", header=None, names=colunas)
-
-    # Adicionar atributos derivados
-    df["amplitude_corrente"] = df["corrente_max_A"] - df["corrente_min_A"]
-    df["razao_max_media"] = df["corrente_max_A"] / (df["corrente_media_A"] + 1e-6)
-
-    # Preparar dados
-    X = df[
-        [
-            "corrente_max_A",
-            "corrente_min_A",
-            "corrente_media_A",
-            "amplitude_corrente",
-            "razao_max_media",
-        ]
-    ]
-    y = df["potencia"]
+    # Carregar dataset (em blocos, float32/int8, atributos derivados no lugar)
+    atributos, rotulos = ler_dataset("dataset.xls")
+
+    # Preparar dados (os nomes das colunas vão para o artefato)
+    X = pd.DataFrame(atributos, columns=list(COLUNAS_ATRIBUTOS))
+    y = rotulos
 
     # Criar e treinar pipeline (StandardScaler + SVM Linear)
     modelo_svm = make_pipeline(
@@ -39,6 +29,12 @@ def Modelar_Salvar_SVM():
 
     # Salvar o modelo treinado em um arquivo .sav
     joblib.dump(modelo_svm, "modelo_svm_potencia.sav")
+
+    # Salvar também o artefato compacto (JSON, sem pickle)
+    exportar_artefato(
+        modelo_svm, "modelo_svm_potencia.json", caminho_dataset="dataset.xls",
+        caminho_sav="modelo_svm_potencia.sav",
+    )
     return ()
 
 
@@ -54,39 +50,20 @@ def CarregarModelo_Predicao(corrente_max, corrente_min, corrente_media):
     Retorna:
         classe: 0 = Baixa Potência, 1 = Alta Potência
     """
-    # Calcular atributos derivados
-    amplitude = corrente_max - corrente_min
-    razao = corrente_max / (corrente_media + 1e-6)
-
-    # Criar array de entrada com os 5 atributos
-    X_test = np.array([[corrente_max, corrente_min, corrente_media, amplitude, razao]])
-
-    # Criar DataFrame com nomes das colunas
-    X_test_df = pd.DataFrame(
-        X_test,
-        columns=[
-            "corrente_max_A",
-            "corrente_min_A",
-            "corrente_media_A",
-            "amplitude_corrente",
-            "razao_max_media",
-        ],
+    classe, _, _ = CarregarModelo_Predicao_Completa(
+        corrente_max, corrente_min, corrente_media
     )
-
-    # Carregar o modelo treinado salvo em arquivo .sav
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    model_path = os.path.join(script_dir, "modelo_svm_potencia.sav")
-    ModeloCarregado = joblib.load(model_path)
-
-    # Fazer predição
-    y_pred = ModeloCarregado.predict(X_test_df)
-    return y_pred[0]
+    return classe
 
 
 def CarregarModelo_Predicao_Completa(corrente_max, corrente_min, corrente_media):
     """
     Carrega o modelo e faz predição retornando classe e probabilidades.
 
+    O modelo é avaliado uma única vez (sem predict + predict_proba
+    separados) e a classe segue as probabilidades: Alta Potência se
+    prob_alta >= prob_baixa.
+
     Parâmetros:
         corrente_max: Corrente máxima (A)
         corrente_min: Corrente mínima (A)
@@ -97,39 +74,14 @@ def CarregarModelo_Predicao_Completa(corrente_max, corrente_min, corrente_media)
         prob_baixa: Probabilidade de Baixa Potência (0-1)
         prob_alta: Probabilidade de Alta Potência (0-1)
     """
-    # Calcular atributos derivados
-    amplitude = corrente_max - corrente_min
-    razao = corrente_max / (corrente_media + 1e-6)
-
-    # Criar array de entrada
-    X_test = np.array([[corrente_max, corrente_min, corrente_media, amplitude, razao]])
-
-    # Criar DataFrame com nomes das colunas
-    X_test_df = pd.DataFrame(
-        X_test,
-        columns=[
-            "corrente_max_A",
-            "corrente_min_A",
-            "corrente_media_A",
-            "amplitude_corrente",
-            "razao_max_media",
-        ],
-    )
-
-    # Carregar o modelo treinado
+    # Carregar o modelo treinado (cache do processo, recarrega se o .sav mudar)
     script_dir = os.path.dirname(os.path.abspath(__file__))
     model_path = os.path.join(script_dir, "modelo_svm_potencia.sav")
-    ModeloCarregado = joblib.load(model_path)
+    motor = carregar_motor(model_path)
 
-    # Fazer predição
-    y_pred = ModeloCarregado.predict(X_test_df)
-    y_proba = ModeloCarregado.predict_proba(X_test_df)
-
-    classe = int(y_pred[0])
-    prob_baixa = float(y_proba[0][0])
-    prob_alta = float(y_proba[0][1])
-
-    return classe, prob_baixa, prob_alta
+    return motor.prever(
+        float(corrente_max), float(corrente_min), float(corrente_media)
+    )
 
 
 # Chamadas das funções para testes:
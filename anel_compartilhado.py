@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Anel (ring buffer) em memória compartilhada entre a aquisição e o preditor.
+
+Mesmo com um processo persistente, trocar cada leitura como texto custa
+formatação e parsing. Aqui o produtor (aquisição) grava registros float64
+(max, min, media) direto em um anel de multiprocessing.shared_memory, e o
+preditor os consome em lotes, gravando (classe, prob_baixa, prob_alta) em
+um segundo anel de resultados, na mesma ordem.
+
+Cada anel tem um único produtor e um único consumidor (SPSC), então não há
+trava: o produtor só escreve `cabeca` e o consumidor só escreve `cauda`.
+Os dados são gravados antes de o índice ser publicado, em chamadas NumPy
+separadas. Python não expõe barreiras de memória, então essa ordem só vale
+para o outro processo em x86/x86-64, onde a CPU não reordena stores entre
+si nem loads entre si. Em outras arquiteturas (ARM, POWER, RISC-V) o
+consumidor poderia ver o índice antes dos dados: lá criar() e anexar()
+recusam o anel (RuntimeError) e a aquisição deve usar o servidor de
+predição ou o modo --stream.
+
+Layout da memória (uma linha de cache de 64 bytes por índice):
+    [0]    cabeca      registros já escritos (uint64)
+    [64]   cauda       registros já consumidos (uint64)
+    [128]  capacidade, largura, encerrado (uint64)
+    [192]  dados       capacidade x largura float64
+
+Uso (demonstração com um produtor Python no lugar do LabVIEW):
+    python3 anel_compartilhado.py [--amostras 200000]
+"""
+
+import argparse
+import platform
+import time
+from multiprocessing import Process, shared_memory
+
+import numpy as np
+
+
+_LINHA_CACHE = 64
+_CABECALHO = 3 * _LINHA_CACHE
+_I_CABECA = 0
+_I_CAUDA = _LINHA_CACHE // 8
+_I_META = 2 * _LINHA_CACHE // 8
+
+# Arquiteturas com ordem total de stores (TSO), nomes de platform.machine()
+_ARQUITETURAS_TSO = ("x86_64", "amd64", "i386", "i486", "i586", "i686", "x86")
+
+
+def _conferir_arquitetura(maquina=None):
+    """
+    Recusa arquiteturas em que a publicação do índice não é segura.
+
+    Raises:
+        RuntimeError: Fora de x86/x86-64
+    """
+    maquina = platform.machine() if maquina is None else maquina
+    if maquina.lower() not in _ARQUITETURAS_TSO:
+        raise RuntimeError(
+            "Anel compartilhado requer x86/x86-64 (ordem de stores preservada); "
+            "arquitetura {!r}: use servidor_predicao.py ou --stream".format(maquina)
+        )
+
+
+class AnelCompartilhado:
+    """
+    Fila circular SPSC de registros float64 em memória compartilhada.
+
+    Use criar() no processo dono e anexar(nome) no outro processo.
+
+    Example:
+        >>> anel = AnelCompartilhado.criar(capacidade=1 << 16, largura=3)
+        >>> anel.escrever([[1.80, -0.03, 0.67]])
+        1
+        >>> outro = AnelCompartilhado.anexar(anel.nome)
+        >>> outro.ler()
+        array([[ 1.8 , -0.03,  0.67]])
+    """
+
+    def __init__(self, memoria, criador=False):
+        self._memoria = memoria
+        self._criador = criador
+
+        cabecalho = np.ndarray(
+            (_CABECALHO // 8,), dtype=np.uint64, buffer=memoria.buf
+        )
+        self._cabeca = cabecalho[_I_CABECA:_I_CABECA + 1]
+        self._cauda = cabecalho[_I_CAUDA:_I_CAUDA + 1]
+        self._meta = cabecalho[_I_META:_I_META + 3]
+
+        self.capacidade = int(self._meta[0])
+        self.largura = int(self._meta[1])
+        self._mascara = self.capacidade - 1
+        self._dados = np.ndarray(
+            (self.capacidade, self.largura),
+            dtype=np.float64,
+            buffer=memoria.buf,
+            offset=_CABECALHO,
+        )
+
+    @classmethod
+    def criar(cls, capacidade=1 << 16, largura=3, nome=None):
+        """
+        Cria um novo anel. O processo criador é responsável por removê-lo.
+
+        Args:
+            capacidade (int): Número de registros (potência de 2)
+            largura (int): Valores float64 por registro
+            nome (str, opcional): Nome do bloco de memória compartilhada
+
+        Raises:
+            ValueError: Se a capacidade não for potência de 2
+            RuntimeError: Fora de x86/x86-64 (ver docstring do módulo)
+        """
+        _conferir_arquitetura()
+        if capacidade < 1 or capacidade & (capacidade - 1):
+            raise ValueError("capacidade deve ser potência de 2")
+
+        memoria = shared_memory.SharedMemory(
+            name=nome, create=True, size=_CABECALHO + capacidade * largura * 8
+        )
+        cabecalho = np.ndarray(
+            (_CABECALHO // 8,), dtype=np.uint64, buffer=memoria.buf
+        )
+        cabecalho[:] = 0
+        cabecalho[_I_META] = capacidade
+        cabecalho[_I_META + 1] = largura
+        del cabecalho
+
+        return cls(memoria, criador=True)
+
+    @classmethod
+    def anexar(cls, nome):
+        """
+        Abre, em outro processo, um anel já criado.
+
+        Raises:
+            RuntimeError: Fora de x86/x86-64 (ver docstring do módulo)
+        """
+        _conferir_arquitetura()
+        try:
+            memoria = shared_memory.SharedMemory(name=nome, track=False)
+        except TypeError:  # Python < 3.13 não tem o parâmetro track
+            memoria = shared_memory.SharedMemory(name=nome)
+        return cls(memoria)
+
+    @property
+    def nome(self):
+        """Nome do bloco de memória compartilhada (para anexar())."""
+        return self._memoria.name
+
+    def disponiveis(self):
+        """Registros escritos e ainda não consumidos."""
+        return int(self._cabeca[0]) - int(self._cauda[0])
+
+    def livres(self):
+        """Espaço livre, em registros."""
+        return self.capacidade - self.disponiveis()
+
+    # ------------------------------------------------------------------
+    # Lado do produtor
+    # ------------------------------------------------------------------
+
+    def escrever(self, registros):
+        """
+        Copia registros para o anel, sem bloquear.
+
+        Args:
+            registros (array-like): Matriz (N x largura)
+
+        Returns:
+            int: Quantos registros couberam (pode ser menor que N)
+        """
+        registros = np.asarray(registros, dtype=np.float64).reshape(-1, self.largura)
+
+        cabeca = int(self._cabeca[0])
+        n = min(len(registros), self.capacidade - (cabeca - int(self._cauda[0])))
+        if n <= 0:
+            return 0
+
+        inicio = cabeca & self._mascara
+        primeiro = min(n, self.capacidade - inicio)
+        self._dados[inicio:inicio + primeiro] = registros[:primeiro]
+        if n > primeiro:
+            self._dados[:n - primeiro] = registros[primeiro:n]
+
+        # Publicar só depois que os dados estão no lugar
+        self._cabeca[0] = cabeca + n
+        return n
+
+    def encerrar(self):
+        """Sinaliza ao consumidor que não haverá mais registros."""
+        self._meta[2] = 1
+
+    @property
+    def encerrado(self):
+        """True se o produtor chamou encerrar()."""
+        return bool(self._meta[2])
+
+    # ------------------------------------------------------------------
+    # Lado do consumidor
+    # ------------------------------------------------------------------
+
+    def espiar(self, maximo=None):
+        """
+        Visões (sem cópia) dos registros disponíveis.
+
+        Os registros continuam reservados até liberar() ser chamado.
+
+        Args:
+            maximo (int, opcional): Limite de registros
+
+        Returns:
+            list: Até dois blocos (N_i x largura), em ordem; vazia se não
+                houver registros
+        """
+        cauda = int(self._cauda[0])
+        n = int(self._cabeca[0]) - cauda
+        if maximo is not None:
+            n = min(n, maximo)
+        if n <= 0:
+            return []
+
+        inicio = cauda & self._mascara
+        primeiro = min(n, self.capacidade - inicio)
+        blocos = [self._dados[inicio:inicio + primeiro]]
+        if n > primeiro:
+            blocos.append(self._dados[:n - primeiro])
+        return blocos
+
+    def liberar(self, n):
+        """Devolve ao produtor o espaço de n registros já processados."""
+        self._cauda[0] = int(self._cauda[0]) + n
+
+    def ler(self, maximo=None):
+        """
+        Copia e consome os registros disponíveis.
+
+        Returns:
+            numpy.ndarray: Matriz (N x largura), possivelmente vazia
+        """
+        blocos = self.espiar(maximo)
+        if not blocos:
+            return np.empty((0, self.largura), dtype=np.float64)
+
+        registros = np.concatenate(blocos)
+        self.liberar(len(registros))
+        return registros
+
+    def fechar(self):
+        """Desanexa o anel; no processo criador, também o remove."""
+        self._cabeca = self._cauda = self._meta = self._dados = None
+        self._memoria.close()
+        if self._criador:
+            self._memoria.unlink()
+
+
+def _prever_por_leitura(motor, bloco):
+    """Lote com leituras recusadas (NaN/inf): essas saem como (-1, NaN, NaN)."""
+    resultados = np.full((len(bloco), 3), np.nan)
+    resultados[:, 0] = -1
+    for i, leitura in enumerate(bloco.tolist()):
+        try:
+            resultados[i] = motor.prever(*leitura)
+        except ValueError:
+            pass
+    return resultados
+
+
+def servir_anel(entrada, saida, motor=None, lote_maximo=4096, espera=50e-6):
+    """
+    Laço do preditor: consome leituras em lotes e publica os resultados.
+
+    Termina quando o produtor encerra o anel de entrada e todos os
+    registros foram processados; então encerra o anel de saída.
+
+    Args:
+        entrada (AnelCompartilhado): Leituras (max, min, media)
+        saida (AnelCompartilhado): Resultados (classe, prob_baixa, prob_alta);
+            leituras recusadas pelo motor (NaN/inf) saem como (-1, NaN, NaN)
+        motor (ModeloLinear, opcional): Padrão: modelo_predicao.carregar_motor()
+        lote_maximo (int): Máximo de registros por lote
+        espera (float): Pausa (s) quando não há o que fazer
+
+    Returns:
+        int: Total de registros processados
+    """
+    if motor is None:
+        import modelo_predicao as mp
+
+        motor = mp.carregar_motor()
+
+    total = 0
+    while True:
+        limite = min(lote_maximo, saida.livres())
+        if limite == 0:
+            time.sleep(espera)
+            continue
+
+        blocos = entrada.espiar(limite)
+        if not blocos:
+            # encerrado é lido antes: se for True, tudo já foi publicado
+            if entrada.encerrado and entrada.disponiveis() == 0:
+                break
+            time.sleep(espera)
+            continue
+
+        for bloco in blocos:
+            try:
+                classes, prob_baixa, prob_alta = motor.prever_lote(
+                    bloco[:, 0], bloco[:, 1], bloco[:, 2]
+                )
+                resultados = np.column_stack((classes, prob_baixa, prob_alta))
+            except ValueError:
+                resultados = _prever_por_leitura(motor, bloco)
+            saida.escrever(resultados)
+            entrada.liberar(len(bloco))
+            total += len(bloco)
+
+    saida.encerrar()
+    return total
+
+
+def _processo_preditor(nome_entrada, nome_saida):
+    """Ponto de entrada do processo preditor (anexa os anéis por nome)."""
+    entrada = AnelCompartilhado.anexar(nome_entrada)
+    saida = AnelCompartilhado.anexar(nome_saida)
+    try:
+        servir_anel(entrada, saida)
+    finally:
+        entrada.fechar()
+        saida.fechar()
+
+
+def iniciar_preditor(entrada, saida):
+    """
+    Inicia o preditor em um processo separado.
+
+    Returns:
+        multiprocessing.Process: Processo já iniciado
+    """
+    processo = Process(
+        target=_processo_preditor, args=(entrada.nome, saida.nome), daemon=True
+    )
+    processo.start()
+    return processo
+
+
+def produzir_e_coletar(leituras, entrada, saida, processo=None, bloco=1024,
+                       espera=50e-6):
+    """
+    Produtor de referência (no lugar do LabVIEW): envia as leituras em
+    blocos e coleta todos os resultados.
+
+    Args:
+        leituras (numpy.ndarray): Matriz (N x 3) de (max, min, media)
+        entrada (AnelCompartilhado): Anel de leituras
+        saida (AnelCompartilhado): Anel de resultados
+        processo (multiprocessing.Process, opcional): Preditor; se ele morrer
+            antes de publicar tudo, a coleta é interrompida em vez de esperar
+            para sempre
+        bloco (int): Leituras enviadas por vez
+        espera (float): Pausa (s) quando nenhum dos anéis anda
+
+    Returns:
+        numpy.ndarray: Resultados (N x 3) na ordem das leituras
+
+    Raises:
+        RuntimeError: Se o processo preditor terminou com resultados pendentes
+    """
+    resultados = np.empty((len(leituras), 3), dtype=np.float64)
+    enviados = recebidos = 0
+
+    while recebidos < len(leituras):
+        escritos = 0
+        if enviados < len(leituras):
+            escritos = entrada.escrever(leituras[enviados:enviados + bloco])
+            enviados += escritos
+            if enviados == len(leituras):
+                entrada.encerrar()
+
+        prontos = saida.ler()
+        if len(prontos) == 0:
+            # is_alive() antes de reler: o que foi publicado antes da morte
+            # ainda é coletado
+            if processo is not None and not processo.is_alive():
+                prontos = saida.ler()
+                if len(prontos) == 0:
+                    processo.join()
+                    raise RuntimeError(
+                        "Preditor terminou (exitcode={}) com {} de {} "
+                        "resultados recebidos".format(
+                            processo.exitcode, recebidos, len(leituras))
+                    )
+            elif escritos == 0:
+                time.sleep(espera)
+                continue
+        resultados[recebidos:recebidos + len(prontos)] = prontos
+        recebidos += len(prontos)
+
+    return resultados
+
+
+def main():
+    """Demonstração: produtor Python + preditor em outro processo."""
+    parser = argparse.ArgumentParser(description="Anel de memória compartilhada")
+    parser.add_argument("--amostras", type=int, default=200000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    leituras = np.column_stack((
+        rng.uniform(1.0, 11.0, args.amostras),
+        rng.uniform(-0.35, 0.05, args.amostras),
+        rng.uniform(0.45, 0.67, args.amostras),
+    ))
+
+    entrada = AnelCompartilhado.criar(largura=3)
+    saida = AnelCompartilhado.criar(largura=3)
+    try:
+        processo = iniciar_preditor(entrada, saida)
+
+        inicio = time.perf_counter()
+        resultados = produzir_e_coletar(leituras, entrada, saida, processo)
+        duracao = time.perf_counter() - inicio
+        processo.join()
+
+        print("Leituras processadas: {}".format(len(resultados)))
+        print("Vazão: {:.0f} leituras/s".format(len(resultados) / duracao))
+        print("Alta Potência: {:.1%}".format(resultados[:, 0].mean()))
+    finally:
+        entrada.fechar()
+        saida.fechar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de todos os caminhos de inferência do projeto.
+
+Mede latência (média, p50, p95, p99, máx.) das chamadas unitárias e vazão
+(leituras/s) dos caminhos em lote, incluindo a inicialização a frio das
+CLIs, o servidor persistente (também com clientes simultâneos), o modo
+--stream e o anel de memória compartilhada. O resultado é gravado em JSON,
+com metadados da máquina e do commit, para comparar máquinas e versões.
+
+Uso (a partir da raiz do repositório):
+    python3 benchmarks/medir_inferencia.py
+    python3 benchmarks/medir_inferencia.py --rapido --saida resultado.json
+    python3 benchmarks/medir_inferencia.py --casos prever,prever_lote
+    python3 benchmarks/medir_inferencia.py --listar
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import numpy as np  # noqa: E402
+
+import modelo_predicao as mp  # noqa: E402
+
+
+# Leituras de referência (uma Alta e uma Baixa)
+LEITURA_ALTA = (1.80, -0.03, 0.67)
+LEITURA_BAIXA = (1.13, -0.01, 0.47)
+
+# Casos registrados: nome -> função(config) -> dict
+CASOS = {}
+
+
+def caso(nome):
+    """Registra uma função de benchmark sob `nome`."""
+    def registrar(funcao):
+        CASOS[nome] = funcao
+        return funcao
+    return registrar
+
+
+# ==============================================================================
+# MEDIÇÃO
+# ==============================================================================
+
+
+def resumir_latencias(tempos_ns):
+    """Estatísticas de uma lista de latências em nanossegundos (saída em µs)."""
+    tempos = np.asarray(tempos_ns, dtype=np.float64) / 1000.0
+    p50, p95, p99 = np.percentile(tempos, [50, 95, 99])
+    return {
+        "n": int(tempos.size),
+        "media_us": float(tempos.mean()),
+        "p50_us": float(p50),
+        "p95_us": float(p95),
+        "p99_us": float(p99),
+        "max_us": float(tempos.max()),
+        "chamadas_por_s": float(1e6 / tempos.mean()),
+    }
+
+
+def medir_latencia(funcao, repeticoes, aquecimento=None):
+    """Chama `funcao()` repetidamente e resume a latência de cada chamada."""
+    relogio = time.perf_counter_ns
+    for _ in range(aquecimento if aquecimento is not None else max(repeticoes // 10, 1)):
+        funcao()
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = relogio()
+        funcao()
+        tempos.append(relogio() - inicio)
+    return resumir_latencias(tempos)
+
+
+def medir_vazao(funcao, itens, repeticoes=3):
+    """Executa `funcao()` (que processa `itens` leituras) e guarda a melhor vazão."""
+    funcao()
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return {"itens": itens, "melhor_s": melhor, "itens_por_s": itens / melhor}
+
+
+def leituras_aleatorias(n, semente=0):
+    """Leituras sintéticas dentro da faixa do dataset (N x 3)."""
+    rng = np.random.default_rng(semente)
+    return np.column_stack((
+        rng.uniform(1.0, 11.0, n),
+        rng.uniform(-0.35, 0.05, n),
+        rng.uniform(0.45, 0.67, n),
+    ))
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ==============================================================================
+# CASOS: CHAMADAS NO PROCESSO
+# ==============================================================================
+
+
+@caso("prever")
+def _bench_prever(config):
+    return medir_latencia(lambda: mp.prever(*LEITURA_ALTA), config["repeticoes"])
+
+
+@caso("prever_com_metricas")
+def _bench_prever_metricas(config):
+    mp.zerar_metricas()
+    mp.ativar_metricas()
+    try:
+        resultado = medir_latencia(
+            lambda: mp.prever(*LEITURA_ALTA), config["repeticoes"]
+        )
+        resultado["etapas"] = mp.metricas()
+    finally:
+        mp.ativar_metricas(False)
+    return resultado
+
+
+@caso("prever_memoizado")
+def _bench_prever_memoizado(config):
+    # Linha em regime: poucas leituras distintas (2 casas) que se repetem
+    pool = np.round(leituras_aleatorias(50), 2).tolist()
+    proxima = iter(pool * (config["repeticoes"] // len(pool) + 2)).__next__
+
+    mp.ativar_memoizacao()
+    try:
+        resultado = medir_latencia(lambda: mp.prever(*proxima()), config["repeticoes"])
+        resultado["memoizacao"] = mp.estatisticas_memoizacao()
+    finally:
+        mp.desativar_memoizacao()
+    return resultado
+
+
+@caso("prever_tabela")
+def _bench_prever_tabela(config):
+    if not os.path.exists(os.path.join(RAIZ, mp.CAMINHO_TABELA)):
+        return {"ignorado": "tabela não gerada (gerar_tabela_decisao.py)"}
+
+    tabela = mp.carregar_tabela()
+    resultado = medir_latencia(
+        lambda: mp.prever_tabela(*LEITURA_ALTA), config["repeticoes"]
+    )
+    resultado["consulta_direta"] = medir_latencia(
+        lambda: tabela.prever(*LEITURA_ALTA), config["repeticoes"]
+    )
+
+    lote = {}
+    for n in config["tamanhos_lote"]:
+        leituras = np.round(leituras_aleatorias(n), 2)
+        lote[str(n)] = medir_vazao(
+            lambda: tabela.prever_lote(leituras[:, 0], leituras[:, 1], leituras[:, 2]), n
+        )
+    resultado["lote"] = lote
+    return resultado
+
+
+@caso("prever_detalhado")
+def _bench_prever_detalhado(config):
+    return medir_latencia(
+        lambda: mp.prever_detalhado(*LEITURA_ALTA), config["repeticoes"]
+    )
+
+
+@caso("motor_linear.prever")
+def _bench_motor_prever(config):
+    motor = mp.carregar_motor()
+    return medir_latencia(lambda: motor.prever(*LEITURA_ALTA), config["repeticoes"])
+
+
+@caso("preditor_unitario")
+def _bench_preditor_unitario(config):
+    # Buffers pré-alocados: compare o p99 com o do caso "prever"
+    preditor = mp.criar_preditor()
+    return medir_latencia(lambda: preditor.prever(*LEITURA_ALTA), config["repeticoes"])
+
+
+@caso("pipeline_sklearn")
+def _bench_pipeline(config):
+    import pandas as pd
+
+    modelo = mp.carregar_modelo()
+    entrada = pd.DataFrame(
+        mp.calcular_atributos(*[[v] for v in LEITURA_ALTA]),
+        columns=mp.COLUNAS_ATRIBUTOS,
+    )
+
+    def chamar():
+        modelo.predict(entrada)
+        modelo.predict_proba(entrada)
+
+    return medir_latencia(chamar, max(config["repeticoes"] // 10, 20))
+
+
+@caso("CarregarModelo_Predicao_Completa")
+def _bench_integracao(config):
+    import Integracao_Modelo_Potencia as integracao
+
+    return medir_latencia(
+        lambda: integracao.CarregarModelo_Predicao_Completa(*LEITURA_ALTA),
+        max(config["repeticoes"] // 10, 20),
+    )
+
+
+@caso("prever_lote")
+def _bench_prever_lote(config):
+    resultados = {}
+    for n in config["tamanhos_lote"]:
+        leituras = leituras_aleatorias(n)
+        resultados[str(n)] = medir_vazao(
+            lambda: mp.prever_lote(leituras[:, 0], leituras[:, 1], leituras[:, 2]), n
+        )
+    return resultados
+
+
+@caso("janelas_corrente")
+def _bench_janelas(config):
+    import janelas_corrente as jc
+
+    amostras_por_janela = 1000
+    n_janelas = config["tamanhos_lote"][-1] // 100
+    bloco = np.random.default_rng(0).normal(
+        0.6, 0.2, n_janelas * amostras_por_janela
+    ).astype(np.float32)
+    return medir_vazao(
+        lambda: jc.prever_janelas(bloco, tamanho_janela=amostras_por_janela),
+        n_janelas,
+    )
+
+
+@caso("motor_canais")
+def _bench_motor_canais(config):
+    from motor_canais import MotorCanais
+
+    resultados = {}
+    for n_canais in (16, 64, 256):
+        leituras = leituras_aleatorias(n_canais)
+        canais = MotorCanais(n_canais)
+        por_canal = leituras.tolist()
+
+        def um_prever_por_canal():
+            for leitura in por_canal:
+                mp.prever(*leitura)
+
+        repeticoes = max(config["repeticoes"] // 10, 20)
+        resultados[str(n_canais)] = {
+            "atualizar": medir_latencia(lambda: canais.atualizar(leituras), repeticoes),
+            "prever_por_canal": medir_latencia(um_prever_por_canal, repeticoes),
+        }
+
+    # Vários ciclos por chamada: o custo fixo do motor se dilui
+    ciclos = 100
+    bloco = leituras_aleatorias(ciclos * 64).reshape(ciclos, 64, 3)
+    canais = MotorCanais(64)
+    resultados["bloco_100x64"] = medir_vazao(lambda: canais.atualizar_bloco(bloco), ciclos * 64)
+    return resultados
+
+
+# ==============================================================================
+# CASOS: PROCESSOS E COMUNICAÇÃO
+# ==============================================================================
+
+
+@caso("cli_inicializacao")
+def _bench_cli(config):
+    resultados = {}
+    for script in ["predicao_labview.py", "modelo_predicao.py", "usar_modelo.py"]:
+        comando = [sys.executable, script] + [str(v) for v in LEITURA_ALTA]
+        resultados[script] = medir_latencia(
+            lambda: subprocess.run(comando, cwd=RAIZ, capture_output=True, check=True),
+            config["repeticoes_cli"],
+            aquecimento=1,
+        )
+    return resultados
+
+
+def _vazao_concorrente(porta, clientes, repeticoes):
+    """Vazão total com `clientes` conexões consultando ao mesmo tempo."""
+    import threading
+
+    from cliente_predicao import ClientePredicao
+
+    conexoes = [ClientePredicao(porta=porta) for _ in range(clientes)]
+    largada = threading.Barrier(clientes + 1)
+
+    def consultar(cliente):
+        largada.wait()
+        for _ in range(repeticoes):
+            cliente.prever(*LEITURA_ALTA)
+
+    threads = [threading.Thread(target=consultar, args=(c,)) for c in conexoes]
+    for t in threads:
+        t.start()
+    largada.wait()
+    inicio = time.perf_counter()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - inicio
+
+    for c in conexoes:
+        c.fechar()
+    return {"itens": clientes * repeticoes, "itens_por_s": clientes * repeticoes / duracao}
+
+
+@caso("servidor_predicao")
+def _bench_servidor(config):
+    from cliente_predicao import ClientePredicao
+
+    porta = _porta_livre()
+    servidor = subprocess.Popen(
+        [sys.executable, "servidor_predicao.py", "--porta", str(porta)],
+        cwd=RAIZ,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        servidor.stdout.readline()  # "Servidor de predição em ..."
+        with ClientePredicao(porta=porta) as cliente:
+            resultado = medir_latencia(
+                lambda: cliente.prever(*LEITURA_ALTA), config["repeticoes"]
+            )
+
+        resultado["concorrencia"] = {
+            str(n): _vazao_concorrente(porta, n, config["repeticoes"])
+            for n in (1, 4, 16)
+        }
+        with ClientePredicao(porta=porta) as cliente:
+            resultado["agrupamento"] = json.loads(cliente.consultar_estatisticas())
+
+        comando = [sys.executable, "cliente_predicao.py"] + [str(v) for v in LEITURA_ALTA]
+        ambiente = dict(os.environ, PREDICAO_PORTA=str(porta))
+        resultado["cliente_cli"] = medir_latencia(
+            lambda: subprocess.run(comando, cwd=RAIZ, env=ambiente, capture_output=True),
+            config["repeticoes_cli"],
+            aquecimento=1,
+        )
+        return resultado
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+@caso("stream")
+def _bench_stream(config):
+    processo = subprocess.Popen(
+        [sys.executable, "modelo_predicao.py", "--stream"],
+        cwd=RAIZ,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    )
+    linha = "{},{},{}\n".format(*LEITURA_ALTA)
+
+    def ida_e_volta():
+        processo.stdin.write(linha)
+        processo.stdin.flush()
+        processo.stdout.readline()
+
+    try:
+        resultado = medir_latencia(ida_e_volta, config["repeticoes"])
+    finally:
+        processo.stdin.close()
+        processo.wait()
+
+    # Vazão com um log inteiro redirecionado
+    n = config["tamanhos_lote"][-1]
+    texto = "\n".join(
+        "{:.2f},{:.2f},{:.2f}".format(*r) for r in leituras_aleatorias(n)
+    ) + "\n"
+    inicio = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "modelo_predicao.py", "--stream"],
+        cwd=RAIZ,
+        input=texto,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    duracao = time.perf_counter() - inicio
+    resultado["vazao_log"] = {"itens": n, "melhor_s": duracao, "itens_por_s": n / duracao}
+    return resultado
+
+
+@caso("anel_compartilhado")
+def _bench_anel(config):
+    from anel_compartilhado import (
+        AnelCompartilhado, iniciar_preditor, produzir_e_coletar,
+    )
+
+    n = config["tamanhos_lote"][-1]
+    leituras = leituras_aleatorias(n)
+    entrada = AnelCompartilhado.criar()
+    saida = AnelCompartilhado.criar()
+    try:
+        processo = iniciar_preditor(entrada, saida)
+        inicio = time.perf_counter()
+        produzir_e_coletar(leituras, entrada, saida, processo)
+        duracao = time.perf_counter() - inicio
+        processo.join()
+    finally:
+        entrada.fechar()
+        saida.fechar()
+    return {"itens": n, "melhor_s": duracao, "itens_por_s": n / duracao}
+
+
+# ==============================================================================
+# EXECUÇÃO
+# ==============================================================================
+
+
+def metadados():
+    """Informações da máquina, das bibliotecas e do commit."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=RAIZ, capture_output=True, text=True,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    versoes = {"numpy": np.__version__}
+    for modulo in ["sklearn", "pandas"]:
+        try:
+            versoes[modulo] = __import__(modulo).__version__
+        except ImportError:
+            versoes[modulo] = None
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "host": platform.node(),
+        "plataforma": platform.platform(),
+        "processador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "bibliotecas": versoes,
+    }
+
+
+def main():
+    """Executa os casos selecionados e grava o JSON de resultados."""
+    parser = argparse.ArgumentParser(description="Benchmarks de inferência")
+    parser.add_argument("--saida", default="resultado_benchmark.json",
+                        help="Arquivo JSON de saída")
+    parser.add_argument("--casos", help="Lista separada por vírgulas (padrão: todos)")
+    parser.add_argument("--rapido", action="store_true",
+                        help="Menos repetições (verificação rápida)")
+    parser.add_argument("--listar", action="store_true", help="Lista os casos")
+    args = parser.parse_args()
+
+    if args.listar:
+        print("\n".join(CASOS))
+        return
+
+    config = {
+        "repeticoes": 200 if args.rapido else 2000,
+        "repeticoes_cli": 3 if args.rapido else 15,
+        "tamanhos_lote": [1000, 100000] if args.rapido else [1000, 100000, 1000000],
+    }
+
+    nomes = args.casos.split(",") if args.casos else list(CASOS)
+    desconhecidos = [n for n in nomes if n not in CASOS]
+    if desconhecidos:
+        parser.error("casos desconhecidos: {}".format(", ".join(desconhecidos)))
+
+    caminho = os.path.abspath(args.saida)
+    os.chdir(RAIZ)
+    resultados = {}
+    for nome in nomes:
+        print("[{}] ...".format(nome), end=" ", flush=True)
+        try:
+            resultados[nome] = CASOS[nome](config)
+            print("ok")
+        except Exception as e:
+            resultados[nome] = {"erro": "{}: {}".format(type(e).__name__, e)}
+            print("ERRO: {}".format(e))
+
+    saida = {"metadados": metadados(), "config": config, "resultados": resultados}
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(saida, arquivo, indent=2, ensure_ascii=False)
+        arquivo.write("\n")
+    print("\nResultados gravados em {}".format(caminho))
+
+
+if __name__ == "__main__":
+    main()
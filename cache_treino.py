@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache em disco das etapas do treino, endereçado por conteúdo.
+
+Cada entrada é uma pasta em .cache_treino/ cujo nome vem de um hash das
+entradas da etapa: o SHA-256 do dataset (não o mtime), os
+hiperparâmetros e as versões das bibliotecas. Se nada mudou, a chave é a
+mesma e o resultado é reaproveitado; qualquer mudança gera outra chave.
+
+    atributos-<hash>  X.npy / y.npy (abertos com mmap)
+    dobras-<hash>     atribuição das dobras da CV
+    cv-<hash>         scores de um candidato
+    modelo-<hash>     pipeline ajustado, artefato JSON e resumo
+
+As entradas são gravadas em uma pasta temporária e renomeadas (nunca
+ficam pela metade). O tamanho total é limitado: ao gravar, as entradas
+usadas há mais tempo são removidas (LRU pelo mtime da pasta, renovado a
+cada acerto).
+
+Exemplo:
+    >>> cache = CacheTreino(".cache_treino", limite_mb=1024)
+    >>> chave = cache.chave("cv", dataset=sha, candidato=c, versoes=versoes_bibliotecas())
+    >>> entrada = cache.abrir(chave)          # pasta ou None
+    >>> with cache.gravar(chave) as pasta:    # preencher a pasta
+    ...     ...
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+PASTA_CACHE = ".cache_treino"
+LIMITE_MB = 1024
+_ARQUIVO_HASHES = "hashes.json"
+
+# Bibliotecas cujas versões entram nas chaves (mudam números ou o pickle)
+BIBLIOTECAS = ("numpy", "scipy", "scikit-learn", "pandas", "joblib")
+
+
+def versoes_bibliotecas():
+    """Versões do Python e das bibliotecas do treino, sem importá-las."""
+    from importlib import metadata
+
+    versoes = {"python": platform.python_version()}
+    for nome in BIBLIOTECAS:
+        try:
+            versoes[nome] = metadata.version(nome)
+        except metadata.PackageNotFoundError:
+            versoes[nome] = None
+    return versoes
+
+
+def _tamanho_pasta(pasta):
+    total = 0
+    for raiz, _, arquivos in os.walk(pasta):
+        for nome in arquivos:
+            try:
+                total += os.path.getsize(os.path.join(raiz, nome))
+            except OSError:
+                pass
+    return total
+
+
+class CacheTreino:
+    """
+    Pasta de entradas endereçadas por hash, com limite de tamanho.
+
+    Args:
+        pasta (str): Raiz do cache
+        limite_mb (float): Tamanho máximo somado das entradas
+    """
+
+    def __init__(self, pasta=PASTA_CACHE, limite_mb=LIMITE_MB):
+        self.pasta = pasta
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        os.makedirs(pasta, exist_ok=True)
+
+    @staticmethod
+    def chave(etapa, **partes):
+        """
+        Chave de uma entrada: etapa + hash do JSON canônico das partes.
+
+        Returns:
+            str: p. ex. 'cv-3f1a…' (nome da pasta da entrada)
+        """
+        texto = json.dumps(partes, sort_keys=True, separators=(",", ":"), default=str)
+        return "{}-{}".format(etapa, hashlib.sha256(texto.encode("utf-8")).hexdigest()[:32])
+
+    def abrir(self, chave):
+        """
+        Pasta da entrada, ou None se ela não existir.
+
+        Um acerto renova o mtime da pasta (ordem do despejo LRU).
+        """
+        entrada = os.path.join(self.pasta, chave)
+        if not os.path.isdir(entrada):
+            return None
+        try:
+            os.utime(entrada)
+        except OSError:
+            pass
+        return entrada
+
+    @contextmanager
+    def gravar(self, chave):
+        """
+        Cria uma entrada de forma atômica.
+
+        O bloco preenche a pasta temporária entregue; ao sair sem erro ela
+        vira a entrada e o despejo é aplicado. Com erro, é descartada.
+
+        Yields:
+            str: Pasta temporária a preencher
+        """
+        temporaria = tempfile.mkdtemp(prefix=".tmp-", dir=self.pasta)
+        try:
+            yield temporaria
+            destino = os.path.join(self.pasta, chave)
+            try:
+                os.rename(temporaria, destino)
+            except OSError:
+                # Outra execução gravou a mesma chave antes: vale a dela
+                shutil.rmtree(temporaria, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(temporaria, ignore_errors=True)
+            raise
+        self.despejar(manter=chave)
+
+    def entradas(self):
+        """Entradas existentes: lista de (mtime, bytes, nome)."""
+        lista = []
+        for nome in os.listdir(self.pasta):
+            caminho = os.path.join(self.pasta, nome)
+            if nome.startswith(".") or not os.path.isdir(caminho):
+                continue
+            try:
+                lista.append((os.stat(caminho).st_mtime, _tamanho_pasta(caminho), nome))
+            except OSError:
+                pass
+        return lista
+
+    def despejar(self, manter=None):
+        """
+        Remove as entradas menos recentes até caber no limite.
+
+        Args:
+            manter (str, opcional): Entrada que não pode sair (a recém-gravada)
+
+        Returns:
+            list: Nomes das entradas removidas
+        """
+        entradas = sorted(self.entradas())
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        removidas = []
+        for _, tamanho, nome in entradas:
+            if total <= self.limite_bytes:
+                break
+            if nome == manter:
+                continue
+            shutil.rmtree(os.path.join(self.pasta, nome), ignore_errors=True)
+            total -= tamanho
+            removidas.append(nome)
+        return removidas
+
+    def hash_dataset(self, caminho):
+        """
+        SHA-256 do conteúdo do dataset.
+
+        O hash fica memorizado por (caminho, tamanho, mtime): um arquivo
+        intocado não é relido. Se o mtime mudar, o conteúdo é hasheado de
+        novo, e um arquivo regravado com o mesmo conteúdo mantém a chave.
+        """
+        from motor_linear import sha256_arquivo
+
+        info = os.stat(caminho)
+        assinatura = [os.path.abspath(caminho), info.st_size, info.st_mtime_ns]
+        arquivo_hashes = os.path.join(self.pasta, _ARQUIVO_HASHES)
+        try:
+            with open(arquivo_hashes, "r", encoding="utf-8") as arquivo:
+                memo = json.load(arquivo)
+        except (OSError, ValueError):
+            memo = {}
+
+        registro = memo.get(assinatura[0])
+        if registro and registro[:2] == assinatura[1:]:
+            return registro[2]
+
+        sha256 = sha256_arquivo(caminho)
+        memo[assinatura[0]] = assinatura[1:] + [sha256]
+        temporario = arquivo_hashes + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(memo, arquivo)
+        os.replace(temporario, arquivo_hashes)
+        return sha256
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Leitura do dataset rotulado em blocos, com tipos explícitos.
+
+O dataset (CSV sem cabeçalho: potencia, corrente_max_A, corrente_min_A,
+corrente_media_A) é lido em blocos de tamanho fixo direto para arrays
+pré-alocados:
+
+    X (N x 5, float32)  atributos na ordem do pipeline; amplitude_corrente
+                        e razao_max_media calculados no lugar, por bloco
+    y (N,  int8)        rótulos
+
+Sem colunas object/float64 nem cópias do DataFrame inteiro: o pico de
+memória é o tamanho final (21 bytes por linha) mais um bloco. Com cache,
+X e y vão para .npy que as execuções seguintes abrem com np.load(...,
+mmap_mode="r") em milissegundos; o cache é refeito quando o tamanho ou o
+mtime do CSV mudam.
+
+Exemplo:
+    >>> from carregar_dataset import ler_dataset
+    >>> X, y = ler_dataset("dataset.xls", cache=".cache_dataset")
+"""
+
+import json
+import os
+
+import numpy as np
+
+
+COLUNAS_CSV = ["potencia", "corrente_max_A", "corrente_min_A", "corrente_media_A"]
+TAMANHO_BLOCO = 1 << 20  # linhas por bloco
+VERSAO_CACHE = 1
+
+
+def contar_linhas(caminho, tamanho_bloco=1 << 24):
+    """Conta as linhas do arquivo (lê bytes, sem interpretar o CSV)."""
+    linhas = 0
+    ultimo = b"\n"
+    with open(caminho, "rb") as arquivo:
+        while True:
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                break
+            linhas += bloco.count(b"\n")
+            ultimo = bloco[-1:]
+    return linhas + (ultimo != b"\n")
+
+
+def _preencher_bloco(valores, destino, rotulos):
+    """
+    Copia um bloco (n x 4: potencia, max, min, media) para o destino.
+
+    Args:
+        valores (numpy.ndarray): Bloco lido do CSV
+        destino (numpy.ndarray): Fatia (n x 5) de X
+        rotulos (numpy.ndarray): Fatia (n,) de y
+    """
+    rotulos[:] = valores[:, 0]
+    destino[:, :3] = valores[:, 1:]
+    np.subtract(destino[:, 0], destino[:, 1], out=destino[:, 3])
+    np.add(destino[:, 2], destino.dtype.type(1e-6), out=destino[:, 4])
+    np.divide(destino[:, 0], destino[:, 4], out=destino[:, 4])
+
+
+def ler_blocos(caminho, tipo=np.float32, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Percorre o CSV bloco a bloco.
+
+    Yields:
+        tuple: (X, y) do bloco, X (n x 5) do tipo pedido e y (n,) int8
+    """
+    import pandas as pd
+
+    for bloco in pd.read_csv(
+        caminho, header=None, names=COLUNAS_CSV, dtype=tipo, chunksize=tamanho_bloco
+    ):
+        valores = bloco.to_numpy()
+        X = np.empty((len(valores), 5), dtype=tipo)
+        y = np.empty(len(valores), dtype=np.int8)
+        _preencher_bloco(valores, X, y)
+        yield X, y
+
+
+def _caminhos_cache(caminho, pasta):
+    base = os.path.join(pasta, os.path.basename(caminho))
+    return base + ".json", base + ".X.npy", base + ".y.npy"
+
+
+def _identidade(caminho, tipo):
+    info = os.stat(caminho)
+    return {
+        "versao": VERSAO_CACHE,
+        "origem": os.path.abspath(caminho),
+        "tamanho": info.st_size,
+        "mtime_ns": info.st_mtime_ns,
+        "tipo": np.dtype(tipo).str,
+    }
+
+
+def _abrir_cache(caminho, pasta, tipo):
+    """Abre X e y do cache (memmap somente leitura), ou None se inválido."""
+    meta, caminho_X, caminho_y = _caminhos_cache(caminho, pasta)
+    try:
+        with open(meta, "r", encoding="utf-8") as arquivo:
+            gravado = json.load(arquivo)
+        if {k: gravado.get(k) for k in ("versao", "origem", "tamanho", "mtime_ns", "tipo")} \
+                != _identidade(caminho, tipo):
+            return None
+        return np.load(caminho_X, mmap_mode="r"), np.load(caminho_y, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+
+def gravar_npy(caminho, caminho_X, caminho_y, tipo=np.float32, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê o CSV direto para dois .npy, sem montar os arrays em RAM.
+
+    Os blocos são escritos em open_memmap temporários, renomeados ao fim.
+
+    Args:
+        caminho (str): CSV rotulado
+        caminho_X, caminho_y (str): Destinos (.npy) de X e y
+        tipo (numpy.dtype): Tipo dos atributos
+        tamanho_bloco (int): Linhas por bloco de leitura
+
+    Returns:
+        int: Linhas gravadas
+    """
+    import pandas as pd
+
+    n = contar_linhas(caminho)
+    temporario_X = caminho_X[:-len(".npy")] + ".tmp.npy"
+    temporario_y = caminho_y[:-len(".npy")] + ".tmp.npy"
+    X = np.lib.format.open_memmap(temporario_X, "w+", tipo, (n, 5))
+    y = np.lib.format.open_memmap(temporario_y, "w+", np.int8, (n,))
+
+    lidas = 0
+    for bloco in pd.read_csv(
+        caminho, header=None, names=COLUNAS_CSV, dtype=tipo, chunksize=tamanho_bloco
+    ):
+        valores = bloco.to_numpy()
+        fim = lidas + len(valores)
+        _preencher_bloco(valores, X[lidas:fim], y[lidas:fim])
+        lidas = fim
+
+    # Linhas em branco são puladas pelo CSV: a contagem é um limite superior
+    if lidas != n:
+        X, y = np.array(X[:lidas]), np.array(y[:lidas])
+        np.save(temporario_X, X)
+        np.save(temporario_y, y)
+    else:
+        X.flush()
+        y.flush()
+    del X, y
+
+    os.replace(temporario_X, caminho_X)
+    os.replace(temporario_y, caminho_y)
+    return lidas
+
+
+def ler_dataset(caminho="dataset.xls", tipo=np.float32, tamanho_bloco=TAMANHO_BLOCO,
+                cache=None):
+    """
+    Lê o dataset inteiro para arrays tipados.
+
+    As linhas são contadas antes (varredura de bytes) para alocar X e y
+    uma única vez; cada bloco do CSV é escrito e transformado no lugar.
+
+    Args:
+        caminho (str): CSV rotulado (4 colunas, sem cabeçalho)
+        tipo (numpy.dtype): Tipo dos atributos (float32 ou float64)
+        tamanho_bloco (int): Linhas por bloco de leitura
+        cache (str, opcional): Pasta do cache .npy. Se válido, X e y são
+            devolvidos como memmap somente leitura
+
+    Returns:
+        tuple: (X, y) com X (N x 5) e y (N,) int8
+    """
+    if cache:
+        abertos = _abrir_cache(caminho, cache, tipo)
+        if abertos is not None:
+            return abertos
+
+        identidade = _identidade(caminho, tipo)
+        os.makedirs(cache, exist_ok=True)
+        meta, caminho_X, caminho_y = _caminhos_cache(caminho, cache)
+        identidade["linhas"] = gravar_npy(caminho, caminho_X, caminho_y, tipo, tamanho_bloco)
+        temporario = meta + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(identidade, arquivo, indent=2)
+            arquivo.write("\n")
+        os.replace(temporario, meta)
+        return np.load(caminho_X, mmap_mode="r"), np.load(caminho_y, mmap_mode="r")
+
+    import pandas as pd
+
+    n = contar_linhas(caminho)
+    X = np.empty((n, 5), dtype=tipo)
+    y = np.empty(n, dtype=np.int8)
+    lidas = 0
+    for bloco in pd.read_csv(
+        caminho, header=None, names=COLUNAS_CSV, dtype=tipo, chunksize=tamanho_bloco
+    ):
+        valores = bloco.to_numpy()
+        fim = lidas + len(valores)
+        _preencher_bloco(valores, X[lidas:fim], y[lidas:fim])
+        lidas = fim
+
+    # Linhas em branco são puladas pelo CSV: a contagem é um limite superior
+    return X[:lidas], y[:lidas]
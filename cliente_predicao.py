@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cliente mínimo do servidor de predição (servidor_predicao.py).
+
+Mantém o mesmo contrato de linha de comando de modelo_predicao.py, mas
+delega a inferência ao servidor persistente, que já tem o modelo carregado.
+Este módulo só importa a biblioteca padrão, então a inicialização é rápida.
+
+Uso:
+    python3 cliente_predicao.py [--versao] <corrente_max> <corrente_min> <corrente_media>
+
+Saída:
+    CLASSE|PROB_BAIXA|PROB_ALTA
+    CLASSE|PROB_BAIXA|PROB_ALTA|VERSAO   (com --versao; "-" fora do registro)
+
+Variáveis de ambiente:
+    PREDICAO_HOST    Endereço do servidor (padrão: 127.0.0.1)
+    PREDICAO_PORTA   Porta do servidor (padrão: 50555)
+    PREDICAO_SOCKET  Socket Unix do servidor (servidor_predicao.py --socket);
+                     se definido, host e porta são ignorados
+
+Se o servidor não estiver no ar, a predição é feita localmente com
+modelo_predicao (mais lento, mas com a mesma saída).
+"""
+
+import os
+import socket
+import sys
+
+
+HOST_PADRAO = "127.0.0.1"
+PORTA_PADRAO = 50555
+
+
+class ClientePredicao:
+    """
+    Conexão persistente com o servidor de predição.
+
+    Args:
+        host (str, opcional): Endereço TCP (padrão: PREDICAO_HOST ou HOST_PADRAO)
+        porta (int, opcional): Porta TCP (padrão: PREDICAO_PORTA ou PORTA_PADRAO)
+        timeout (float): Limite (s) para conectar e para cada resposta
+        caminho_socket (str, opcional): Socket Unix do servidor (padrão:
+            PREDICAO_SOCKET); se dado, host e porta são ignorados
+        com_versao (bool): Pede ao servidor (comando VERSAO) a versão do
+            modelo como quarto campo de cada resposta; fica em self.versao
+            a versão atual na conexão
+
+    Raises:
+        OSError: Se o servidor não estiver no ar
+
+    Example:
+        >>> with ClientePredicao() as cliente:
+        ...     classe, prob_baixa, prob_alta = cliente.prever(1.80, -0.03, 0.67)
+        >>> with ClientePredicao(caminho_socket="/tmp/predicao.sock") as cliente:
+        ...     resposta = cliente.consultar(1.80, -0.03, 0.67)
+    """
+
+    def __init__(self, host=None, porta=None, timeout=5.0, caminho_socket=None,
+                 com_versao=False):
+        caminho_socket = caminho_socket or os.environ.get("PREDICAO_SOCKET")
+
+        if caminho_socket:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            try:
+                self._sock.connect(caminho_socket)
+            except OSError:
+                self._sock.close()
+                raise
+        else:
+            host = host or os.environ.get("PREDICAO_HOST", HOST_PADRAO)
+            porta = int(porta or os.environ.get("PREDICAO_PORTA", PORTA_PADRAO))
+            self._sock = socket.create_connection((host, porta), timeout=timeout)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._leitor = self._sock.makefile("rb")
+        self.versao = None
+        if com_versao:
+            try:
+                self.versao = self._trocar("VERSAO")
+            except OSError:
+                self.fechar()
+                raise
+
+    def consultar(self, corrente_max, corrente_min, corrente_media):
+        """
+        Envia uma leitura e retorna a linha de resposta crua do servidor.
+
+        Returns:
+            str: "CLASSE|PROB_BAIXA|PROB_ALTA[|VERSAO]" ou "ERRO: <mensagem>"
+        """
+        requisicao = "{!r}|{!r}|{!r}".format(
+            float(corrente_max), float(corrente_min), float(corrente_media)
+        )
+        return self._trocar(requisicao)
+
+    def consultar_estatisticas(self):
+        """
+        Pede ao servidor o retrato do agrupamento em lotes.
+
+        Returns:
+            str: JSON com profundidade da fila, tamanhos de lote e latência
+        """
+        return self._trocar("STATS")
+
+    def _trocar(self, requisicao):
+        self._sock.sendall((requisicao + "\n").encode("ascii"))
+
+        resposta = self._leitor.readline()
+        if not resposta:
+            raise ConnectionError("Servidor encerrou a conexão")
+        return resposta.decode("utf-8").strip()
+
+    def prever(self, corrente_max, corrente_min, corrente_media):
+        """
+        Mesmo contrato de modelo_predicao.prever(), executado no servidor.
+
+        Returns:
+            tuple: (classe, prob_baixa, prob_alta)
+
+        Raises:
+            RuntimeError: Se o servidor responder com erro
+        """
+        resposta = self.consultar(corrente_max, corrente_min, corrente_media)
+        if resposta.startswith("ERRO"):
+            raise RuntimeError(resposta)
+
+        campos = resposta.split("|")
+        return int(campos[0]), float(campos[1]), float(campos[2])
+
+    def fechar(self):
+        """Encerra a conexão com o servidor."""
+        self._leitor.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def _prever_local(corrente_max, corrente_min, corrente_media, com_versao=False):
+    """Fallback sem servidor: carrega o modelo neste processo."""
+    import modelo_predicao as mp
+
+    predicao = mp.prever(corrente_max, corrente_min, corrente_media)
+    if com_versao:
+        return mp.formatar_saida(*predicao, versao=predicao.versao or mp.SEM_VERSAO)
+    return mp.formatar_saida(*predicao)
+
+
+def main():
+    """Função principal para uso via System Exec.vi do LabVIEW."""
+
+    argumentos = [a for a in sys.argv[1:] if a != "--versao"]
+    com_versao = len(argumentos) != len(sys.argv) - 1
+
+    if len(argumentos) != 3:
+        print("ERRO: 3 argumentos necessários")
+        print("Uso: python3 {} [--versao] <max> <min> <media>".format(sys.argv[0]))
+        sys.exit(1)
+
+    try:
+        corrente_max = float(argumentos[0])
+        corrente_min = float(argumentos[1])
+        corrente_media = float(argumentos[2])
+
+        try:
+            with ClientePredicao(com_versao=com_versao) as cliente:
+                resposta = cliente.consultar(
+                    corrente_max, corrente_min, corrente_media
+                )
+        except OSError:
+            resposta = _prever_local(
+                corrente_max, corrente_min, corrente_media, com_versao
+            )
+
+        print(resposta)
+        sys.exit(1 if resposta.startswith("ERRO") else 0)
+
+    except Exception as e:
+        print("ERRO: {}".format(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
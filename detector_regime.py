@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detecção incremental de mudança de regime (Baixa ↔ Alta Potência).
+
+Comparar a classe de cada leitura com a anterior faz o alarme oscilar
+quando a corrente fica perto da fronteira (zona de transição). Aqui a
+decisão é tomada sobre prob_alta suavizada (média móvel exponencial), com
+histerese e tempo mínimo de permanência:
+
+    - Suavização: p = p + alfa * (prob_alta - p)
+    - Histerese: Baixa → Alta só quando p >= limiar_alta; Alta → Baixa só
+      quando p <= limiar_baixa. Entre os dois limiares o regime se mantém.
+    - Permanência: a condição precisa valer continuamente por pelo menos
+      permanencia_minima (nas unidades dos instantes) antes de a mudança
+      ser confirmada.
+
+Cada atualização custa O(1): o detector guarda só o estado corrente, não o
+histórico de leituras.
+
+Exemplo:
+    >>> import modelo_predicao as mp
+    >>> from detector_regime import DetectorRegime
+    >>> detector = DetectorRegime(permanencia_minima=0.5)  # segundos
+    >>> _, _, prob_alta = mp.prever(1.80, -0.03, 0.67)
+    >>> evento = detector.atualizar(prob_alta)  # instante = time.time()
+    >>> if evento:
+    ...     print(evento.instante, evento.de, "→", evento.para)
+"""
+
+import time
+from collections import namedtuple
+
+
+NOMES_REGIME = {0: "Baixa Potência", 1: "Alta Potência"}
+
+# Mudança de regime confirmada
+Transicao = namedtuple(
+    "Transicao", ["instante", "indice", "de", "para", "prob_alta", "inicio"]
+)
+Transicao.__doc__ = """\
+Mudança de regime confirmada.
+
+    instante: Instante da confirmação
+    indice: Número da amostra (a partir de 0) que confirmou a mudança
+    de, para: Regimes (0 = Baixa, 1 = Alta)
+    prob_alta: prob_alta suavizada no instante da confirmação
+    inicio: Instante em que a condição de mudança passou a valer
+"""
+
+
+class DetectorRegime:
+    """
+    Detector de mudança de regime com estado, uma amostra por vez.
+
+    Args:
+        limiar_alta (float): prob_alta suavizada para entrar em Alta
+        limiar_baixa (float): prob_alta suavizada para voltar a Baixa
+        alfa (float): Peso da amostra nova na média exponencial (0 < alfa
+            <= 1; 1 = sem suavização)
+        permanencia_minima (float): Tempo que a condição deve se manter
+            antes da confirmação (0 = imediata)
+        periodo (float, opcional): Intervalo entre amostras. Se dado,
+            amostras sem instante recebem o anterior + periodo; se omitido,
+            recebem time.time()
+
+    Raises:
+        ValueError: Se os parâmetros forem inconsistentes
+    """
+
+    def __init__(
+        self,
+        limiar_alta=0.7,
+        limiar_baixa=0.3,
+        alfa=0.3,
+        permanencia_minima=0.0,
+        periodo=None,
+    ):
+        if not 0.0 <= limiar_baixa <= limiar_alta <= 1.0:
+            raise ValueError("Esperado 0 <= limiar_baixa <= limiar_alta <= 1")
+        if not 0.0 < alfa <= 1.0:
+            raise ValueError("alfa deve estar em (0, 1]")
+        if permanencia_minima < 0:
+            raise ValueError("permanencia_minima não pode ser negativa")
+        if periodo is not None and periodo <= 0:
+            raise ValueError("periodo deve ser positivo")
+
+        self.limiar_alta = limiar_alta
+        self.limiar_baixa = limiar_baixa
+        self.alfa = alfa
+        self.permanencia_minima = permanencia_minima
+        self.periodo = periodo
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta o estado (o próximo regime vem da próxima amostra)."""
+        self.regime = None
+        self.prob_suavizada = None
+        self.amostras = 0
+        self.ultimo_instante = None
+        self.inicio_candidato = None
+
+    def _proximo_instante(self):
+        if self.periodo is None:
+            return time.time()
+        if self.ultimo_instante is None:
+            return 0.0
+        return self.ultimo_instante + self.periodo
+
+    def atualizar(self, prob_alta, instante=None):
+        """
+        Processa uma amostra.
+
+        A primeira amostra define o regime inicial (Alta se prob_alta >=
+        0,5) sem emitir evento.
+
+        Args:
+            prob_alta (float): Probabilidade de Alta Potência da leitura
+            instante (float, opcional): Instante da amostra
+
+        Returns:
+            Transicao ou None: Evento, se a amostra confirmou uma mudança
+        """
+        if instante is None:
+            instante = self._proximo_instante()
+        indice = self.amostras
+        self.amostras += 1
+        self.ultimo_instante = instante
+
+        p = self.prob_suavizada
+        if p is None:
+            self.prob_suavizada = prob_alta
+            self.regime = 1 if prob_alta >= 0.5 else 0
+            return None
+
+        p += self.alfa * (prob_alta - p)
+        self.prob_suavizada = p
+
+        if self.regime == 0:
+            mudar = p >= self.limiar_alta
+        else:
+            mudar = p <= self.limiar_baixa
+
+        if not mudar:
+            self.inicio_candidato = None
+            return None
+
+        if self.inicio_candidato is None:
+            self.inicio_candidato = instante
+        if instante - self.inicio_candidato < self.permanencia_minima:
+            return None
+
+        evento = Transicao(
+            instante, indice, self.regime, 1 - self.regime, p, self.inicio_candidato
+        )
+        self.regime = 1 - self.regime
+        self.inicio_candidato = None
+        return evento
+
+    def atualizar_lote(self, probs_alta, instantes=None):
+        """
+        Processa um bloco de amostras, em ordem.
+
+        Equivale a chamar atualizar() para cada amostra, com as variáveis
+        do laço em locais do Python para sustentar taxas de aquisição altas.
+
+        Args:
+            probs_alta (array-like): prob_alta de cada amostra (N,)
+            instantes (array-like, opcional): Instantes (N,). Se omitido, é
+                preciso ter configurado periodo
+
+        Returns:
+            list: Eventos Transicao, na ordem em que ocorreram
+
+        Raises:
+            ValueError: Sem instantes nem periodo, ou tamanhos diferentes
+        """
+        probs = [float(p) for p in _como_lista(probs_alta)]
+        if not probs:
+            return []
+
+        if instantes is None:
+            if self.periodo is None:
+                raise ValueError("Informe instantes ou configure periodo")
+            inicio = self._proximo_instante()
+            instantes = [inicio + k * self.periodo for k in range(len(probs))]
+        else:
+            instantes = [float(t) for t in _como_lista(instantes)]
+            if len(instantes) != len(probs):
+                raise ValueError(
+                    "probs_alta e instantes com tamanhos diferentes: "
+                    "{} e {}".format(len(probs), len(instantes))
+                )
+
+        eventos = []
+        k = 0
+        if self.prob_suavizada is None:
+            self.atualizar(probs[0], instantes[0])
+            k = 1
+
+        alfa = self.alfa
+        limiar_alta = self.limiar_alta
+        limiar_baixa = self.limiar_baixa
+        permanencia = self.permanencia_minima
+        p = self.prob_suavizada
+        regime = self.regime
+        candidato = self.inicio_candidato
+        base = self.amostras - k
+
+        for k in range(k, len(probs)):
+            p += alfa * (probs[k] - p)
+            if (p >= limiar_alta) if regime == 0 else (p <= limiar_baixa):
+                t = instantes[k]
+                if candidato is None:
+                    candidato = t
+                if t - candidato >= permanencia:
+                    eventos.append(
+                        Transicao(t, base + k, regime, 1 - regime, p, candidato)
+                    )
+                    regime = 1 - regime
+                    candidato = None
+            else:
+                candidato = None
+
+        self.prob_suavizada = p
+        self.regime = regime
+        self.inicio_candidato = candidato
+        self.amostras = base + len(probs)
+        self.ultimo_instante = instantes[-1]
+        return eventos
+
+
+def _como_lista(valores):
+    """Converte arrays NumPy (sem importar NumPy) e sequências em lista."""
+    if hasattr(valores, "tolist"):
+        valores = valores.tolist()
+    return list(valores)
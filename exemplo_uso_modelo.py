@@ -6,6 +6,7 @@ Demonstra diferentes formas de integração com LabVIEW.
 """
 
 import modelo_predicao as mp
+from detector_regime import DetectorRegime, NOMES_REGIME
 
 
 print("=" * 70)
@@ -88,8 +89,14 @@ print(
 )
 print("-" * 70)
 
+# Todas as leituras são avaliadas de uma vez com prever_lote()
+maxs, mins, medias, _ = zip(*leituras)
+classes, probs_baixa, probs_alta = mp.prever_lote(maxs, mins, medias)
+
 for i, (max_v, min_v, med_v, esperada) in enumerate(leituras, 1):
-    classe, prob_baixa, prob_alta = mp.prever(max_v, min_v, med_v)
+    classe = classes[i - 1]
+    prob_baixa = probs_baixa[i - 1]
+    prob_alta = probs_alta[i - 1]
     nome_classe = "Baixa Potência" if classe == 0 else "Alta Potência"
     confianca = prob_baixa if classe == 0 else prob_alta
 
@@ -106,44 +113,54 @@ for i, (max_v, min_v, med_v, esperada) in enumerate(leituras, 1):
 print("\n\n[EXEMPLO 4] Detecção de mudança de regime operacional")
 print("-" * 70)
 
-# Simular transição de baixa para alta potência
+# Simular transição de baixa para alta potência, passando alguns segundos
+# na zona de transição (a classe instantânea oscila entre Baixa e Alta)
 leituras_transicao = [
     (1.10, -0.01, 0.46),  # Baixa
     (1.12, -0.01, 0.47),  # Baixa
     (1.15, -0.01, 0.48),  # Baixa (próximo ao limite)
     (1.50, 0.00, 0.55),  # Zona de transição
+    (1.52, 0.00, 0.56),  # Zona de transição
+    (1.48, 0.00, 0.55),  # Zona de transição
+    (1.52, 0.00, 0.56),  # Zona de transição
     (1.70, -0.02, 0.63),  # Alta
     (1.75, -0.03, 0.65),  # Alta
+    (1.72, -0.02, 0.64),  # Alta
 ]
 
-regime_anterior = None
+# Uma leitura por segundo; mudança confirmada só depois de 2 s além do
+# limiar (histerese 0,35 / 0,65 sobre prob_alta suavizada)
+detector = DetectorRegime(
+    limiar_alta=0.65, limiar_baixa=0.35, alfa=0.5, permanencia_minima=2.0, periodo=1.0
+)
 
 print(
-    "\n{:<6} {:<10} {:<20} {:<10} {:<15}".format(
-        "Nº", "Corrente", "Regime", "Confiança", "Status"
+    "\n{:<6} {:<10} {:<12} {:<12} {:<20} {:<15}".format(
+        "t (s)", "Corrente", "Instantânea", "Suavizada", "Regime", "Status"
     )
 )
 print("-" * 70)
 
-for i, (max_v, min_v, med_v) in enumerate(leituras_transicao, 1):
+for max_v, min_v, med_v in leituras_transicao:
     classe, prob_baixa, prob_alta = mp.prever(max_v, min_v, med_v)
-    nome_classe = "Baixa" if classe == 0 else "Alta"
-    confianca = prob_baixa if classe == 0 else prob_alta
+    evento = detector.atualizar(prob_alta)
 
-    # Detectar mudança de regime
-    if regime_anterior is not None and regime_anterior != classe:
-        status = "⚠️ MUDANÇA!"
+    if evento:
+        status = "⚠️ MUDANÇA! ({:.0f} s)".format(evento.instante - evento.inicio)
     else:
         status = "✓ Estável"
 
     print(
-        "{:<6} {:<10.2f} {:<20} {:<10.1%} {:<15}".format(
-            i, med_v, nome_classe + " Potência", confianca, status
+        "{:<6.0f} {:<10.2f} {:<12} {:<12.1%} {:<20} {:<15}".format(
+            detector.ultimo_instante,
+            med_v,
+            "Alta" if classe == 1 else "Baixa",
+            detector.prob_suavizada,
+            NOMES_REGIME[detector.regime],
+            status,
         )
     )
 
-    regime_anterior = classe
-
 
 # ==============================================================================
 # EXEMPLO 5: Integração com LabVIEW (formato de saída)
@@ -186,7 +203,11 @@ print(
    → Retorna: dict com todas as informações
    → Uso: Quando precisa de mais detalhes
 
-3. carregar_modelo()
+3. prever_lote(maxs, mins, medias)
+   → Retorna: (classes, probs_baixa, probs_alta) como arrays NumPy
+   → Uso: Muitas leituras de uma vez (histórico, blocos do DAQ)
+
+4. carregar_modelo()
    → Retorna: Pipeline do sklearn
    → Uso: Carregar modelo uma vez e reutilizar
 
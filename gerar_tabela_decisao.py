@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gera a tabela de decisão pré-calculada usada por modelo_predicao.prever_tabela().
+
+As correntes são limitadas e chegam quantizadas em 0,01 A, então o
+resultado do modelo para cada combinação (max, min, media) da grade é
+calculado uma única vez e gravado em um .npy mapeável em memória:
+
+    modelo_svm_potencia_tabela.npy   classe (uint8) + prob_alta (uint16)
+    modelo_svm_potencia_tabela.json  grade, escala, modelo e verificação
+
+Com a grade padrão (max -0.5…11.0, min -0.5…0.5, media 0.0…1.2, passo
+0.01) são ~14 milhões de células, 3 bytes cada (~42 MB).
+
+Depois de gerar, a tabela é verificada contra o pipeline sklearn real em
+células sorteadas e nas leituras do dataset.
+
+Uso:
+    python3 gerar_tabela_decisao.py
+    python3 gerar_tabela_decisao.py --max -0.5 11 --min -0.5 0.5 --media 0 1.2
+    python3 gerar_tabela_decisao.py --apenas-verificar
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import modelo_predicao as mp
+from motor_linear import ModeloLinear, calcular_atributos, sha256_arquivo
+
+
+PASSO_PADRAO = 0.01
+ESCALA_PROB = 65535
+FAIXAS_PADRAO = {
+    "corrente_max_A": (-0.5, 11.0),
+    "corrente_min_A": (-0.5, 0.5),
+    "corrente_media_A": (0.0, 1.2),
+}
+
+# Uma célula: classe e prob_alta quantizada, sem preenchimento (3 bytes)
+TIPO_CELULA = np.dtype([("classe", np.uint8), ("prob_alta", np.uint16)])
+
+
+def criar_eixos(faixas=None, passo=PASSO_PADRAO):
+    """
+    Define a grade da tabela.
+
+    Args:
+        faixas (dict, opcional): {atributo: (inicio, fim)} para max, min e
+            media (padrão: FAIXAS_PADRAO)
+        passo (float): Resolução da grade, em A
+
+    Returns:
+        list: Um dict {'nome', 'inicio', 'passo', 'n'} por eixo
+    """
+    faixas = faixas or FAIXAS_PADRAO
+    eixos = []
+    for nome in mp.COLUNAS_ATRIBUTOS[:3]:
+        inicio, fim = faixas[nome]
+        if fim < inicio:
+            raise ValueError("Faixa vazia para {}: {} a {}".format(nome, inicio, fim))
+        n = int(round((fim - inicio) / passo)) + 1
+        eixos.append({"nome": nome, "inicio": inicio, "passo": passo, "n": n})
+    return eixos
+
+
+def valores_eixo(eixo):
+    """Valores da grade de um eixo (os mesmos que a consulta reconstrói)."""
+    return eixo["inicio"] + np.arange(eixo["n"]) * eixo["passo"]
+
+
+def gerar_tabela(motor, eixos, caminho_json, fatias_por_bloco=32):
+    """
+    Calcula e grava a tabela, uma fatia do eixo de corrente máxima por vez.
+
+    Os dados são gerados em um .npy temporário na mesma pasta e só então
+    trocados (os.replace) pelo .npy publicado, seguido do cabeçalho. Quem
+    já mapeou a tabela anterior continua lendo o arquivo antigo, inteiro;
+    uma falha no meio da geração não deixa tabela corrompida.
+
+    Args:
+        motor (ModeloLinear): Modelo a tabelar
+        eixos (list): Saída de criar_eixos()
+        caminho_json (str): Cabeçalho de saída (.json); os dados vão para
+            o .npy de mesmo nome
+        fatias_por_bloco (int): Fatias calculadas por chamada vetorizada
+
+    Returns:
+        dict: Cabeçalho gravado
+    """
+    caminho_npy = os.path.splitext(caminho_json)[0] + ".npy"
+    temporario = caminho_npy + ".tmp"
+    forma = tuple(e["n"] for e in eixos)
+    try:
+        _calcular_celulas(motor, eixos, forma, temporario, fatias_por_bloco)
+        os.replace(temporario, caminho_npy)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+    cabecalho = {
+        "formato": mp.FORMATO_TABELA,
+        "versao": mp.VERSAO_TABELA,
+        "dados": os.path.basename(caminho_npy),
+        "eixos": eixos,
+        "escala_prob": ESCALA_PROB,
+        "modelo": motor.para_dict(),
+    }
+    _gravar_cabecalho(caminho_json, cabecalho)
+    return cabecalho
+
+
+def _calcular_celulas(motor, eixos, forma, caminho_npy, fatias_por_bloco):
+    """Preenche um .npy novo com classe e prob_alta de todas as células."""
+    dados = np.lib.format.open_memmap(
+        caminho_npy, mode="w+", dtype=TIPO_CELULA, shape=forma
+    )
+
+    maxs_grade = valores_eixo(eixos[0])
+    mins, medias = np.meshgrid(valores_eixo(eixos[1]), valores_eixo(eixos[2]), indexing="ij")
+    mins, medias = mins.ravel(), medias.ravel()
+
+    for inicio in range(0, forma[0], fatias_por_bloco):
+        fatias = maxs_grade[inicio:inicio + fatias_por_bloco]
+        maxs = np.repeat(fatias, mins.size)
+        n = len(fatias)
+
+        decisoes = motor.decisao_lote(
+            calcular_atributos(maxs, np.tile(mins, n), np.tile(medias, n))
+        )
+        prob_baixa, prob_alta = motor.probabilidades_lote(decisoes)
+
+        bloco = dados[inicio:inicio + n].reshape(-1)
+        bloco["classe"] = motor.classificar_lote(prob_baixa, prob_alta)
+        bloco["prob_alta"] = np.rint(prob_alta * ESCALA_PROB)
+
+    dados.flush()
+    del dados
+
+
+def _gravar_cabecalho(caminho_json, cabecalho):
+    # Gravar e renomear: quem já usa a tabela nunca lê um JSON pela metade
+    temporario = caminho_json + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(cabecalho, arquivo, indent=2)
+        arquivo.write("\n")
+    os.replace(temporario, caminho_json)
+
+
+def verificar_tabela(tabela, pipeline, leituras_extras=None, amostras=200000, semente=0):
+    """
+    Compara a tabela com o pipeline sklearn real.
+
+    Sorteia células da grade (mais as leituras extras, p. ex. o dataset,
+    arredondadas para a grade) e compara classe e prob_alta com
+    predict_proba sobre os mesmos valores.
+
+    Args:
+        tabela (TabelaDecisao): Tabela aberta
+        pipeline (Pipeline): Modelo sklearn de referência
+        leituras_extras (numpy.ndarray, opcional): Leituras (N x 3)
+        amostras (int): Células sorteadas
+        semente (int): Semente do sorteio
+
+    Returns:
+        dict: {'celulas', 'classes_divergentes', 'erro_max_prob',
+            'limite_prob', 'ok'}
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(semente)
+    grade = [valores_eixo(e) for e in tabela.eixos]
+    colunas = [g[rng.integers(0, g.size, amostras)] for g in grade]
+
+    if leituras_extras is not None and len(leituras_extras):
+        for c, (g, e) in enumerate(zip(grade, tabela.eixos)):
+            indice = np.rint((leituras_extras[:, c] - e["inicio"]) / e["passo"])
+            indice = np.clip(indice, 0, e["n"] - 1).astype(np.intp)
+            colunas[c] = np.concatenate([colunas[c], g[indice]])
+
+    classes, _, prob_alta = tabela.prever_lote(*colunas)
+
+    atributos = pd.DataFrame(calcular_atributos(*colunas), columns=mp.COLUNAS_ATRIBUTOS)
+    probs_ref = pipeline.predict_proba(atributos)
+    classes_ref = (probs_ref[:, 1] >= probs_ref[:, 0]).astype(np.int64)
+
+    # Quantização em uint16 (+ folga para a aritmética em float64)
+    limite = 0.5 / tabela.escala_prob + 1e-9
+    erro = float(np.abs(prob_alta - probs_ref[:, 1]).max())
+    divergentes = int((classes != classes_ref).sum())
+    return {
+        "celulas": int(classes.size),
+        "classes_divergentes": divergentes,
+        "erro_max_prob": erro,
+        "limite_prob": limite,
+        "ok": divergentes == 0 and erro <= limite,
+    }
+
+
+def _ler_dataset(caminho="dataset.xls"):
+    if not os.path.exists(caminho):
+        return None
+    return np.loadtxt(caminho, delimiter=",", usecols=(1, 2, 3), ndmin=2)
+
+
+def main():
+    """Função principal: gera e verifica a tabela."""
+    parser = argparse.ArgumentParser(description="Gera a tabela de decisão pré-calculada")
+    parser.add_argument("--modelo", default=mp.CAMINHO_MODELO, help="Modelo .sav")
+    parser.add_argument("--saida", default=mp.CAMINHO_TABELA, help="Cabeçalho .json")
+    parser.add_argument("--passo", type=float, default=PASSO_PADRAO, help="Resolução (A)")
+    for opcao, nome in (("--max", "corrente_max_A"), ("--min", "corrente_min_A"),
+                        ("--media", "corrente_media_A")):
+        parser.add_argument(opcao, type=float, nargs=2, metavar=("INICIO", "FIM"),
+                            default=FAIXAS_PADRAO[nome], help="Faixa de " + nome)
+    parser.add_argument("--amostras", type=int, default=200000,
+                        help="Células sorteadas na verificação")
+    parser.add_argument("--apenas-verificar", action="store_true",
+                        help="Não gera; só verifica a tabela existente")
+    args = parser.parse_args()
+
+    import joblib
+
+    if not os.path.exists(args.modelo):
+        print("ERRO: Modelo não encontrado: {}".format(args.modelo))
+        sys.exit(1)
+    pipeline = joblib.load(args.modelo)
+
+    if not args.apenas_verificar:
+        eixos = criar_eixos(
+            {"corrente_max_A": args.max, "corrente_min_A": args.min,
+             "corrente_media_A": args.media},
+            args.passo,
+        )
+        celulas = int(np.prod([e["n"] for e in eixos]))
+        print("Gerando {} ({} células, {:.1f} MB)...".format(
+            args.saida, celulas, celulas * TIPO_CELULA.itemsize / 1e6))
+
+        inicio = time.perf_counter()
+        cabecalho = gerar_tabela(ModeloLinear.de_pipeline(pipeline), eixos, args.saida)
+        print("   ✓ Gerada em {:.1f} s".format(time.perf_counter() - inicio))
+    else:
+        with open(args.saida, "r", encoding="utf-8") as arquivo:
+            cabecalho = json.load(arquivo)
+
+    tabela = mp.TabelaDecisao.de_arquivo(args.saida)
+    relatorio = verificar_tabela(tabela, pipeline, _ler_dataset(), args.amostras)
+    print("Verificação contra o pipeline ({} células):".format(relatorio["celulas"]))
+    print("   classes divergentes: {}".format(relatorio["classes_divergentes"]))
+    print("   erro máx. prob_alta: {:.2e} (limite {:.2e})".format(
+        relatorio["erro_max_prob"], relatorio["limite_prob"]))
+
+    # Só uma tabela verificada leva o hash do modelo: sem ele,
+    # carregar_tabela() a recusa
+    cabecalho["verificacao"] = relatorio
+    if relatorio["ok"]:
+        cabecalho["modelo_sha256"] = sha256_arquivo(args.modelo)
+    else:
+        cabecalho.pop("modelo_sha256", None)
+    _gravar_cabecalho(args.saida, cabecalho)
+
+    if not relatorio["ok"]:
+        print("❌ Tabela diverge do modelo")
+        sys.exit(1)
+    print("✅ Tabela consistente com o modelo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extração de atributos a partir de blocos brutos de corrente do DAQ.
+
+Em vez de o LabVIEW calcular máximo, mínimo e média de cada janela antes
+de chamar prever(), o bloco bruto de amostras é enviado uma vez (por
+exemplo, a cada segundo) e as três estatísticas de todas as janelas são
+calculadas aqui de forma vetorizada, sobre visões com strides (sem copiar
+as amostras), seguindo direto para a predição em lote.
+
+Formatos aceitos:
+    - Matriz 2-D (n_janelas x amostras_por_janela): uma janela por linha
+    - Buffer 1-D + tamanho_janela (+ passo opcional, para sobreposição)
+
+Exemplo:
+    >>> import janelas_corrente as jc
+    >>> classes, prob_baixa, prob_alta = jc.prever_janelas(
+    ...     bloco_daq, tamanho_janela=1000
+    ... )
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def visao_janelas(amostras, tamanho_janela=None, passo=None):
+    """
+    Organiza as amostras em janelas (n_janelas x tamanho) sem copiá-las.
+
+    Args:
+        amostras (array-like): Matriz 2-D de janelas ou buffer 1-D
+        tamanho_janela (int, opcional): Amostras por janela (obrigatório
+            para buffer 1-D)
+        passo (int, opcional): Deslocamento entre o início de janelas
+            consecutivas. Padrão: tamanho_janela (sem sobreposição)
+
+    Returns:
+        numpy.ndarray: Visão 2-D sobre as amostras originais. Amostras no
+            final do buffer que não completam uma janela são ignoradas.
+
+    Raises:
+        ValueError: Se o formato ou os parâmetros forem inválidos
+    """
+    amostras = np.asarray(amostras)
+
+    if amostras.ndim == 2:
+        if tamanho_janela is not None or passo is not None:
+            raise ValueError("tamanho_janela/passo só se aplicam a buffers 1-D")
+        return amostras
+
+    if amostras.ndim != 1:
+        raise ValueError("Esperado buffer 1-D ou matriz 2-D de janelas")
+    if tamanho_janela is None or tamanho_janela < 1:
+        raise ValueError("tamanho_janela é obrigatório para buffers 1-D")
+
+    passo = tamanho_janela if passo is None else passo
+    if passo < 1:
+        raise ValueError("passo deve ser positivo")
+    if amostras.size < tamanho_janela:
+        return amostras[:0].reshape(0, tamanho_janela)
+
+    return sliding_window_view(amostras, tamanho_janela)[::passo]
+
+
+def estatisticas_janelas(amostras, tamanho_janela=None, passo=None):
+    """
+    Calcula corrente máxima, mínima e média de cada janela.
+
+    Args:
+        amostras (array-like): Matriz 2-D de janelas ou buffer 1-D
+        tamanho_janela (int, opcional): Amostras por janela (buffer 1-D)
+        passo (int, opcional): Deslocamento entre janelas (buffer 1-D)
+
+    Returns:
+        tuple: (maxs, mins, medias), arrays float64 de tamanho n_janelas
+    """
+    janelas = visao_janelas(amostras, tamanho_janela, passo)
+
+    maxs = janelas.max(axis=1).astype(np.float64, copy=False)
+    mins = janelas.min(axis=1).astype(np.float64, copy=False)
+    # Acumular em float64 mesmo quando o DAQ entrega float32
+    medias = janelas.mean(axis=1, dtype=np.float64)
+
+    return maxs, mins, medias
+
+
+def prever_janelas(amostras, tamanho_janela=None, passo=None):
+    """
+    Extrai as estatísticas de cada janela e classifica todas de uma vez.
+
+    Args:
+        amostras (array-like): Matriz 2-D de janelas ou buffer 1-D
+        tamanho_janela (int, opcional): Amostras por janela (buffer 1-D)
+        passo (int, opcional): Deslocamento entre janelas (buffer 1-D)
+
+    Returns:
+        tuple: (classes, prob_baixa, prob_alta), um elemento por janela,
+            como em modelo_predicao.prever_lote()
+    """
+    import modelo_predicao as mp
+
+    maxs, mins, medias = estatisticas_janelas(amostras, tamanho_janela, passo)
+    return mp.prever_lote(maxs, mins, medias)
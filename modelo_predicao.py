@@ -4,22 +4,200 @@
 Módulo Python 3.6+ para predição de potência
 Compatível com LabVIEW Python Node e System Exec
 
+A inferência usa o motor em forma fechada (motor_linear), carregado do
+artefato JSON quando disponível: o caminho quente não importa pandas nem
+sklearn, o que mantém curta a inicialização via System Exec. joblib só é
+importado ao ler o .sav.
+
+Se existir um registro de modelos (registro_modelos/, ver
+registro_modelos.py), a versão apontada por ele tem prioridade e é trocada
+sem reiniciar o processo; cada resultado informa a versão que o produziu.
+
 Autor: Sistema de Classificação de Potência
 Data: Novembro 2025
 """
 
-import joblib
-import pandas as pd
 import os
+import threading
+from time import monotonic
+
+from motor_linear import (
+    ModeloLinear, PreditorUnitario, calcular_atributos, conferir_leitura, razao_max_media,
+    sha256_arquivo,
+)
+from registro_modelos import ARQUIVO_ATUAL, caminho_artefato, ler_ponteiro
 
 
 # Caminho do modelo (ajustar se necessário)
 CAMINHO_MODELO = "modelo_svm_potencia.sav"
 
+# Artefato compacto (JSON, sem pickle) exportado no treinamento
+CAMINHO_ARTEFATO = "modelo_svm_potencia.json"
+
+# Tabela de decisão pré-calculada (gerar_tabela_decisao.py)
+CAMINHO_TABELA = "modelo_svm_potencia_tabela.json"
+FORMATO_TABELA = "tabela-decisao-potencia"
+VERSAO_TABELA = 1
+
+# Registro de modelos versionados, conferido no máximo a cada
+# INTERVALO_REGISTRO segundos (ver usar_registro())
+CAMINHO_REGISTRO = "registro_modelos"
+INTERVALO_REGISTRO = 1.0
+
+# Campo de versão nas saídas de texto (opcional, ver formatar_saida()) para
+# modelos fora do registro
+SEM_VERSAO = "-"
+
+# Ordem dos atributos esperada pelo pipeline treinado
+COLUNAS_ATRIBUTOS = [
+    "corrente_max_A",
+    "corrente_min_A",
+    "corrente_media_A",
+    "amplitude_corrente",
+    "razao_max_media",
+]
+
+# Métricas por etapa (desativadas por padrão; ver ativar_metricas())
+_metricas_ativas = False
+_histogramas = {}
+
+# Memoização de prever() (desativada por padrão; ver ativar_memoizacao())
+_memoizacao = None
+
+# Cache de modelos do processo: (caminho absoluto, carregador) -> (assinatura, modelo)
+_cache_modelos = {}
+_trava_cache = threading.Lock()
+# Motor padrão já conferido: ((assinatura do .json, assinatura do .sav), motor)
+_motor_padrao = None
+
+
+class Predicao(tuple):
+    """
+    Resultado de prever() e prever_lote(): a mesma tupla (classe,
+    prob_baixa, prob_alta), com a versão do modelo que a produziu em
+    `versao` (None para modelos fora do registro).
+    """
+
+    def __new__(cls, resultado, versao):
+        predicao = tuple.__new__(cls, resultado)
+        predicao.versao = versao
+        return predicao
+
+
+class _LeitorRegistro:
+    """
+    Motor da versão atual do registro, conferida a cada `intervalo` s.
+
+    Conferir é um stat do ponteiro ATUAL; o ponteiro e o artefato só são
+    lidos quando ele muda. A troca substitui uma referência: a requisição
+    que já pegou o motor antigo termina com ele e as seguintes usam o
+    novo. Enquanto uma thread lê a versão nova, as outras continuam
+    respondendo com a atual, sem esperar.
+    """
+
+    def __init__(self, pasta, intervalo):
+        self.pasta = pasta
+        self.intervalo = intervalo
+        self._motor = None
+        self._assinatura = None
+        self._proxima = None  # None: nunca conferido
+        self._trava = threading.Lock()
+
+    def limpar(self):
+        with self._trava:
+            self._motor = None
+            self._assinatura = None
+            self._proxima = None
+
+    def motor(self):
+        """Motor da versão atual, ou None se não houver registro."""
+        proxima = self._proxima
+        if proxima is not None and monotonic() < proxima:
+            return self._motor
+        # Só a primeira leitura espera; depois, quem não pega a trava segue
+        # com o motor atual
+        if not self._trava.acquire(blocking=proxima is None):
+            return self._motor
+        try:
+            if self._proxima is proxima:
+                self._conferir()
+        finally:
+            self._trava.release()
+        return self._motor
+
+    def _conferir(self):
+        try:
+            assinatura = _assinatura_arquivo(os.path.join(self.pasta, ARQUIVO_ATUAL))
+        except OSError:
+            # Sem registro (ou ponteiro removido): vale o modelo em arquivo
+            self._motor = self._assinatura = None
+        else:
+            if assinatura != self._assinatura:
+                try:
+                    versao = ler_ponteiro(self.pasta)["versao"]
+                    motor = ModeloLinear.de_artefato(caminho_artefato(versao, self.pasta))
+                except (OSError, ValueError, KeyError):
+                    # Versão ilegível: segue com a atual e tenta na próxima
+                    motor = None
+                if motor is not None:
+                    motor.versao_modelo = versao
+                    self._motor, self._assinatura = motor, assinatura
+        self._proxima = monotonic() + self.intervalo
+
+
+_registro = _LeitorRegistro(CAMINHO_REGISTRO, INTERVALO_REGISTRO)
+
+
+def _assinatura_arquivo(caminho):
+    """
+    Retorna uma assinatura barata do arquivo (mtime em ns, tamanho).
+
+    Usada para detectar que o .sav foi substituído sem precisar relê-lo.
+    """
+    info = os.stat(caminho)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def _carregar_com_cache(caminho, carregador):
+    """
+    Retorna o objeto carregado de `caminho`, relendo só se o arquivo mudou.
+
+    Args:
+        caminho (str): Arquivo a carregar
+        carregador (callable): Função que lê o arquivo (caminho absoluto)
+    """
+    caminho_abs = os.path.abspath(caminho)
+    chave = (caminho_abs, carregador)
+
+    try:
+        assinatura = _assinatura_arquivo(caminho_abs)
+    except OSError:
+        raise FileNotFoundError("Modelo não encontrado: {}".format(caminho))
+
+    entrada = _cache_modelos.get(chave)
+    if entrada is not None and entrada[0] == assinatura:
+        return entrada[1]
+
+    with _trava_cache:
+        # Outra thread pode ter carregado enquanto esperávamos a trava
+        entrada = _cache_modelos.get(chave)
+        if entrada is None or entrada[0] != assinatura:
+            entrada = (assinatura, carregador(caminho_abs))
+            _cache_modelos[chave] = entrada
+
+    return entrada[1]
+
 
-def carregar_modelo():
+def carregar_modelo(caminho=None):
     """
-    Carrega o modelo SVM treinado usando joblib.
+    Carrega o modelo SVM treinado usando joblib, com cache no processo.
+
+    O arquivo só é desserializado na primeira chamada; as seguintes
+    reaproveitam o modelo em memória. Se o mtime ou o tamanho do arquivo
+    mudarem (modelo retreinado), ele é recarregado automaticamente.
+
+    Args:
+        caminho (str, opcional): Caminho do .sav (padrão: CAMINHO_MODELO)
 
     Returns:
         Pipeline: Modelo sklearn Pipeline (StandardScaler + SVC)
@@ -27,11 +205,181 @@ def carregar_modelo():
     Raises:
         FileNotFoundError: Se o arquivo .sav não for encontrado
     """
-    if not os.path.exists(CAMINHO_MODELO):
-        raise FileNotFoundError("Modelo não encontrado: {}".format(CAMINHO_MODELO))
+    return _carregar_com_cache(caminho or CAMINHO_MODELO, _ler_pipeline)
+
+
+def _ler_pipeline(caminho):
+    """Desserializa o .sav (importa joblib/sklearn apenas aqui)."""
+    import joblib
+
+    return joblib.load(caminho)
+
+
+def carregar_artefato(caminho=None):
+    """
+    Carrega o artefato compacto JSON como um ModeloLinear, com cache.
+
+    Não usa pickle nem sklearn: a leitura é apenas um json.load de poucos
+    números, segura mesmo para arquivos de origem não confiável.
+
+    Args:
+        caminho (str, opcional): Caminho do .json (padrão: CAMINHO_ARTEFATO)
+
+    Returns:
+        ModeloLinear: Motor de inferência em forma fechada
+
+    Raises:
+        FileNotFoundError: Se o artefato não for encontrado
+        ValueError: Se o arquivo não for um artefato compatível
+    """
+    return _carregar_com_cache(caminho or CAMINHO_ARTEFATO, ModeloLinear.de_artefato)
+
+
+def carregar_motor(caminho=None):
+    """
+    Retorna o motor de inferência usado por prever() e prever_lote().
+
+    Sem argumento, usa a versão atual do registro de modelos, se houver
+    (ver usar_registro()); senão o artefato JSON (CAMINHO_ARTEFATO), sem
+    pickle nem sklearn, enquanto ele corresponder ao .sav (CAMINHO_MODELO).
+    Se o .sav foi substituído (retreino), os parâmetros vêm do .sav até o
+    artefato ser exportado de novo; nada é gravado aqui. A conferência
+    (SHA-256 do .sav) só se repete quando o mtime ou o tamanho de um dos
+    dois arquivos muda.
+
+    Args:
+        caminho (str, opcional): Artefato .json ou modelo .sav específico
+
+    Returns:
+        ModeloLinear: Motor de inferência em forma fechada
+
+    Raises:
+        FileNotFoundError: Se nem o artefato nem o .sav forem encontrados
+    """
+    if caminho is not None:
+        if caminho.endswith(".json"):
+            return carregar_artefato(caminho)
+        return _carregar_com_cache(caminho, ModeloLinear.de_arquivo)
+
+    if _registro is not None:
+        motor = _registro.motor()
+        if motor is not None:
+            return motor
+    return _carregar_motor_padrao()
+
+
+def _assinatura_ou_none(caminho):
+    """_assinatura_arquivo(), ou None se o arquivo não existe."""
+    try:
+        return _assinatura_arquivo(caminho)
+    except OSError:
+        return None
+
+
+def _artefato_corresponde(motor):
+    """O artefato foi extraído do .sav atual? (SHA-256 do conteúdo)"""
+    if motor.sav_sha256 is None:
+        return False
+    return sha256_arquivo(CAMINHO_MODELO) == motor.sav_sha256
+
+
+def _carregar_motor_padrao():
+    """
+    Artefato JSON se ele ainda corresponde ao .sav; senão o .sav.
+
+    Só lê arquivos: o artefato é gerado no treino/exportação, nunca aqui,
+    então servir predições não altera os arquivos implantados.
+    """
+    global _motor_padrao
+
+    assinaturas = (_assinatura_ou_none(CAMINHO_ARTEFATO), _assinatura_ou_none(CAMINHO_MODELO))
+    conferido = _motor_padrao
+    if conferido is not None and conferido[0] == assinaturas:
+        return conferido[1]
+
+    assinatura_json, assinatura_sav = assinaturas
+    motor = None
+    if assinatura_json is not None:
+        motor = carregar_artefato()
+        if assinatura_sav is not None and not _artefato_corresponde(motor):
+            motor = None
+    if motor is None:
+        motor = _carregar_com_cache(CAMINHO_MODELO, ModeloLinear.de_arquivo)
+
+    _motor_padrao = (assinaturas, motor)
+    return motor
+
+
+def invalidar_modelo(caminho=None):
+    """
+    Remove modelos do cache do processo.
+
+    Args:
+        caminho (str, opcional): Modelo a descartar. Se None, limpa o cache todo.
+    """
+    global _motor_padrao
+
+    if _memoizacao is not None:
+        _memoizacao.limpar()
+    if _registro is not None:
+        _registro.limpar()
+    _motor_padrao = None
+
+    with _trava_cache:
+        if caminho is None:
+            _cache_modelos.clear()
+            return
+
+        caminho_abs = os.path.abspath(caminho)
+        for chave in [c for c in _cache_modelos if c[0] == caminho_abs]:
+            del _cache_modelos[chave]
+
+
+def recarregar_modelo(caminho=None):
+    """
+    Força a releitura do modelo do disco, ignorando o cache.
+
+    Args:
+        caminho (str, opcional): Caminho do .sav (padrão: CAMINHO_MODELO)
+
+    Returns:
+        Pipeline: Modelo recém-carregado
+    """
+    caminho = caminho or CAMINHO_MODELO
+    invalidar_modelo(caminho)
+    return carregar_modelo(caminho)
 
-    modelo = joblib.load(CAMINHO_MODELO)
-    return modelo
+
+def usar_registro(pasta=CAMINHO_REGISTRO, intervalo=INTERVALO_REGISTRO):
+    """
+    Escolhe o registro de modelos consultado por carregar_motor().
+
+    O ponteiro ATUAL é conferido no máximo a cada `intervalo` segundos
+    (um stat); quando muda, a versão nova é lida e passa a atender as
+    requisições seguintes, sem reiniciar o processo e sem bloquear as
+    predições em andamento. Reverter no registro volta ao motor anterior
+    do mesmo jeito.
+
+    Args:
+        pasta (str ou None): Pasta do registro; None desliga o registro
+            (só os arquivos CAMINHO_ARTEFATO/CAMINHO_MODELO)
+        intervalo (float): Segundos entre conferências do ponteiro
+    """
+    global _registro
+
+    if _memoizacao is not None:
+        _memoizacao.limpar()
+    _registro = None if pasta is None else _LeitorRegistro(pasta, float(intervalo))
+
+
+def versao_modelo():
+    """
+    Versão do modelo que atende as predições agora.
+
+    Returns:
+        str ou None: Versão no registro (None para modelos fora dele)
+    """
+    return carregar_motor().versao_modelo
 
 
 def prever(corrente_max, corrente_min, corrente_media):
@@ -46,43 +394,99 @@ def prever(corrente_max, corrente_min, corrente_media):
         corrente_media (float): Corrente média medida em Amperes
 
     Returns:
-        tuple: (classe, prob_baixa, prob_alta)
+        Predicao: (classe, prob_baixa, prob_alta), com a versão do modelo
+            em .versao
             - classe (int): 0 = Baixa Potência, 1 = Alta Potência
             - prob_baixa (float): Probabilidade de Baixa Potência (0-1)
             - prob_alta (float): Probabilidade de Alta Potência (0-1)
 
+    O modelo é avaliado uma única vez e a classe segue as probabilidades:
+    1 se prob_alta >= prob_baixa (empate em 50% → Alta Potência).
+
     Example:
         >>> classe, prob_baixa, prob_alta = prever(1.80, -0.03, 0.67)
         >>> print(classe)  # 1 (Alta Potência)
         >>> print(prob_alta)  # 0.991628
     """
-    # Carregar modelo
-    modelo = carregar_modelo()
-
-    # Calcular atributos derivados
-    amplitude = corrente_max - corrente_min
-    razao = corrente_max / (corrente_media + 1e-6)
-
-    # Criar DataFrame com ordem correta das colunas
-    entrada = pd.DataFrame(
-        [[corrente_max, corrente_min, corrente_media, amplitude, razao]],
-        columns=[
-            "corrente_max_A",
-            "corrente_min_A",
-            "corrente_media_A",
-            "amplitude_corrente",
-            "razao_max_media",
-        ],
+    if _memoizacao is not None:
+        return _memoizacao.prever(
+            float(corrente_max), float(corrente_min), float(corrente_media)
+        )
+    if _metricas_ativas:
+        return _prever_medido(
+            float(corrente_max), float(corrente_min), float(corrente_media)
+        )
+
+    # Obter motor (do cache após a primeira chamada); o mesmo motor
+    # atende a requisição inteira, mesmo que o registro troque de versão
+    motor = carregar_motor()
+
+    return Predicao(
+        motor.prever(float(corrente_max), float(corrente_min), float(corrente_media)),
+        motor.versao_modelo,
     )
 
-    # Fazer predição
-    classe = int(modelo.predict(entrada)[0])
-    probs = modelo.predict_proba(entrada)[0]
 
-    prob_baixa = float(probs[0])
-    prob_alta = float(probs[1])
+def prever_lote(corrente_max, corrente_min, corrente_media):
+    """
+    Faz a predição de um lote de N leituras em uma única passada do modelo.
+
+    Equivalente a chamar prever() para cada leitura, com os atributos e as
+    probabilidades calculados de forma vetorizada.
+
+    Args:
+        corrente_max (array-like): Correntes máximas em Amperes (N,)
+        corrente_min (array-like): Correntes mínimas em Amperes (N,)
+        corrente_media (array-like): Correntes médias em Amperes (N,)
 
-    return classe, prob_baixa, prob_alta
+    Returns:
+        Predicao: (classes, prob_baixa, prob_alta), com a versão do modelo
+            em .versao
+            - classes (numpy.ndarray[int]): 0 = Baixa, 1 = Alta (N,)
+            - prob_baixa (numpy.ndarray[float]): Probabilidades de Baixa (N,)
+            - prob_alta (numpy.ndarray[float]): Probabilidades de Alta (N,)
+
+    Example:
+        >>> classes, prob_baixa, prob_alta = prever_lote(
+        ...     [1.80, 1.13], [-0.03, -0.01], [0.67, 0.47]
+        ... )
+        >>> print(classes)  # [1 0]
+    """
+    if _metricas_ativas:
+        return _prever_lote_medido(corrente_max, corrente_min, corrente_media)
+
+    motor = carregar_motor()
+    return Predicao(
+        motor.prever_lote(corrente_max, corrente_min, corrente_media), motor.versao_modelo
+    )
+
+
+def criar_preditor(caminho=None):
+    """
+    Preditor de uma leitura por vez, sem objetos intermediários por chamada.
+
+    Para o laço do LabVIEW que chama uma leitura por iteração: crie o
+    preditor uma vez e chame preditor.prever(max, min, media) a cada
+    leitura. O motor vem de carregar_motor(caminho) (registro, artefato ou
+    .sav, como prever()) e a versão dele fica em preditor.versao; por
+    chamada não há consulta ao cache nem ao registro. O resultado é sempre
+    a mesma lista preditor.saida ([classe, prob_baixa, prob_alta]),
+    reescrita no lugar.
+
+    Depois de uma troca de versão, preditor.atualizar() volta a consultar
+    carregar_motor(caminho) e passa a usar o modelo atual.
+
+    Args:
+        caminho (str, opcional): Artefato .json ou modelo .sav específico
+
+    Returns:
+        PreditorUnitario: Preditor ligado ao motor de carregar_motor(caminho)
+
+    Example:
+        >>> preditor = criar_preditor()
+        >>> classe, prob_baixa, prob_alta = preditor.prever(1.80, -0.03, 0.67)
+    """
+    return PreditorUnitario(carregar_motor(caminho), resolver=lambda: carregar_motor(caminho))
 
 
 def prever_detalhado(corrente_max, corrente_min, corrente_media):
@@ -102,59 +506,746 @@ def prever_detalhado(corrente_max, corrente_min, corrente_media):
                 'prob_baixa': float (0-1),
                 'prob_alta': float (0-1),
                 'confianca': float (0-1),
+                'decisao': float (> 0 favorece Alta),
                 'amplitude': float,
-                'razao': float
+                'razao': float,
+                'versao_modelo': str ou None
             }
     """
-    classe, prob_baixa, prob_alta = prever(corrente_max, corrente_min, corrente_media)
+    if _metricas_ativas:
+        inicio = _relogio()
+
+    motor = carregar_motor()
+    classe, prob_baixa, prob_alta, decisao = motor.avaliar(
+        float(corrente_max), float(corrente_min), float(corrente_media)
+    )
 
     nome_classe = "Baixa Potência" if classe == 0 else "Alta Potência"
     confianca = prob_baixa if classe == 0 else prob_alta
 
-    return {
+    resultado = {
         "classe": classe,
         "nome_classe": nome_classe,
         "prob_baixa": prob_baixa,
         "prob_alta": prob_alta,
         "confianca": confianca,
+        "decisao": decisao,
         "amplitude": corrente_max - corrente_min,
-        "razao": corrente_max / (corrente_media + 1e-6),
+        "razao": razao_max_media(float(corrente_max), float(corrente_media)),
+        "versao_modelo": motor.versao_modelo,
+    }
+
+    if _metricas_ativas:
+        _registrar("prever_detalhado/total", _relogio() - inicio)
+
+    return resultado
+
+
+# ==============================================================================
+# MÉTRICAS POR ETAPA
+# ==============================================================================
+
+
+class _Histograma:
+    """
+    Histograma log-linear de durações em nanossegundos.
+
+    Cada potência de 2 é dividida em 8 faixas (erro relativo <= 12,5%),
+    então registrar custa O(1) e a memória é fixa, independente do número
+    de chamadas.
+    """
+
+    __slots__ = ("chamadas", "itens", "soma_ns", "maximo_ns", "faixas")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.itens = 0
+        self.soma_ns = 0
+        self.maximo_ns = 0
+        self.faixas = [0] * 512
+
+    def registrar(self, ns, itens=1):
+        self.chamadas += 1
+        self.itens += itens
+        self.soma_ns += ns
+        if ns > self.maximo_ns:
+            self.maximo_ns = ns
+
+        if ns < 8:
+            indice = max(ns, 0)
+        else:
+            bits = ns.bit_length()
+            indice = (bits - 3) * 8 + ((ns >> (bits - 4)) - 8)
+        self.faixas[indice] += 1
+
+    def percentil(self, q):
+        """Limite superior (ns) da faixa que contém o percentil q (0-100)."""
+        alvo = q / 100.0 * self.chamadas
+        acumulado = 0
+        for indice, contagem in enumerate(self.faixas):
+            acumulado += contagem
+            if contagem and acumulado >= alvo:
+                if indice < 8:
+                    return indice
+                bits = indice // 8 + 3
+                limite = ((8 + indice % 8 + 1) << (bits - 4)) - 1
+                return min(limite, self.maximo_ns)
+        return self.maximo_ns
+
+
+def _relogio():
+    import time
+
+    return time.perf_counter_ns()
+
+
+def _registrar(etapa, ns, itens=1):
+    histograma = _histogramas.get(etapa)
+    if histograma is None:
+        histograma = _histogramas.setdefault(etapa, _Histograma())
+    histograma.registrar(ns, itens)
+
+
+def _prever_medido(corrente_max, corrente_min, corrente_media):
+    """prever() com cronômetro em cada etapa."""
+    t0 = _relogio()
+    motor = carregar_motor()
+    t1 = _relogio()
+    decisao = motor.decisao(corrente_max, corrente_min, corrente_media)
+    t2 = _relogio()
+    prob_baixa, prob_alta = motor.probabilidades(decisao)
+    classe = motor.classificar(prob_baixa, prob_alta)
+    t3 = _relogio()
+
+    _registrar("prever/carregar_motor", t1 - t0)
+    _registrar("prever/decisao", t2 - t1)
+    _registrar("prever/probabilidades", t3 - t2)
+    _registrar("prever/total", t3 - t0)
+    return Predicao((classe, prob_baixa, prob_alta), motor.versao_modelo)
+
+
+def _prever_lote_medido(corrente_max, corrente_min, corrente_media):
+    """prever_lote() com cronômetro em cada etapa."""
+    t0 = _relogio()
+    motor = carregar_motor()
+    t1 = _relogio()
+    atributos = calcular_atributos(corrente_max, corrente_min, corrente_media)
+    t2 = _relogio()
+    decisoes = motor.decisao_lote(atributos)
+    t3 = _relogio()
+    prob_baixa, prob_alta = motor.probabilidades_lote(decisoes)
+    classes = motor.classificar_lote(prob_baixa, prob_alta)
+    t4 = _relogio()
+
+    n = len(atributos)
+    _registrar("prever_lote/carregar_motor", t1 - t0)
+    _registrar("prever_lote/atributos", t2 - t1, n)
+    _registrar("prever_lote/decisao", t3 - t2, n)
+    _registrar("prever_lote/probabilidades", t4 - t3, n)
+    _registrar("prever_lote/total", t4 - t0, n)
+    return Predicao((classes, prob_baixa, prob_alta), motor.versao_modelo)
+
+
+def ativar_metricas(ativo=True):
+    """
+    Liga ou desliga a medição de tempo por etapa.
+
+    Desligada (padrão), o custo em prever()/prever_lote() é apenas a
+    verificação de um booleano, então pode ficar no código de produção.
+
+    Args:
+        ativo (bool): True para medir
+    """
+    global _metricas_ativas
+    _metricas_ativas = bool(ativo)
+
+
+def zerar_metricas():
+    """Descarta todas as medições acumuladas."""
+    _histogramas.clear()
+
+
+def metricas():
+    """
+    Retorna um retrato das medições por etapa.
+
+    Etapas: "prever/{carregar_motor,decisao,probabilidades,total}",
+    "prever_lote/{carregar_motor,atributos,decisao,probabilidades,total}"
+    e "prever_detalhado/total".
+
+    Returns:
+        dict: {etapa: {'chamadas', 'itens', 'media_us', 'p50_us', 'p95_us',
+            'p99_us', 'max_us'}}
+
+    Example:
+        >>> ativar_metricas()
+        >>> prever(1.80, -0.03, 0.67)
+        >>> metricas()["prever/total"]["p99_us"]
+    """
+    retrato = {}
+    for etapa, h in sorted(list(_histogramas.items())):
+        if not h.chamadas:
+            continue
+        retrato[etapa] = {
+            "chamadas": h.chamadas,
+            "itens": h.itens,
+            "media_us": h.soma_ns / h.chamadas / 1000.0,
+            "p50_us": h.percentil(50) / 1000.0,
+            "p95_us": h.percentil(95) / 1000.0,
+            "p99_us": h.percentil(99) / 1000.0,
+            "max_us": h.maximo_ns / 1000.0,
+        }
+    return retrato
+
+
+# ==============================================================================
+# MEMOIZAÇÃO (opcional)
+# ==============================================================================
+
+
+class _Memoizacao:
+    """
+    LRU de resultados de prever() indexado pelas leituras quantizadas.
+
+    O resultado é calculado sobre a leitura já arredondada para a grade
+    (múltiplos de `resolucao`), então todas as leituras que caem na mesma
+    célula recebem exatamente a mesma resposta, venha ela do cache ou não.
+
+    Acertos não consultam o disco: o motor em uso é conferido no máximo a
+    cada `intervalo` segundos (e em cada falha). Se ele mudou (modelo
+    retreinado), o cache é esvaziado.
+    """
+
+    def __init__(self, resolucao, capacidade, intervalo):
+        from collections import OrderedDict
+        from time import monotonic
+
+        self.resolucao = resolucao
+        self.capacidade = capacidade
+        self.intervalo = intervalo
+        self._escala = 1.0 / resolucao
+        self._relogio = monotonic
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+        self._motor = None
+        self._proxima_verificacao = 0.0
+
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self._motor = None
+
+    def _motor_atual(self):
+        motor = carregar_motor()
+        if motor is not self._motor:
+            self._itens.clear()
+            self._motor = motor
+        self._proxima_verificacao = self._relogio() + self.intervalo
+        return motor
+
+    def prever(self, corrente_max, corrente_min, corrente_media):
+        escala = self._escala
+        try:
+            chave = (
+                round(corrente_max * escala),
+                round(corrente_min * escala),
+                round(corrente_media * escala),
+            )
+        except (ValueError, OverflowError):
+            # NaN/inf: mesma recusa (ValueError) do motor
+            conferir_leitura(corrente_max, corrente_min, corrente_media)
+            raise
+
+        with self._trava:
+            if self._relogio() >= self._proxima_verificacao:
+                self._motor_atual()
+
+            resultado = self._itens.get(chave)
+            if resultado is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return resultado
+
+            self.falhas += 1
+            motor = self._motor_atual()
+            resolucao = self.resolucao
+            resultado = Predicao(
+                motor.prever(
+                    chave[0] * resolucao, chave[1] * resolucao, chave[2] * resolucao
+                ),
+                motor.versao_modelo,
+            )
+
+            self._itens[chave] = resultado
+            if len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+                self.descartes += 1
+            return resultado
+
+
+def ativar_memoizacao(resolucao=0.01, capacidade=65536, intervalo=1.0):
+    """
+    Liga o cache LRU de resultados na frente de prever().
+
+    As leituras são arredondadas para múltiplos de `resolucao` antes da
+    inferência; em linhas em regime, onde as mesmas leituras se repetem, a
+    maior parte das chamadas vira uma consulta a dicionário. Reativar
+    descarta o cache e os contadores.
+
+    Args:
+        resolucao (float): Passo da quantização, em A (padrão: 0.01, a
+            resolução do dataset)
+        capacidade (int): Máximo de leituras distintas guardadas
+        intervalo (float): Segundos entre conferências do modelo em disco
+
+    Raises:
+        ValueError: Se resolucao ou capacidade não forem positivas
+    """
+    global _memoizacao
+
+    if resolucao <= 0:
+        raise ValueError("resolucao deve ser positiva")
+    if capacidade < 1:
+        raise ValueError("capacidade deve ser positiva")
+    _memoizacao = _Memoizacao(float(resolucao), int(capacidade), float(intervalo))
+
+
+def desativar_memoizacao():
+    """Desliga o cache de resultados e o descarta."""
+    global _memoizacao
+    _memoizacao = None
+
+
+def estatisticas_memoizacao():
+    """
+    Retorna os contadores do cache de resultados.
+
+    Returns:
+        dict ou None: {'acertos', 'falhas', 'descartes', 'tamanho',
+            'capacidade', 'resolucao', 'taxa_acerto'}; None se desativado
+    """
+    memo = _memoizacao
+    if memo is None:
+        return None
+
+    consultas = memo.acertos + memo.falhas
+    return {
+        "acertos": memo.acertos,
+        "falhas": memo.falhas,
+        "descartes": memo.descartes,
+        "tamanho": len(memo._itens),
+        "capacidade": memo.capacidade,
+        "resolucao": memo.resolucao,
+        "taxa_acerto": memo.acertos / consultas if consultas else 0.0,
     }
 
 
+# ==============================================================================
+# TABELA DE DECISÃO PRÉ-CALCULADA
+# ==============================================================================
+
+
+class TabelaDecisao:
+    """
+    Resultado do modelo para toda a grade de leituras, lido via np.memmap.
+
+    As correntes são limitadas e quantizadas (0,01 A), então o resultado
+    de cada combinação (max, min, media) alcançável pode ser calculado uma
+    vez por gerar_tabela_decisao.py. A consulta arredonda a leitura para a
+    grade e lê duas posições do arquivo mapeado: O(1), sem inferência.
+
+    Por célula: classe (uint8) e prob_alta quantizada em uint16 (erro
+    <= 1 / (2 * escala_prob) ≈ 7.6e-6); prob_baixa = 1 - prob_alta. Só as
+    páginas consultadas do arquivo são carregadas em memória.
+
+    Leituras fora da grade (ou NaN) são respondidas pelo motor embutido no
+    cabeçalho da tabela, o mesmo que a gerou. `modelo_sha256` é o hash do
+    .sav que gerou a tabela e `verificada` diz se ela passou na verificação
+    de gerar_tabela_decisao.py; carregar_tabela() confere os dois.
+    """
+
+    def __init__(self, dados, eixos, escala_prob, motor, modelo_sha256=None,
+                 verificada=False):
+        self.eixos = eixos
+        self.escala_prob = escala_prob
+        self.motor = motor
+        self.modelo_sha256 = modelo_sha256
+        self.verificada = verificada
+        self._classe = dados["classe"]
+        self._prob = dados["prob_alta"]
+
+        (self._x0, self._ix, self._nx), (self._y0, self._iy, self._ny), (
+            self._z0, self._iz, self._nz
+        ) = [(e["inicio"], 1.0 / e["passo"], e["n"]) for e in eixos]
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        """
+        Abre a tabela a partir do cabeçalho JSON (os dados vêm do .npy).
+
+        Raises:
+            ValueError: Se o cabeçalho não for de uma tabela compatível
+        """
+        import json
+
+        import numpy as np
+
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            cabecalho = json.load(arquivo)
+
+        if cabecalho.get("formato") != FORMATO_TABELA:
+            raise ValueError("Tabela de formato desconhecido: {}".format(caminho))
+        if cabecalho.get("versao") != VERSAO_TABELA:
+            raise ValueError(
+                "Versão de tabela não suportada: {} (esperada {})".format(
+                    cabecalho.get("versao"), VERSAO_TABELA
+                )
+            )
+
+        caminho_dados = os.path.join(os.path.dirname(caminho), cabecalho["dados"])
+        dados = np.load(caminho_dados, mmap_mode="r")
+        forma = tuple(e["n"] for e in cabecalho["eixos"])
+        if dados.shape != forma:
+            raise ValueError(
+                "Tabela {} com forma {} (cabeçalho diz {})".format(
+                    caminho_dados, dados.shape, forma
+                )
+            )
+
+        return cls(
+            dados,
+            cabecalho["eixos"],
+            cabecalho["escala_prob"],
+            ModeloLinear.de_dict(cabecalho["modelo"], origem=caminho),
+            modelo_sha256=cabecalho.get("modelo_sha256"),
+            verificada=(cabecalho.get("verificacao") or {}).get("ok") is True,
+        )
+
+    def prever(self, corrente_max, corrente_min, corrente_media):
+        """
+        Mesmo contrato de prever(), respondido pela tabela.
+
+        Returns:
+            tuple: (classe, prob_baixa, prob_alta)
+        """
+        i = (corrente_max - self._x0) * self._ix
+        j = (corrente_min - self._y0) * self._iy
+        k = (corrente_media - self._z0) * self._iz
+
+        # Comparações falsas para NaN: cai no motor
+        if (
+            -0.5 <= i < self._nx - 0.5
+            and -0.5 <= j < self._ny - 0.5
+            and -0.5 <= k < self._nz - 0.5
+        ):
+            i, j, k = int(i + 0.5), int(j + 0.5), int(k + 0.5)
+            prob_alta = int(self._prob[i, j, k]) / self.escala_prob
+            return int(self._classe[i, j, k]), 1.0 - prob_alta, prob_alta
+
+        return self.motor.prever(corrente_max, corrente_min, corrente_media)
+
+    def prever_lote(self, corrente_max, corrente_min, corrente_media):
+        """
+        Mesmo contrato de prever_lote(), respondido pela tabela.
+
+        Returns:
+            tuple: (classes, prob_baixa, prob_alta) como arrays (N,)
+        """
+        import numpy as np
+
+        maxs = np.asarray(corrente_max, dtype=np.float64).ravel()
+        mins = np.asarray(corrente_min, dtype=np.float64).ravel()
+        medias = np.asarray(corrente_media, dtype=np.float64).ravel()
+
+        indices = []
+        dentro = np.ones(maxs.shape, dtype=bool)
+        for valores, (inicio, inverso, n) in zip(
+            (maxs, mins, medias),
+            ((self._x0, self._ix, self._nx), (self._y0, self._iy, self._ny),
+             (self._z0, self._iz, self._nz)),
+        ):
+            posicao = (valores - inicio) * inverso
+            dentro &= (posicao >= -0.5) & (posicao < n - 0.5)
+            indices.append(posicao)
+
+        i, j, k = (
+            np.floor(np.where(dentro, p, 0.0) + 0.5).astype(np.intp) for p in indices
+        )
+        classes = self._classe[i, j, k].astype(np.int64)
+        prob_alta = self._prob[i, j, k] / float(self.escala_prob)
+
+        if not dentro.all():
+            fora = ~dentro
+            classes[fora], _, prob_alta[fora] = self.motor.prever_lote(
+                maxs[fora], mins[fora], medias[fora]
+            )
+
+        return classes, 1.0 - prob_alta, prob_alta
+
+
+def carregar_tabela(caminho=None):
+    """
+    Abre a tabela de decisão pré-calculada, com cache no processo.
+
+    O `modelo_sha256` do cabeçalho precisa ser o hash do .sav do modelo
+    que carregar_motor() serve agora (inclusive a versão ativa do registro)
+    e a verificação gravada por gerar_tabela_decisao.py precisa ter
+    passado: uma tabela de outro modelo, ou que divergiu do pipeline, é
+    recusada.
+
+    Args:
+        caminho (str, opcional): Cabeçalho .json (padrão: CAMINHO_TABELA)
+
+    Returns:
+        TabelaDecisao: Motor de consulta
+
+    Raises:
+        FileNotFoundError: Se a tabela não foi gerada
+        ValueError: Se a tabela foi gerada por outro modelo ou não passou
+            na verificação
+    """
+    return _tabela_do_motor(caminho, carregar_motor())
+
+
+def _tabela_do_motor(caminho, motor):
+    """carregar_tabela() conferida contra um motor já resolvido."""
+    tabela = _carregar_com_cache(caminho or CAMINHO_TABELA, TabelaDecisao.de_arquivo)
+    if not tabela.verificada:
+        raise ValueError(
+            "Tabela {} sem verificação aprovada; gere de novo com "
+            "gerar_tabela_decisao.py".format(caminho or CAMINHO_TABELA)
+        )
+    modelo_sha256 = motor.sav_sha256
+    if modelo_sha256 is None or tabela.modelo_sha256 != modelo_sha256:
+        raise ValueError(
+            "Tabela {} gerada por outro modelo (sha256 {}, modelo atual {}, versão {}); "
+            "gere de novo com gerar_tabela_decisao.py".format(
+                caminho or CAMINHO_TABELA, tabela.modelo_sha256, modelo_sha256,
+                motor.versao_modelo,
+            )
+        )
+    return tabela
+
+
+def prever_tabela(corrente_max, corrente_min, corrente_media):
+    """
+    prever() respondido pela tabela de decisão (O(1), sem inferência).
+
+    A leitura é arredondada para a grade da tabela (0,01 A por padrão);
+    leituras fora da grade usam o modelo. Se a tabela não é do modelo que
+    prever() usa agora (outro .sav, versão do registro de outro modelo) ou
+    é incompatível, a leitura é respondida por esse modelo, como prever().
+
+    Returns:
+        Predicao: (classe, prob_baixa, prob_alta), com a versão do modelo
+            em .versao
+    """
+    motor = carregar_motor()
+    try:
+        consulta = _tabela_do_motor(None, motor)
+    except ValueError:
+        consulta = motor
+    return Predicao(
+        consulta.prever(float(corrente_max), float(corrente_min), float(corrente_media)),
+        motor.versao_modelo,
+    )
+
+
 # ==============================================================================
 # FUNÇÕES PARA USO VIA LINHA DE COMANDO (System Exec.vi)
 # ==============================================================================
 
 
+def interpretar_linha(linha):
+    """
+    Converte uma linha de texto "max|min|media" nos três valores de corrente.
+
+    Aceita "|" ou "," como separador, para atender tanto o protocolo do
+    servidor quanto registros CSV.
+
+    Args:
+        linha (str): Linha com os três valores
+
+    Returns:
+        tuple: (corrente_max, corrente_min, corrente_media) como floats
+
+    Raises:
+        ValueError: Se a linha não tiver exatamente 3 valores numéricos
+    """
+    campos = linha.strip().replace(",", "|").split("|")
+    if len(campos) != 3:
+        raise ValueError("3 valores necessários (max|min|media): {!r}".format(linha))
+    return float(campos[0]), float(campos[1]), float(campos[2])
+
+
+def formatar_saida(classe, prob_baixa, prob_alta, versao=None):
+    """
+    Formata o resultado no protocolo de linha usado pelo LabVIEW.
+
+    O campo de versão é opcional (--versao nas CLIs, comando VERSAO no
+    servidor): sem ele a linha continua com os três campos de sempre.
+
+    Args:
+        versao (str, opcional): Versão do modelo, anexada como quarto campo
+
+    Returns:
+        str: "CLASSE|PROB_BAIXA|PROB_ALTA" ou "CLASSE|PROB_BAIXA|PROB_ALTA|VERSAO"
+    """
+    if versao is None:
+        return "{}|{:.6f}|{:.6f}".format(classe, prob_baixa, prob_alta)
+    return "{}|{:.6f}|{:.6f}|{}".format(classe, prob_baixa, prob_alta, versao)
+
+
+def _responder_lote(linhas, motor, com_versao=False):
+    """
+    Pontua um micro-lote de linhas de texto de uma só vez.
+
+    Cada linha recebe exatamente uma linha de saída, na mesma posição:
+    linhas vazias ou inválidas, e leituras que o motor recusa, recebem
+    "ERRO: ..." sem afetar as demais.
+
+    Args:
+        com_versao (bool): Anexa a versão do motor a cada resultado
+
+    Returns:
+        list: Linhas de saída, na ordem das entradas
+    """
+    versao = (motor.versao_modelo or SEM_VERSAO) if com_versao else None
+    respostas = [None] * len(linhas)
+    posicoes = []
+    leituras = []
+
+    for i, linha in enumerate(linhas):
+        try:
+            leituras.append(interpretar_linha(linha))
+            posicoes.append(i)
+        except Exception as e:
+            respostas[i] = "ERRO: {}".format(e)
+
+    if leituras:
+        try:
+            maxs, mins, medias = zip(*leituras)
+            classes, probs_baixa, probs_alta = motor.prever_lote(maxs, mins, medias)
+            for i, classe, prob_baixa, prob_alta in zip(
+                posicoes, classes.tolist(), probs_baixa.tolist(), probs_alta.tolist()
+            ):
+                respostas[i] = formatar_saida(classe, prob_baixa, prob_alta, versao)
+        except Exception:
+            # Uma leitura recusada não derruba o micro-lote: cada uma à parte
+            for i, leitura in zip(posicoes, leituras):
+                try:
+                    respostas[i] = formatar_saida(*motor.prever(*leitura), versao=versao)
+                except Exception as e:
+                    respostas[i] = "ERRO: {}".format(e)
+
+    return respostas
+
+
+def processar_fluxo(fd_entrada=None, saida=None, tamanho_bloco=1 << 16, com_versao=False):
+    """
+    Modo contínuo: lê registros "max,min,media" e responde um por linha.
+
+    Cada os.read() devolve tudo o que já chegou ao pipe (até tamanho_bloco
+    bytes) sem esperar por mais dados. Esse bloco vira um micro-lote:
+    interativamente (LabVIEW enviando uma leitura por vez) a resposta sai
+    logo, e ao redirecionar um arquivo de log os lotes ficam grandes.
+    A saída é descarregada (flush) após cada micro-lote. Linhas vazias ou
+    inválidas recebem "ERRO: ..." e o processamento continua.
+
+    Args:
+        fd_entrada (int, opcional): Descritor de entrada (padrão: stdin)
+        saida (file, opcional): Arquivo de texto de saída (padrão: stdout)
+        tamanho_bloco (int): Bytes lidos por chamada
+        com_versao (bool): Anexa a versão do modelo a cada resultado
+            ("CLASSE|PROB_BAIXA|PROB_ALTA|VERSAO")
+
+    Returns:
+        int: Número de registros processados
+    """
+    import sys
+
+    if fd_entrada is None:
+        fd_entrada = sys.stdin.fileno()
+    if saida is None:
+        saida = sys.stdout
+
+    # Falha cedo se não houver modelo; cada micro-lote pega o motor atual
+    # (uma versão nova do registro entra entre dois lotes)
+    carregar_motor()
+    pendente = b""
+    total = 0
+
+    while True:
+        bloco = os.read(fd_entrada, tamanho_bloco)
+        if bloco:
+            pendente += bloco
+            corte = pendente.rfind(b"\n") + 1
+            if corte == 0:
+                continue
+            completas, pendente = pendente[:corte], pendente[corte:]
+        else:
+            # EOF: processa a última linha, mesmo sem "\n" final
+            completas, pendente = pendente, b""
+
+        # Uma resposta por linha, inclusive vazia (ERRO): a saída fica
+        # alinhada com a entrada
+        linhas = completas.decode("utf-8", errors="replace").splitlines()
+        if linhas:
+            saida.write("\n".join(_responder_lote(linhas, carregar_motor(), com_versao)) + "\n")
+            saida.flush()
+            total += len(linhas)
+
+        if not bloco:
+            return total
+
+
 def main_linha_comando():
     """
     Função principal para uso via System Exec.vi do LabVIEW.
 
     Uso:
-        python3 modelo_predicao.py <corrente_max> <corrente_min> <corrente_media>
+        python3 modelo_predicao.py [--versao] <corrente_max> <corrente_min> <corrente_media>
+        python3 modelo_predicao.py --stream [--versao] < leituras.csv
 
     Saída:
-        CLASSE|PROB_BAIXA|PROB_ALTA (formato CSV com pipe)
+        CLASSE|PROB_BAIXA|PROB_ALTA (formato CSV com pipe); com --versao,
+        CLASSE|PROB_BAIXA|PROB_ALTA|VERSAO ("-" fora do registro)
+
+    No modo --stream, cada linha "max,min,media" da entrada padrão produz
+    uma linha de saída, até o fim da entrada.
     """
     import sys
 
-    if len(sys.argv) != 4:
+    argumentos = [a for a in sys.argv[1:] if a != "--versao"]
+    com_versao = len(argumentos) != len(sys.argv) - 1
+
+    if argumentos == ["--stream"]:
+        try:
+            processar_fluxo(com_versao=com_versao)
+        except Exception as e:
+            print("ERRO: {}".format(e))
+            sys.exit(1)
+        sys.exit(0)
+
+    if len(argumentos) != 3:
         print("ERRO: 3 argumentos necessários")
-        print("Uso: python3 {} <max> <min> <media>".format(sys.argv[0]))
+        print("Uso: python3 {} [--versao] <max> <min> <media>".format(sys.argv[0]))
         sys.exit(1)
 
     try:
-        corrente_max = float(sys.argv[1])
-        corrente_min = float(sys.argv[2])
-        corrente_media = float(sys.argv[3])
+        corrente_max = float(argumentos[0])
+        corrente_min = float(argumentos[1])
+        corrente_media = float(argumentos[2])
 
-        classe, prob_baixa, prob_alta = prever(
-            corrente_max, corrente_min, corrente_media
-        )
+        predicao = prever(corrente_max, corrente_min, corrente_media)
+        versao = (predicao.versao or SEM_VERSAO) if com_versao else None
 
         # Saída formatada para LabVIEW
-        print("{}|{:.6f}|{:.6f}".format(classe, prob_baixa, prob_alta))
+        print(formatar_saida(*predicao, versao=versao))
         sys.exit(0)
 
     except Exception as e:
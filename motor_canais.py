@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Predição de vários canais (circuitos) por chamada, com estado por canal.
+
+Em vez de um laço do LabVIEW e uma chamada a prever() por circuito, uma
+única chamada recebe a matriz de leituras de todos os canais
+(n_canais x 3: max, min, media) e avalia tudo em uma passada vetorizada
+do motor. O custo cresce com o número de leituras, não com o número de
+chamadas ao interpretador.
+
+O estado de cada canal fica em arrays NumPy, uma posição por canal
+(struct-of-arrays, sem um objeto por canal):
+
+    classe          int8     última classe (-1: ainda sem leitura)
+    prob_alta       float64  última prob_alta
+    prob_suavizada  float64  média exponencial de prob_alta
+    regime          int8     regime com histerese (-1: ainda sem leitura)
+    leituras        int64    leituras válidas processadas
+    altas           int64    leituras classificadas como Alta Potência
+    transicoes      int64    mudanças de regime
+    invalidas       int64    leituras ignoradas (NaN/inf)
+
+A suavização e a histerese são as do DetectorRegime (sem o tempo de
+permanência): a primeira leitura define o regime; depois, Baixa → Alta
+quando a prob_alta suavizada chega a limiar_alta e Alta → Baixa quando
+cai a limiar_baixa. Uma linha com NaN (canal desligado ou sem dado
+naquele ciclo) não altera o estado do canal.
+
+Exemplo:
+    >>> from motor_canais import MotorCanais
+    >>> canais = MotorCanais(48)
+    >>> classes, prob_baixa, prob_alta = canais.atualizar(leituras)  # (48 x 3)
+    >>> canais.regime, canais.transicoes     # estado por canal
+    >>> np.flatnonzero(canais.mudaram)       # canais que mudaram de regime
+"""
+
+import numpy as np
+
+from modelo_predicao import Predicao, carregar_motor
+
+
+class MotorCanais:
+    """
+    Motor de inferência multicanal com estado struct-of-arrays.
+
+    Args:
+        n_canais (int): Número de canais (linhas da matriz de leituras)
+        alfa (float): Peso da leitura nova na média exponencial (0 < alfa
+            <= 1; 1 = sem suavização)
+        limiar_alta (float): prob_alta suavizada para entrar em Alta
+        limiar_baixa (float): prob_alta suavizada para voltar a Baixa
+        motor (ModeloLinear, opcional): Motor fixo. Se omitido, usa
+            carregar_motor() a cada chamada (acompanha o registro de
+            modelos e o modelo retreinado)
+
+    Raises:
+        ValueError: Se os parâmetros forem inconsistentes
+    """
+
+    def __init__(self, n_canais, alfa=0.3, limiar_alta=0.7, limiar_baixa=0.3, motor=None):
+        if n_canais < 1:
+            raise ValueError("n_canais deve ser positivo")
+        if not 0.0 <= limiar_baixa <= limiar_alta <= 1.0:
+            raise ValueError("Esperado 0 <= limiar_baixa <= limiar_alta <= 1")
+        if not 0.0 < alfa <= 1.0:
+            raise ValueError("alfa deve estar em (0, 1]")
+
+        self.n_canais = int(n_canais)
+        self.alfa = float(alfa)
+        self.limiar_alta = float(limiar_alta)
+        self.limiar_baixa = float(limiar_baixa)
+        self.motor = motor
+
+        n = self.n_canais
+        self.classe = np.empty(n, dtype=np.int8)
+        self.prob_alta = np.empty(n, dtype=np.float64)
+        self.prob_suavizada = np.empty(n, dtype=np.float64)
+        self.regime = np.empty(n, dtype=np.int8)
+        self.leituras = np.empty(n, dtype=np.int64)
+        self.altas = np.empty(n, dtype=np.int64)
+        self.transicoes = np.empty(n, dtype=np.int64)
+        self.invalidas = np.empty(n, dtype=np.int64)
+        # Canais que mudaram de regime na última chamada
+        self.mudaram = np.empty(n, dtype=bool)
+        self.reiniciar()
+
+    def reiniciar(self, canais=None):
+        """
+        Descarta o estado (todos os canais, ou só os indicados).
+
+        Args:
+            canais (array-like, opcional): Índices (ou máscara) dos canais
+        """
+        idx = slice(None) if canais is None else canais
+        self.classe[idx] = -1
+        self.prob_alta[idx] = np.nan
+        self.prob_suavizada[idx] = np.nan
+        self.regime[idx] = -1
+        self.leituras[idx] = 0
+        self.altas[idx] = 0
+        self.transicoes[idx] = 0
+        self.invalidas[idx] = 0
+        self.mudaram[idx] = False
+
+    def atualizar(self, leituras):
+        """
+        Avalia uma leitura de cada canal e atualiza o estado.
+
+        Args:
+            leituras (array-like): Matriz (n_canais x 3): max, min, media
+
+        Returns:
+            Predicao: (classes, prob_baixa, prob_alta) por canal (n_canais,);
+                canais com leitura inválida recebem classe -1 e NaN
+
+        Raises:
+            ValueError: Se a matriz não for (n_canais x 3)
+        """
+        leituras = np.asarray(leituras, dtype=np.float64)
+        if leituras.shape != (self.n_canais, 3):
+            raise ValueError("Esperada matriz ({} x 3), recebida {}".format(
+                self.n_canais, leituras.shape))
+        classes, prob_baixa, prob_alta = resultado = self.atualizar_bloco(leituras[None])
+        return Predicao((classes[0], prob_baixa[0], prob_alta[0]), resultado.versao)
+
+    def atualizar_bloco(self, leituras):
+        """
+        Avalia vários ciclos de uma vez (T x n_canais x 3), em ordem.
+
+        Todas as T x n_canais leituras passam juntas pelo motor; só a
+        atualização do estado percorre os T ciclos (vetorizada nos canais).
+        Equivale a chamar atualizar() para cada ciclo; `mudaram` marca os
+        canais que mudaram de regime em algum ciclo do bloco.
+
+        Returns:
+            Predicao: (classes, prob_baixa, prob_alta), arrays (T, n_canais)
+
+        Raises:
+            ValueError: Se o bloco não for (T x n_canais x 3)
+        """
+        leituras = np.asarray(leituras, dtype=np.float64)
+        if leituras.ndim != 3 or leituras.shape[1:] != (self.n_canais, 3):
+            raise ValueError("Esperado bloco (T x {} x 3), recebido {}".format(
+                self.n_canais, leituras.shape))
+
+        motor = self.motor if self.motor is not None else carregar_motor()
+        ciclos = leituras.shape[0]
+        planas = leituras.reshape(-1, 3)
+        validas = np.isfinite(planas).all(axis=1)
+
+        classes = np.full(planas.shape[0], -1, dtype=np.int64)
+        prob_baixa = np.full(planas.shape[0], np.nan)
+        prob_alta = np.full(planas.shape[0], np.nan)
+        # Uma passada do motor para o bloco inteiro (só as linhas válidas)
+        idx = slice(None) if validas.all() else np.flatnonzero(validas)
+        lidas = planas[idx]
+        if len(lidas):
+            classes[idx], prob_baixa[idx], prob_alta[idx] = motor.prever_lote(
+                lidas[:, 0], lidas[:, 1], lidas[:, 2]
+            )
+
+        classes = classes.reshape(ciclos, self.n_canais)
+        prob_baixa = prob_baixa.reshape(ciclos, self.n_canais)
+        prob_alta = prob_alta.reshape(ciclos, self.n_canais)
+        validas = validas.reshape(ciclos, self.n_canais)
+
+        self.mudaram[:] = False
+        for t in range(ciclos):
+            self._atualizar_estado(validas[t], classes[t], prob_alta[t])
+        return Predicao((classes, prob_baixa, prob_alta), motor.versao_modelo)
+
+    def _atualizar_estado(self, validas, classes, prob_alta):
+        """Um ciclo: suavização, histerese e contadores dos canais válidos."""
+        if validas.all():
+            idx = slice(None)
+        else:
+            self.invalidas[~validas] += 1
+            idx = np.flatnonzero(validas)
+            classes, prob_alta = classes[idx], prob_alta[idx]
+
+        regime = self.regime[idx]
+        p = self.prob_suavizada[idx]
+        novos = regime < 0
+        p = np.where(novos, prob_alta, p + self.alfa * (prob_alta - p))
+        mudou = ((regime == 0) & (p >= self.limiar_alta)) | \
+                ((regime == 1) & (p <= self.limiar_baixa))
+        regime = np.where(novos, prob_alta >= 0.5, np.where(mudou, 1 - regime, regime))
+
+        self.classe[idx] = classes
+        self.prob_alta[idx] = prob_alta
+        self.prob_suavizada[idx] = p
+        self.regime[idx] = regime
+        self.leituras[idx] += 1
+        self.altas[idx] += classes == 1
+        self.transicoes[idx] += mudou
+        self.mudaram[idx] |= mudou
+
+    def estado(self):
+        """
+        Retrato do estado por canal, em listas (JSON/LabVIEW).
+
+        Returns:
+            dict: {'classe', 'prob_alta', 'prob_suavizada', 'regime',
+                'leituras', 'altas', 'transicoes', 'invalidas'}
+        """
+        return {
+            nome: getattr(self, nome).tolist()
+            for nome in ("classe", "prob_alta", "prob_suavizada", "regime",
+                         "leituras", "altas", "transicoes", "invalidas")
+        }
+
+
+# Motor multicanal do processo, para o LabVIEW Python Node
+_canais = None
+
+
+def prever_canais(leituras):
+    """
+    Função para o LabVIEW Python Node: uma matriz, todos os canais.
+
+    Mantém um MotorCanais por processo, criado na primeira chamada (e
+    recriado se o número de canais mudar).
+
+    Args:
+        leituras (array-like): Matriz (n_canais x 3): max, min, media
+
+    Returns:
+        tuple: (classes, prob_baixa, prob_alta, regimes) como listas
+    """
+    global _canais
+
+    leituras = np.asarray(leituras, dtype=np.float64)
+    if _canais is None or _canais.n_canais != len(leituras):
+        _canais = MotorCanais(len(leituras))
+    classes, prob_baixa, prob_alta = _canais.atualizar(leituras)
+    return classes.tolist(), prob_baixa.tolist(), prob_alta.tolist(), _canais.regime.tolist()
+
+
+def estado_canais():
+    """Estado por canal do motor de prever_canais() (None antes do 1º uso)."""
+    return None if _canais is None else _canais.estado()
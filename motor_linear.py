@@ -0,0 +1,747 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de inferência em forma fechada para o pipeline linear de potência.
+
+O modelo salvo é StandardScaler + SVC(kernel="linear", probability=True),
+então uma predição se resume a:
+
+    decisao = ((x - media) / escala) · coef + intercepto
+    prob    = calibração de Platt (probA_, probB_) sobre a decisão
+
+Este módulo extrai esses parâmetros uma única vez e avalia o modelo sem
+sklearn nem pandas: floats puros para uma leitura e NumPy para lotes.
+O resultado reproduz SVC.predict_proba, incluindo o acoplamento iterativo
+de probabilidades do libsvm, com diferença abaixo de 1e-9.
+
+Cada leitura é avaliada uma única vez: a decisão gera as probabilidades e
+a classe é derivada delas (Alta se prob_alta >= prob_baixa; empate em 50%
+vai para Alta). Assim classe e probabilidades nunca se contradizem, ao
+contrário de SVC.predict + predict_proba, que usam critérios diferentes e
+podem divergir perto da fronteira.
+
+Autor: Sistema de Classificação de Potência
+Data: Novembro 2025
+"""
+
+import json
+import math
+from collections import namedtuple
+
+
+# Identificação do artefato compacto (JSON, sem pickle)
+FORMATO_ARTEFATO = "modelo-linear-potencia"
+VERSAO_ARTEFATO = 1
+
+# Limites usados pelo libsvm ao calibrar as probabilidades
+PROB_MINIMA = 1e-7
+_MAX_ITERACOES = 100
+_TOLERANCIA = 0.005 / 2
+# Até este tamanho, os métodos de lote usam o caminho escalar
+_LOTE_ESCALAR = 24
+
+
+# Resultado completo de uma avaliação
+Avaliacao = namedtuple("Avaliacao", ["classe", "prob_baixa", "prob_alta", "decisao"])
+
+
+def _sigmoide_platt(decisao_libsvm, platt_a, platt_b):
+    """Sigmoide de Platt na forma numericamente estável do libsvm."""
+    f_ab = decisao_libsvm * platt_a + platt_b
+    if f_ab >= 0:
+        e = math.exp(-f_ab)
+        return e / (1.0 + e)
+    return 1.0 / (1.0 + math.exp(f_ab))
+
+
+def razao_max_media(corrente_max, corrente_media):
+    """
+    Atributo razao_max_media de uma leitura: max / (media + 1e-6).
+
+    Com denominador nulo (media == -1e-6) segue a divisão IEEE do NumPy,
+    como calcular_atributos(): ±inf, ou NaN para 0/0, em vez de
+    ZeroDivisionError. Assim uma leitura tem o mesmo resultado no caminho
+    escalar e no vetorizado.
+    """
+    denominador = corrente_media + 1e-6
+    try:
+        return corrente_max / denominador
+    except ZeroDivisionError:
+        if corrente_max == 0 or corrente_max != corrente_max:
+            return math.nan
+        return math.copysign(math.inf, corrente_max) * math.copysign(1.0, denominador)
+
+
+def conferir_leitura(corrente_max, corrente_min, corrente_media):
+    """
+    Recusa leituras com NaN ou inf, como o pipeline sklearn fazia.
+
+    Raises:
+        ValueError: Se algum dos três valores não for finito
+    """
+    if not (math.isfinite(corrente_max) and math.isfinite(corrente_min)
+            and math.isfinite(corrente_media)):
+        raise ValueError("Leitura com valor não finito (NaN/inf): {!r}, {!r}, {!r}".format(
+            corrente_max, corrente_min, corrente_media))
+
+
+def _conferir_decisao(decisao, corrente_max, corrente_min, corrente_media):
+    """Decisão NaN/±inf: recusa entradas não finitas e a razão 0/0."""
+    conferir_leitura(corrente_max, corrente_min, corrente_media)
+    if decisao != decisao:
+        raise ValueError(
+            "Razão max/media indefinida (0/0): {!r}, {!r}, {!r}".format(
+                corrente_max, corrente_min, corrente_media))
+
+
+def _acoplar_binario(r):
+    """
+    Reproduz multiclass_probability() do libsvm para duas classes.
+
+    Args:
+        r (float): Probabilidade par-a-par da classe 0 (já limitada)
+
+    Returns:
+        tuple: (p0, p1)
+    """
+    s = 1.0 - r
+    q00 = s * s
+    q11 = r * r
+    q01 = -s * r
+    p0 = p1 = 0.5
+
+    # Mesmas operações do libsvm, na mesma ordem (resultado idêntico ao
+    # bit); só sem max()/abs() e com 1 + diff calculado uma vez
+    for _ in range(_MAX_ITERACOES):
+        qp0 = q00 * p0 + q01 * p1
+        qp1 = q01 * p0 + q11 * p1
+        pqp = p0 * qp0 + p1 * qp1
+        if -_TOLERANCIA < qp0 - pqp < _TOLERANCIA and -_TOLERANCIA < qp1 - pqp < _TOLERANCIA:
+            break
+
+        # t = 0
+        diff = (pqp - qp0) / q00
+        p0 += diff
+        u = 1 + diff
+        pqp = (pqp + diff * (diff * q00 + 2 * qp0)) / u / u
+        qp0 = (qp0 + diff * q00) / u
+        qp1 = (qp1 + diff * q01) / u
+        p0 /= u
+        p1 /= u
+
+        # t = 1
+        diff = (pqp - qp1) / q11
+        p1 += diff
+        u = 1 + diff
+        pqp = (pqp + diff * (diff * q11 + 2 * qp1)) / u / u
+        qp0 = (qp0 + diff * q01) / u
+        qp1 = (qp1 + diff * q11) / u
+        p0 /= u
+        p1 /= u
+
+    return p0, p1
+
+
+def _acoplar_binario_lote(r):
+    """Versão vetorizada de _acoplar_binario(); linhas convergidas congelam."""
+    import numpy as np
+
+    s = 1.0 - r
+    q00 = s * s
+    q11 = r * r
+    q01 = -s * r
+    p0 = np.full(r.shape, 0.5)
+    p1 = np.full(r.shape, 0.5)
+    ativos = np.arange(r.size)
+
+    for _ in range(_MAX_ITERACOES):
+        a00, a11, a01 = q00[ativos], q11[ativos], q01[ativos]
+        b0, b1 = p0[ativos], p1[ativos]
+
+        qp0 = a00 * b0 + a01 * b1
+        qp1 = a01 * b0 + a11 * b1
+        pqp = b0 * qp0 + b1 * qp1
+        erro = np.maximum(np.abs(qp0 - pqp), np.abs(qp1 - pqp))
+
+        continuar = erro >= _TOLERANCIA
+        if not continuar.any():
+            break
+        if not continuar.all():
+            ativos = ativos[continuar]
+            a00, a11, a01 = a00[continuar], a11[continuar], a01[continuar]
+            b0, b1 = b0[continuar], b1[continuar]
+            qp0, qp1, pqp = qp0[continuar], qp1[continuar], pqp[continuar]
+
+        diff = (pqp - qp0) / a00
+        b0 = b0 + diff
+        pqp = (pqp + diff * (diff * a00 + 2 * qp0)) / (1 + diff) / (1 + diff)
+        qp0 = (qp0 + diff * a00) / (1 + diff)
+        qp1 = (qp1 + diff * a01) / (1 + diff)
+        b0 = b0 / (1 + diff)
+        b1 = b1 / (1 + diff)
+
+        diff = (pqp - qp1) / a11
+        b1 = b1 + diff
+        b0 = b0 / (1 + diff)
+        b1 = b1 / (1 + diff)
+
+        p0[ativos] = b0
+        p1[ativos] = b1
+
+    return p0, p1
+
+
+class ModeloLinear:
+    """
+    Pipeline StandardScaler + SVC linear avaliado em forma fechada.
+
+    A normalização é incorporada aos pesos na construção, de modo que a
+    decisão de uma leitura custa um produto escalar de 5 termos.
+
+    Example:
+        >>> motor = ModeloLinear.de_arquivo("modelo_svm_potencia.sav")
+        >>> classe, prob_baixa, prob_alta = motor.prever(1.80, -0.03, 0.67)
+    """
+
+    def __init__(
+        self, media, escala, coef, intercepto, platt_a, platt_b,
+        classes=(0, 1), atributos=None, dataset_sha256=None, versao_modelo=None,
+        sav_sha256=None,
+    ):
+        """
+        Args:
+            media (sequence): StandardScaler.mean_ (5 valores)
+            escala (sequence): StandardScaler.scale_ (5 valores)
+            coef (sequence): SVC.coef_[0] (5 valores)
+            intercepto (float): SVC.intercept_[0]
+            platt_a (float): SVC.probA_[0]
+            platt_b (float): SVC.probB_[0]
+            classes (sequence): Rótulos das classes (negativa, positiva)
+            atributos (sequence, opcional): Nomes dos atributos, em ordem
+            dataset_sha256 (str, opcional): SHA-256 do dataset de treino
+            versao_modelo (str, opcional): Versão no registro de modelos
+            sav_sha256 (str, opcional): SHA-256 do .sav de onde o artefato
+                foi extraído
+        """
+        self.media = tuple(float(v) for v in media)
+        self.escala = tuple(float(v) for v in escala)
+        self.coef = tuple(float(v) for v in coef)
+        self.intercepto = float(intercepto)
+        self.platt_a = float(platt_a)
+        self.platt_b = float(platt_b)
+        self.classes = tuple(int(c) for c in classes)
+        self.atributos = tuple(atributos) if atributos is not None else None
+        self.dataset_sha256 = dataset_sha256
+        self.versao_modelo = versao_modelo
+        self.sav_sha256 = sav_sha256
+
+        if not (len(self.media) == len(self.escala) == len(self.coef) == 5):
+            raise ValueError("O modelo linear deve ter exatamente 5 atributos")
+
+        # Normalização incorporada: decisao = x · pesos + vies
+        self.pesos = tuple(w / e for w, e in zip(self.coef, self.escala))
+        self.vies = self.intercepto - sum(
+            m * p for m, p in zip(self.media, self.pesos)
+        )
+        self._pesos_np = None
+
+    @classmethod
+    def de_pipeline(cls, pipeline):
+        """
+        Extrai os parâmetros de um Pipeline sklearn já treinado.
+
+        Raises:
+            ValueError: Se o pipeline não for StandardScaler + SVC linear
+        """
+        escalonador = pipeline[0]
+        svc = pipeline[-1]
+
+        if getattr(svc, "kernel", None) != "linear" or not hasattr(svc, "probA_"):
+            raise ValueError("Pipeline precisa de SVC(kernel='linear', probability=True)")
+        if len(svc.classes_) != 2:
+            raise ValueError("Apenas classificação binária é suportada")
+
+        atributos = getattr(pipeline, "feature_names_in_", None)
+        return cls(
+            media=escalonador.mean_,
+            escala=escalonador.scale_,
+            coef=svc.coef_[0],
+            intercepto=svc.intercept_[0],
+            platt_a=svc.probA_[0],
+            platt_b=svc.probB_[0],
+            classes=svc.classes_,
+            atributos=list(atributos) if atributos is not None else None,
+        )
+
+    @classmethod
+    def de_arquivo(cls, caminho):
+        """
+        Lê um .sav (joblib) e extrai os parâmetros.
+
+        O unpickle ainda exige sklearn instalado, mas só nesta etapa; as
+        predições seguintes não usam sklearn. O SHA-256 do .sav fica no
+        motor (e no artefato que for salvo a partir dele).
+        """
+        import joblib
+
+        motor = cls.de_pipeline(joblib.load(caminho))
+        motor.sav_sha256 = sha256_arquivo(caminho)
+        return motor
+
+    @classmethod
+    def de_artefato(cls, caminho):
+        """
+        Lê o artefato JSON gerado por salvar() — sem pickle e sem sklearn.
+
+        Raises:
+            ValueError: Se o arquivo não for um artefato compatível
+        """
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            dados = json.load(arquivo)
+        return cls.de_dict(dados, origem=caminho)
+
+    @classmethod
+    def de_dict(cls, dados, origem="<dict>"):
+        """
+        Constrói o motor a partir do dicionário de para_dict().
+
+        Raises:
+            ValueError: Se o dicionário não for um artefato compatível
+        """
+        if dados.get("formato") != FORMATO_ARTEFATO:
+            raise ValueError("Artefato de formato desconhecido: {}".format(origem))
+        if dados.get("versao") != VERSAO_ARTEFATO:
+            raise ValueError(
+                "Versão de artefato não suportada: {} (esperada {})".format(
+                    dados.get("versao"), VERSAO_ARTEFATO
+                )
+            )
+
+        return cls(
+            media=dados["escalonador_media"],
+            escala=dados["escalonador_escala"],
+            coef=dados["coef"],
+            intercepto=dados["intercepto"],
+            platt_a=dados["platt_a"],
+            platt_b=dados["platt_b"],
+            classes=dados["classes"],
+            atributos=dados["atributos"],
+            dataset_sha256=dados.get("dataset_sha256"),
+            versao_modelo=dados.get("versao_modelo"),
+            sav_sha256=dados.get("sav_sha256"),
+        )
+
+    def para_dict(self):
+        """Parâmetros do modelo no layout do artefato JSON."""
+        return {
+            "formato": FORMATO_ARTEFATO,
+            "versao": VERSAO_ARTEFATO,
+            "atributos": list(self.atributos) if self.atributos else None,
+            "classes": list(self.classes),
+            "escalonador_media": list(self.media),
+            "escalonador_escala": list(self.escala),
+            "coef": list(self.coef),
+            "intercepto": self.intercepto,
+            "platt_a": self.platt_a,
+            "platt_b": self.platt_b,
+            "dataset_sha256": self.dataset_sha256,
+            "versao_modelo": self.versao_modelo,
+            "sav_sha256": self.sav_sha256,
+        }
+
+    def salvar(self, caminho):
+        """
+        Grava o artefato compacto em JSON.
+
+        Os floats são escritos com repr(), que preserva o valor exato, então
+        o modelo relido produz as mesmas predições.
+        """
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.para_dict(), arquivo, indent=2)
+            arquivo.write("\n")
+
+    # ------------------------------------------------------------------
+    # Uma leitura (floats puros)
+    # ------------------------------------------------------------------
+
+    def decisao(self, corrente_max, corrente_min, corrente_media):
+        """
+        Valor de decision_function para uma leitura (> 0 favorece Alta).
+
+        Raises:
+            ValueError: Se a leitura tiver NaN/inf ou a razão for 0/0
+        """
+        w = self.pesos
+        decisao = (
+            corrente_max * w[0]
+            + corrente_min * w[1]
+            + corrente_media * w[2]
+            + (corrente_max - corrente_min) * w[3]
+            + razao_max_media(corrente_max, corrente_media) * w[4]
+            + self.vies
+        )
+        # Só NaN e ±inf falham aqui; ±inf de uma razão x/0 é aceito
+        if decisao - decisao != 0.0:
+            _conferir_decisao(decisao, corrente_max, corrente_min, corrente_media)
+        return decisao
+
+    def probabilidades(self, decisao):
+        """
+        Converte um valor de decisão nas probabilidades calibradas.
+
+        Returns:
+            tuple: (prob_baixa, prob_alta)
+        """
+        # O libsvm calibra sobre a decisão com sinal invertido (classe 0)
+        r = _sigmoide_platt(-decisao, self.platt_a, self.platt_b)
+        r = min(max(r, PROB_MINIMA), 1 - PROB_MINIMA)
+        return _acoplar_binario(r)
+
+    def classificar(self, prob_baixa, prob_alta):
+        """
+        Classe consistente com as probabilidades calibradas.
+
+        Regra de empate: prob_alta == prob_baixa (50%) resulta em Alta,
+        a mesma convenção do SVC para decisão nula.
+        """
+        return self.classes[1] if prob_alta >= prob_baixa else self.classes[0]
+
+    def avaliar(self, corrente_max, corrente_min, corrente_media):
+        """
+        Avalia uma leitura uma única vez.
+
+        Returns:
+            Avaliacao: (classe, prob_baixa, prob_alta, decisao)
+        """
+        decisao = self.decisao(corrente_max, corrente_min, corrente_media)
+        prob_baixa, prob_alta = self.probabilidades(decisao)
+        return Avaliacao(
+            self.classificar(prob_baixa, prob_alta), prob_baixa, prob_alta, decisao
+        )
+
+    def prever(self, corrente_max, corrente_min, corrente_media):
+        """
+        Mesmo contrato de modelo_predicao.prever().
+
+        Returns:
+            tuple: (classe, prob_baixa, prob_alta)
+        """
+        decisao = self.decisao(corrente_max, corrente_min, corrente_media)
+        prob_baixa, prob_alta = self.probabilidades(decisao)
+        return self.classificar(prob_baixa, prob_alta), prob_baixa, prob_alta
+
+    # ------------------------------------------------------------------
+    # Lotes (NumPy)
+    # ------------------------------------------------------------------
+
+    def decisao_lote(self, atributos):
+        """
+        Valores de decisão para uma matriz de atributos (N x 5).
+
+        Args:
+            atributos (numpy.ndarray): Saída de calcular_atributos()
+
+        Returns:
+            numpy.ndarray: Decisões (N,)
+
+        Raises:
+            ValueError: Se alguma leitura tiver NaN/inf ou razão 0/0
+        """
+        import numpy as np
+
+        if self._pesos_np is None:
+            self._pesos_np = np.array(self.pesos, dtype=np.float64)
+        decisoes = atributos @ self._pesos_np + self.vies
+        if not np.isfinite(decisoes).all():
+            invalidas = np.isnan(decisoes) | ~np.isfinite(atributos[:, :3]).all(axis=1)
+            if invalidas.any():
+                posicoes = np.flatnonzero(invalidas)
+                i = posicoes[0]
+                try:
+                    _conferir_decisao(float(decisoes[i]), *atributos[i, :3].tolist())
+                except ValueError as e:
+                    raise ValueError("{} (posição {}; {} leitura(s) recusada(s))".format(
+                        e, i, len(posicoes))) from None
+        return decisoes
+
+    def probabilidades_lote(self, decisoes):
+        """
+        Versão vetorizada de probabilidades().
+
+        Returns:
+            tuple: (prob_baixa, prob_alta) como arrays (N,)
+        """
+        import numpy as np
+
+        if decisoes.size <= _LOTE_ESCALAR:
+            # Poucos itens: as iterações vetorizadas do acoplamento custam
+            # ~100 µs fixos; o laço escalar (~3 µs por item) sai mais barato.
+            pares = [self.probabilidades(d) for d in decisoes.tolist()]
+            probs = np.array(pares, dtype=np.float64).reshape(-1, 2)
+            return probs[:, 0], probs[:, 1]
+
+        f_ab = -decisoes * self.platt_a + self.platt_b
+        e = np.exp(-np.abs(f_ab))
+        r = np.where(f_ab >= 0, e / (1.0 + e), 1.0 / (1.0 + e))
+        np.clip(r, PROB_MINIMA, 1 - PROB_MINIMA, out=r)
+        return _acoplar_binario_lote(r)
+
+    def prever_lote(self, corrente_max, corrente_min, corrente_media):
+        """
+        Mesmo contrato de modelo_predicao.prever_lote().
+
+        Returns:
+            tuple: (classes, prob_baixa, prob_alta) como arrays (N,)
+        """
+        import numpy as np
+
+        if np.size(corrente_max) <= _LOTE_ESCALAR:
+            return self._prever_lote_escalar(corrente_max, corrente_min, corrente_media)
+
+        atributos = calcular_atributos(corrente_max, corrente_min, corrente_media)
+        decisoes = self.decisao_lote(atributos)
+        prob_baixa, prob_alta = self.probabilidades_lote(decisoes)
+        return self.classificar_lote(prob_baixa, prob_alta), prob_baixa, prob_alta
+
+    def _prever_lote_escalar(self, corrente_max, corrente_min, corrente_media):
+        """prever_lote() para lotes pequenos, item a item (mesmo resultado)."""
+        import numpy as np
+
+        maxs = np.asarray(corrente_max, dtype=np.float64).ravel().tolist()
+        mins = np.asarray(corrente_min, dtype=np.float64).ravel().tolist()
+        medias = np.asarray(corrente_media, dtype=np.float64).ravel().tolist()
+        if not (len(maxs) == len(mins) == len(medias)):
+            raise ValueError(
+                "Entradas com tamanhos diferentes: {}, {}, {}".format(
+                    len(maxs), len(mins), len(medias)
+                )
+            )
+
+        resultados = [self.prever(*leitura) for leitura in zip(maxs, mins, medias)]
+        if not resultados:
+            vazio = np.empty(0, dtype=np.float64)
+            return np.empty(0, dtype=np.int64), vazio, vazio.copy()
+
+        classes, prob_baixa, prob_alta = zip(*resultados)
+        return (
+            np.array(classes, dtype=np.int64),
+            np.array(prob_baixa, dtype=np.float64),
+            np.array(prob_alta, dtype=np.float64),
+        )
+
+    def avaliar_lote(self, corrente_max, corrente_min, corrente_media):
+        """
+        Versão vetorizada de avaliar().
+
+        Returns:
+            Avaliacao: Campos como arrays (N,)
+        """
+        atributos = calcular_atributos(corrente_max, corrente_min, corrente_media)
+        decisoes = self.decisao_lote(atributos)
+        prob_baixa, prob_alta = self.probabilidades_lote(decisoes)
+        return Avaliacao(
+            self.classificar_lote(prob_baixa, prob_alta), prob_baixa, prob_alta, decisoes
+        )
+
+    def classificar_lote(self, prob_baixa, prob_alta):
+        """Versão vetorizada de classificar() (mesma regra de empate)."""
+        import numpy as np
+
+        classes = np.where(prob_alta >= prob_baixa, self.classes[1], self.classes[0])
+        return classes.astype(np.int64)
+
+
+class PreditorUnitario:
+    """
+    Predição de uma leitura por vez, sem criar objetos além dos floats.
+
+    Para o laço do LabVIEW Python Node, em que cada chamada é uma única
+    leitura: os parâmetros do motor são copiados para o preditor e a
+    leitura é avaliada em uma única função, sem as chamadas intermediárias
+    de ModeloLinear.prever() (decisao, probabilidades, classificar) nem as
+    tuplas que elas devolvem. O resultado é escrito na lista self.saida,
+    criada uma vez; quem precisar guardá-lo deve copiá-lo.
+
+    Não é seguro entre threads (um preditor por thread). O preditor fica
+    com o motor recebido; com um `resolver` (ex.: modelo_predicao
+    .carregar_motor), atualizar() passa para a versão atual do modelo.
+
+    Args:
+        motor (ModeloLinear): Motor de inferência
+        resolver (callable, opcional): Devolve o motor atual, para atualizar()
+
+    Example:
+        >>> preditor = PreditorUnitario(motor)
+        >>> classe, prob_baixa, prob_alta = preditor.prever(1.80, -0.03, 0.67)
+    """
+
+    __slots__ = ("motor", "versao", "entrada", "saida", "_resolver", "_pesos", "_vies",
+                 "_platt_a", "_platt_b", "_classe_baixa", "_classe_alta")
+
+    def __init__(self, motor, resolver=None):
+        # [corrente_max, corrente_min, corrente_media], lida por avaliar()
+        self.entrada = [0.0, 0.0, 0.0]
+        # [classe, prob_baixa, prob_alta]
+        self.saida = [0, 0.0, 0.0]
+        self._resolver = resolver
+        self.trocar_motor(motor)
+
+    def trocar_motor(self, motor):
+        """Passa a usar outro motor (os buffers são mantidos)."""
+        self.motor = motor
+        self.versao = motor.versao_modelo
+        self._pesos = tuple(float(w) for w in motor.pesos)
+        self._vies = float(motor.vies)
+        self._platt_a = float(motor.platt_a)
+        self._platt_b = float(motor.platt_b)
+        self._classe_baixa = int(motor.classes[0])
+        self._classe_alta = int(motor.classes[1])
+
+    def atualizar(self):
+        """
+        Consulta o resolver e troca de motor se o modelo atual mudou.
+
+        Returns:
+            bool: True se o motor foi trocado
+        """
+        if self._resolver is None:
+            return False
+        motor = self._resolver()
+        if motor is self.motor:
+            return False
+        self.trocar_motor(motor)
+        return True
+
+    def prever(self, corrente_max, corrente_min, corrente_media):
+        """
+        Mesmo resultado de ModeloLinear.prever(), escrito em self.saida.
+
+        Args:
+            corrente_max, corrente_min, corrente_media (float): Leitura
+
+        Returns:
+            list: self.saida = [classe (int), prob_baixa, prob_alta]
+
+        Raises:
+            ValueError: Se a leitura tiver NaN/inf ou a razão for 0/0
+        """
+        w0, w1, w2, w3, w4 = self._pesos
+        try:
+            razao = corrente_max / (corrente_media + 1e-6)
+        except ZeroDivisionError:
+            razao = razao_max_media(corrente_max, corrente_media)
+
+        # Mesma ordem de operações de decisao(), probabilidades() e
+        # _acoplar_binario(): resultado idêntico ao bit
+        decisao = (
+            corrente_max * w0
+            + corrente_min * w1
+            + corrente_media * w2
+            + (corrente_max - corrente_min) * w3
+            + razao * w4
+            + self._vies
+        )
+        if decisao - decisao != 0.0:
+            _conferir_decisao(decisao, corrente_max, corrente_min, corrente_media)
+        f_ab = -decisao * self._platt_a + self._platt_b
+        if f_ab >= 0:
+            e = math.exp(-f_ab)
+            r = e / (1.0 + e)
+        else:
+            r = 1.0 / (1.0 + math.exp(f_ab))
+        if r < PROB_MINIMA:
+            r = PROB_MINIMA
+        elif r > 1 - PROB_MINIMA:
+            r = 1 - PROB_MINIMA
+        prob_baixa, prob_alta = _acoplar_binario(r)
+
+        saida = self.saida
+        saida[0] = self._classe_alta if prob_alta >= prob_baixa else self._classe_baixa
+        saida[1] = prob_baixa
+        saida[2] = prob_alta
+        return saida
+
+    def avaliar(self):
+        """prever() sobre a leitura escrita em self.entrada."""
+        entrada = self.entrada
+        return self.prever(entrada[0], entrada[1], entrada[2])
+
+
+def sha256_arquivo(caminho):
+    """SHA-256 (hex) do conteúdo de um arquivo, lido em blocos."""
+    import hashlib
+
+    h = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def exportar_artefato(pipeline, caminho, caminho_dataset=None, caminho_sav=None):
+    """
+    Converte um pipeline treinado no artefato JSON compacto.
+
+    Args:
+        pipeline (Pipeline): StandardScaler + SVC linear treinado
+        caminho (str): Arquivo .json de saída
+        caminho_dataset (str, opcional): Dataset de treino, para registrar
+            seu SHA-256 no artefato
+        caminho_sav (str, opcional): .sav já gravado com este pipeline; o
+            SHA-256 dele vai para o artefato, que só é usado
+            por carregar_motor() enquanto o .sav não mudar
+
+    Returns:
+        ModeloLinear: O motor correspondente ao artefato gravado
+    """
+    motor = ModeloLinear.de_pipeline(pipeline)
+    if caminho_dataset is not None:
+        motor.dataset_sha256 = sha256_arquivo(caminho_dataset)
+    if caminho_sav is not None:
+        motor.sav_sha256 = sha256_arquivo(caminho_sav)
+    motor.salvar(caminho)
+    return motor
+
+
+def calcular_atributos(corrente_max, corrente_min, corrente_media):
+    """
+    Monta a matriz de atributos (N x 5) para um lote de leituras.
+
+    Os atributos derivados são calculados de forma vetorizada, direto na
+    matriz pré-alocada, na ordem em que o pipeline foi treinado.
+
+    Args:
+        corrente_max (array-like): Correntes máximas (N,)
+        corrente_min (array-like): Correntes mínimas (N,)
+        corrente_media (array-like): Correntes médias (N,)
+
+    Returns:
+        numpy.ndarray: Matriz float64 de formato (N, 5)
+
+    Raises:
+        ValueError: Se as três entradas não tiverem o mesmo tamanho
+    """
+    import numpy as np
+
+    maxs = np.asarray(corrente_max, dtype=np.float64).ravel()
+    mins = np.asarray(corrente_min, dtype=np.float64).ravel()
+    medias = np.asarray(corrente_media, dtype=np.float64).ravel()
+
+    if not (maxs.shape == mins.shape == medias.shape):
+        raise ValueError(
+            "Entradas com tamanhos diferentes: {}, {}, {}".format(
+                maxs.size, mins.size, medias.size
+            )
+        )
+
+    atributos = np.empty((maxs.size, 5), dtype=np.float64)
+    atributos[:, 0] = maxs
+    atributos[:, 1] = mins
+    atributos[:, 2] = medias
+    np.subtract(maxs, mins, out=atributos[:, 3])
+    np.add(medias, 1e-6, out=atributos[:, 4])
+    # media == -1e-6: ±inf/NaN, como razao_max_media()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(maxs, atributos[:, 4], out=atributos[:, 4])
+
+    return atributos
@@ -3,11 +3,13 @@
 """
 Script Python 3.6 para predição de potência - Integração LabVIEW
 Uso: python3 predicao_labview.py <corrente_max> <corrente_min> <corrente_media>
+
+Os argumentos são validados antes de qualquer import pesado, e a predição
+usa o artefato compacto (modelo_svm_potencia.json) quando disponível, sem
+carregar pandas nem sklearn.
 """
 
 import sys
-import joblib
-import pandas as pd
 
 
 def main():
@@ -24,43 +26,18 @@ def main():
         corrente_min = float(sys.argv[2])
         corrente_media = float(sys.argv[3])
 
-        # Carregar modelo com joblib
-        modelo = joblib.load("modelo_svm_potencia.sav")
-
-        # Calcular atributos derivados (necessários para o modelo)
-        amplitude_corrente = corrente_max - corrente_min
-        razao_max_media = corrente_max / (corrente_media + 1e-6)
+        # Importar o módulo de predição só depois de validar a entrada
+        import modelo_predicao as mp
 
-        # Criar DataFrame com os 5 atributos na ordem correta
-        entrada = pd.DataFrame(
-            [
-                [
-                    corrente_max,
-                    corrente_min,
-                    corrente_media,
-                    amplitude_corrente,
-                    razao_max_media,
-                ]
-            ],
-            columns=[
-                "corrente_max_A",
-                "corrente_min_A",
-                "corrente_media_A",
-                "amplitude_corrente",
-                "razao_max_media",
-            ],
+        # Fazer predição (atributos derivados calculados pelo motor)
+        motor = mp.carregar_motor()
+        classe_predita, prob_baixa, prob_alta = motor.prever(
+            corrente_max, corrente_min, corrente_media
         )
 
-        # Fazer predição
-        classe_predita = int(modelo.predict(entrada)[0])
-        probabilidades = modelo.predict_proba(entrada)[0]
-
-        prob_baixa = float(probabilidades[0])
-        prob_alta = float(probabilidades[1])
-
         # Saída formatada para LabVIEW (separado por pipe |)
         # Formato: CLASSE|PROB_BAIXA|PROB_ALTA
-        print("{}|{:.6f}|{:.6f}".format(classe_predita, prob_baixa, prob_alta))
+        print(mp.formatar_saida(classe_predita, prob_baixa, prob_alta))
 
         # Retornar código de sucesso
         sys.exit(0)
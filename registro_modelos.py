@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registro local de modelos versionados, com ponteiro "atual" atômico.
+
+Layout da pasta (padrão: registro_modelos/):
+
+    versoes/0001-3f1a9c2b7d4e/modelo.json   artefato JSON (imutável)
+    versoes/0001-3f1a9c2b7d4e/modelo.sav    pipeline .sav (opcional)
+    versoes/0001-3f1a9c2b7d4e/info.json     data, origem e SHA-256 do dataset
+    ATUAL                                   {"versao": ..., "historico": [...]}
+
+O nome da versão é um número sequencial mais o início do SHA-256 do
+dataset de treino (registrado no artefato). Uma versão publicada nunca é
+alterada: ativar uma versão ou voltar à anterior só regrava o ponteiro
+ATUAL (arquivo temporário + os.replace), então quem lê vê o ponteiro
+antigo ou o novo, nunca meio arquivo.
+
+Os processos de predição de longa duração (modelo_predicao, servidor)
+conferem o ponteiro no máximo a cada poucos segundos e trocam de modelo
+entre uma requisição e outra, sem parar de responder.
+
+Uso:
+    python3 registro_modelos.py publicar modelo_potencia.json --sav modelo_potencia.sav
+    python3 registro_modelos.py listar
+    python3 registro_modelos.py ativar 0001-3f1a9c2b7d4e
+    python3 registro_modelos.py reverter
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+
+PASTA_REGISTRO = "registro_modelos"
+ARQUIVO_ATUAL = "ATUAL"
+ARQUIVO_ARTEFATO = "modelo.json"
+ARQUIVO_SAV = "modelo.sav"
+ARQUIVO_INFO = "info.json"
+# Versões anteriores lembradas no ponteiro (para reverter)
+LIMITE_HISTORICO = 20
+
+
+def _gravar_atomico(caminho, dados):
+    """Grava JSON com troca atômica."""
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, indent=2)
+        arquivo.write("\n")
+    os.replace(temporario, caminho)
+
+
+def ler_ponteiro(pasta=PASTA_REGISTRO):
+    """
+    Lê o ponteiro ATUAL.
+
+    Returns:
+        dict: {'versao': str, 'historico': list}
+
+    Raises:
+        FileNotFoundError: Se nenhuma versão foi ativada
+    """
+    with open(os.path.join(pasta, ARQUIVO_ATUAL), "r", encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def caminho_artefato(versao, pasta=PASTA_REGISTRO):
+    """Artefato JSON de uma versão publicada."""
+    return os.path.join(pasta, "versoes", versao, ARQUIVO_ARTEFATO)
+
+
+class RegistroModelos:
+    """
+    Publicação, ativação e reversão de versões do modelo.
+
+    Args:
+        pasta (str): Raiz do registro (criada se não existir)
+    """
+
+    def __init__(self, pasta=PASTA_REGISTRO):
+        self.pasta = pasta
+        self.pasta_versoes = os.path.join(pasta, "versoes")
+        os.makedirs(self.pasta_versoes, exist_ok=True)
+
+    def versoes(self):
+        """Versões publicadas, da mais antiga para a mais nova."""
+        return sorted(
+            nome for nome in os.listdir(self.pasta_versoes)
+            if not nome.startswith(".")
+        )
+
+    def versao_atual(self):
+        """Versão apontada por ATUAL, ou None se nenhuma foi ativada."""
+        try:
+            return ler_ponteiro(self.pasta)["versao"]
+        except FileNotFoundError:
+            return None
+
+    def info(self, versao):
+        """Metadados gravados na publicação."""
+        with open(os.path.join(self.pasta_versoes, versao, ARQUIVO_INFO),
+                  "r", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+
+    def publicar(self, artefato, sav=None, ativar=True):
+        """
+        Copia um artefato (e o .sav, se houver) para uma versão nova.
+
+        Args:
+            artefato (str): Artefato JSON do treino (ModeloLinear.salvar)
+            sav (str, opcional): Pipeline .sav correspondente
+            ativar (bool): Se True, a versão nova passa a ser a atual
+
+        Returns:
+            str: Nome da versão publicada
+
+        Raises:
+            ValueError: Se o artefato não for compatível com o motor
+        """
+        from motor_linear import ModeloLinear
+
+        # Validar antes de publicar: um artefato ruim nunca vira versão
+        motor = ModeloLinear.de_artefato(artefato)
+        sufixo = (motor.dataset_sha256 or "sem-dataset")[:12]
+
+        temporaria = tempfile.mkdtemp(prefix=".tmp-", dir=self.pasta_versoes)
+        try:
+            if sav is not None:
+                shutil.copyfile(sav, os.path.join(temporaria, ARQUIVO_SAV))
+
+            # O número é reservado pelo rename: se outro processo publicou
+            # o mesmo número antes, tenta o próximo
+            numero = len(self.versoes()) + 1
+            while True:
+                versao = "{:04d}-{}".format(numero, sufixo)
+                motor.versao_modelo = versao
+                motor.salvar(os.path.join(temporaria, ARQUIVO_ARTEFATO))
+                _gravar_atomico(os.path.join(temporaria, ARQUIVO_INFO), {
+                    "versao": versao,
+                    "publicado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "origem": os.path.abspath(artefato),
+                    "dataset_sha256": motor.dataset_sha256,
+                    "sav": sav is not None,
+                })
+                try:
+                    os.rename(temporaria, os.path.join(self.pasta_versoes, versao))
+                    break
+                except OSError:
+                    if not os.path.isdir(os.path.join(self.pasta_versoes, versao)):
+                        raise
+                    numero += 1
+        except BaseException:
+            shutil.rmtree(temporaria, ignore_errors=True)
+            raise
+
+        if ativar:
+            self.ativar(versao)
+        return versao
+
+    def ativar(self, versao):
+        """
+        Aponta ATUAL para uma versão publicada (troca atômica).
+
+        A versão que estava ativa vai para o histórico usado por reverter().
+
+        Raises:
+            ValueError: Se a versão não existir
+        """
+        if not os.path.exists(caminho_artefato(versao, self.pasta)):
+            raise ValueError("Versão não publicada: {}".format(versao))
+
+        try:
+            ponteiro = ler_ponteiro(self.pasta)
+        except FileNotFoundError:
+            ponteiro = {"versao": None, "historico": []}
+        if ponteiro["versao"] == versao:
+            return
+
+        historico = ponteiro["historico"]
+        if ponteiro["versao"] is not None:
+            historico = (historico + [ponteiro["versao"]])[-LIMITE_HISTORICO:]
+        _gravar_atomico(os.path.join(self.pasta, ARQUIVO_ATUAL),
+                        {"versao": versao, "historico": historico})
+
+    def reverter(self):
+        """
+        Volta à versão ativa anterior (só regrava o ponteiro).
+
+        Returns:
+            str: Versão reativada
+
+        Raises:
+            ValueError: Se não houver versão anterior
+        """
+        try:
+            ponteiro = ler_ponteiro(self.pasta)
+        except FileNotFoundError:
+            ponteiro = {"versao": None, "historico": []}
+        if not ponteiro["historico"]:
+            raise ValueError("Não há versão anterior para reverter")
+
+        anterior = ponteiro["historico"][-1]
+        _gravar_atomico(os.path.join(self.pasta, ARQUIVO_ATUAL),
+                        {"versao": anterior, "historico": ponteiro["historico"][:-1]})
+        return anterior
+
+
+def main():
+    """Função principal: publicar, ativar, reverter e listar versões."""
+    parser = argparse.ArgumentParser(description="Registro de modelos versionados")
+    parser.add_argument("--pasta", default=PASTA_REGISTRO, help="Pasta do registro")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    publicar = comandos.add_parser("publicar", help="Publica um artefato como versão nova")
+    publicar.add_argument("artefato", help="Artefato JSON do treino")
+    publicar.add_argument("--sav", help="Pipeline .sav correspondente")
+    publicar.add_argument("--sem-ativar", action="store_true",
+                          help="Só publica; a versão atual não muda")
+    ativar = comandos.add_parser("ativar", help="Torna uma versão publicada a atual")
+    ativar.add_argument("versao")
+    comandos.add_parser("reverter", help="Volta à versão ativa anterior")
+    comandos.add_parser("listar", help="Lista as versões publicadas")
+    args = parser.parse_args()
+
+    registro = RegistroModelos(args.pasta)
+    try:
+        if args.comando == "publicar":
+            versao = registro.publicar(args.artefato, args.sav, ativar=not args.sem_ativar)
+            print("✓ Publicada: {}{}".format(versao, "" if args.sem_ativar else " (atual)"))
+        elif args.comando == "ativar":
+            registro.ativar(args.versao)
+            print("✓ Atual: {}".format(args.versao))
+        elif args.comando == "reverter":
+            print("✓ Revertido para: {}".format(registro.reverter()))
+        else:
+            atual = registro.versao_atual()
+            for versao in registro.versoes():
+                info = registro.info(versao)
+                print("{} {}  {}".format("*" if versao == atual else " ", versao,
+                                         info["publicado_em"]))
+    except (OSError, ValueError) as e:
+        print("ERRO: {}".format(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Varredura de k do k-NN com uma única consulta de vizinhos por dobra.
+
+O estudo do notebook (APS1-NL, seção 4.1) faz, para cada k, um
+cross_val_score de StandardScaler + KNeighborsClassifier: o índice é
+reconstruído e os vizinhos recalculados len(k) x n_dobras vezes. Aqui,
+em cada dobra, o escalonador é ajustado no treino e os k_max vizinhos de
+cada amostra de teste saem de uma consulta só. Como os vizinhos vêm
+ordenados pela distância, os votos para todos os k são a soma acumulada
+dos rótulos dos vizinhos (uma coluna por k), e o F1 de todos os k é
+calculado de uma vez.
+
+Mesma regra do KNeighborsClassifier (pesos uniformes): vence a classe
+com mais votos; no empate (k par), a menor classe (0). O resultado é a
+mesma tabela de F1 e o mesmo melhor k do laço com cross_val_score.
+
+Exemplo:
+    >>> from sklearn.model_selection import StratifiedKFold
+    >>> from selecao_knn import varrer_k
+    >>> cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+    >>> resultados, melhor_k = varrer_k(X, y, range(3, 16), cv=cv)
+
+Uso:
+    python3 selecao_knn.py
+    python3 selecao_knn.py --dataset leituras_2025.csv --k 1 51 --comparar
+"""
+
+import argparse
+import time
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+
+def _votos_positivos(X_treino, y_treino, X_teste, k_max, jobs=None):
+    """
+    Votos da classe 1 entre os k primeiros vizinhos, para k = 1..k_max.
+
+    Returns:
+        numpy.ndarray: (n_teste, k_max); coluna j = votos com k = j + 1
+    """
+    escalonador = StandardScaler().fit(X_treino)
+    vizinhos = NearestNeighbors(n_neighbors=k_max, n_jobs=jobs)
+    vizinhos.fit(escalonador.transform(X_treino))
+    indices = vizinhos.kneighbors(escalonador.transform(X_teste), return_distance=False)
+    return np.cumsum(y_treino[indices], axis=1, dtype=np.int32)
+
+
+def _f1_por_k(votos, y_teste, valores_k):
+    """F1 (classe 1) de cada k, com as predições de todos os k de uma vez."""
+    k = np.asarray(valores_k)
+    predito = 2 * votos[:, k - 1] > k  # empate -> classe 0
+    real = (y_teste == 1)[:, None]
+    vp = (predito & real).sum(axis=0)
+    fp = (predito & ~real).sum(axis=0)
+    fn = (~predito & real).sum(axis=0)
+    denominador = 2 * vp + fp + fn
+    # Sem positivos reais nem preditos: F1 = 0 (zero_division do sklearn)
+    return np.where(denominador > 0, 2 * vp / np.maximum(denominador, 1), 0.0)
+
+
+def varrer_k(X, y, valores_k=range(3, 16), cv=None, jobs=None):
+    """
+    F1 de validação cruzada do StandardScaler + k-NN para vários k.
+
+    Args:
+        X (array-like): Atributos (N x d)
+        y (array-like): Rótulos 0/1 (N,)
+        valores_k (iterable): Valores de k avaliados
+        cv: Divisor do sklearn (padrão: StratifiedKFold(5, shuffle=True,
+            random_state=42), o do notebook)
+        jobs (int, opcional): n_jobs da consulta de vizinhos
+
+    Returns:
+        tuple: (resultados, melhor_k) — resultados = {k: scores das dobras};
+            melhor_k = maior F1 médio (o primeiro k no empate)
+    """
+    if cv is None:
+        cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+    X = np.asarray(X)
+    y = np.asarray(y).astype(np.int8)
+    valores_k = [int(k) for k in valores_k]
+    k_max = max(valores_k)
+
+    dobras = []
+    for treino, teste in cv.split(X, y):
+        votos = _votos_positivos(X[treino], y[treino], X[teste], k_max, jobs)
+        dobras.append(_f1_por_k(votos, y[teste], valores_k))
+
+    scores = np.array(dobras).T  # (len(valores_k), n_dobras)
+    resultados = {k: scores[i] for i, k in enumerate(valores_k)}
+    melhor_k = max(resultados, key=lambda k: resultados[k].mean())
+    return resultados, melhor_k
+
+
+def varrer_k_referencia(X, y, valores_k=range(3, 16), cv=None):
+    """O laço do notebook: um cross_val_score por k (para comparar)."""
+    if cv is None:
+        cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+    resultados = {}
+    for k in valores_k:
+        pipe_knn = make_pipeline(StandardScaler(), KNeighborsClassifier(n_neighbors=k))
+        resultados[k] = cross_val_score(pipe_knn, X, y, cv=cv, scoring="f1")
+    return resultados, max(resultados, key=lambda k: resultados[k].mean())
+
+
+def main():
+    """Função principal: tabela de F1 por k para um CSV rotulado."""
+    from carregar_dataset import ler_dataset
+
+    parser = argparse.ArgumentParser(description="Varredura de k do k-NN (F1, CV 5-fold)")
+    parser.add_argument("--dataset", default="dataset.xls", help="CSV rotulado (4 colunas)")
+    parser.add_argument("--k", type=int, nargs=2, default=(3, 15), metavar=("MIN", "MAX"),
+                        help="Faixa de k (inclusiva)")
+    parser.add_argument("--jobs", type=int, default=None, help="n_jobs da consulta de vizinhos")
+    parser.add_argument("--comparar", action="store_true",
+                        help="Roda também o laço com cross_val_score e compara")
+    args = parser.parse_args()
+
+    # float64, como o DataFrame do notebook
+    X, y = ler_dataset(args.dataset, tipo=np.float64)
+    valores_k = range(args.k[0], args.k[1] + 1)
+
+    inicio = time.perf_counter()
+    resultados, melhor_k = varrer_k(X, y, valores_k, jobs=args.jobs)
+    duracao = time.perf_counter() - inicio
+
+    for k, scores in resultados.items():
+        print(f"k={k} | F1-score médio={scores.mean():.3f} | desvio={scores.std():.3f}")
+    print("\n>>> Melhor k encontrado:", melhor_k)
+    print(f"    ({len(y)} amostras, {len(valores_k)} valores de k em {duracao:.3f} s)")
+
+    if args.comparar:
+        inicio = time.perf_counter()
+        referencia, melhor_ref = varrer_k_referencia(X, y, valores_k)
+        duracao_ref = time.perf_counter() - inicio
+        iguais = melhor_ref == melhor_k and all(
+            np.allclose(referencia[k], resultados[k]) for k in valores_k
+        )
+        print(f"\n    cross_val_score por k: {duracao_ref:.3f} s "
+              f"({duracao_ref / duracao:.1f}x mais lento); "
+              f"tabela {'idêntica' if iguais else 'DIFERENTE'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor de predição persistente para LabVIEW.
+
+Carrega o modelo uma única vez e atende leituras por TCP (localhost) ou
+socket Unix, evitando iniciar um interpretador Python por amostra.
+
+Requisições concorrentes (várias bancadas, ou um cliente que envia várias
+linhas sem esperar resposta) são agrupadas em micro-lotes: a primeira
+leitura abre uma janela curta (padrão 200 µs) e tudo o que chegar até ela
+fechar, ou até completar o lote máximo (padrão 64), é classificado em uma
+única chamada vetorizada de prever_lote(). Se todas as conexões abertas já
+estiverem esperando resposta, o lote fecha na hora. Cada resposta volta
+para sua conexão, na ordem em que as linhas foram enviadas.
+
+Protocolo (uma linha por leitura, UTF-8, terminada em "\\n"):
+    Requisição:  <corrente_max>|<corrente_min>|<corrente_media>
+    Resposta:    CLASSE|PROB_BAIXA|PROB_ALTA
+                 ou  ERRO: <mensagem>
+
+    Requisição:  STATS
+    Resposta:    JSON em uma linha (fila, tamanhos de lote, latência)
+
+    Requisição:  VERSAO
+    Resposta:    versão atual do modelo ("-" fora do registro); a partir
+                 daí, nesta conexão, cada resultado ganha o quarto campo
+                 CLASSE|PROB_BAIXA|PROB_ALTA|VERSAO com a versão que o
+                 produziu. Sem o comando, o formato não muda.
+
+A conexão pode (e deve) ser mantida aberta durante toda a aquisição.
+
+Uso:
+    python3 servidor_predicao.py [--host 127.0.0.1] [--porta 50555]
+    python3 servidor_predicao.py --socket /tmp/predicao.sock
+    python3 servidor_predicao.py --janela-us 200 --lote-maximo 64
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+import modelo_predicao as mp
+from cliente_predicao import HOST_PADRAO, PORTA_PADRAO
+
+
+JANELA_PADRAO_US = 200
+LOTE_MAXIMO_PADRAO = 64
+COMANDO_ESTATISTICAS = "STATS"
+COMANDO_VERSAO = "VERSAO"
+
+# Bytes lidos de uma conexão por vez, e tamanho máximo de uma linha
+_TAMANHO_LEITURA = 1 << 16
+
+# Abaixo disto o laço de eventos não consegue dormir com precisão (epoll
+# trabalha em milissegundos): a janela é contada cedendo a vez ao laço.
+_RESOLUCAO_ESPERA = 1e-3
+
+
+def responder(linha, com_versao=False):
+    """
+    Processa uma linha de requisição e retorna a linha de resposta.
+
+    Caminho sem agrupamento, útil para testes e para embutir o protocolo
+    em outro servidor.
+
+    Args:
+        linha (str): "max|min|media"
+        com_versao (bool): Anexa a versão do modelo (como após VERSAO)
+
+    Returns:
+        str: "CLASSE|PROB_BAIXA|PROB_ALTA[|VERSAO]" ou "ERRO: <mensagem>"
+    """
+    try:
+        corrente_max, corrente_min, corrente_media = mp.interpretar_linha(linha)
+        predicao = mp.prever(corrente_max, corrente_min, corrente_media)
+    except Exception as e:
+        return "ERRO: {}".format(e)
+
+    if com_versao:
+        return mp.formatar_saida(*predicao, versao=predicao.versao or mp.SEM_VERSAO)
+    return mp.formatar_saida(*predicao)
+
+
+def _prever_leitura(leitura):
+    """Predicao de uma leitura já interpretada, ou o texto do ERRO."""
+    try:
+        return mp.prever(*leitura)
+    except Exception as e:
+        return "ERRO: {}".format(e)
+
+
+class _Conexao:
+    """
+    Respostas de uma conexão, na ordem em que as linhas chegaram.
+
+    Cada leitura enviada ao lote reserva uma vaga; respostas imediatas
+    (erros, STATS, VERSAO) também. As vagas são escritas no socket assim
+    que todas as anteriores estiverem prontas. `com_versao` é ligado pelo
+    comando VERSAO.
+    """
+
+    __slots__ = ("escritor", "vagas", "encerrada", "com_versao")
+
+    def __init__(self, escritor):
+        self.escritor = escritor
+        self.vagas = deque()
+        self.encerrada = False
+        self.com_versao = False
+
+    def reservar(self, texto=None):
+        vaga = [texto]
+        self.vagas.append(vaga)
+        return vaga
+
+    def descarregar(self):
+        """Escreve as respostas prontas do início da fila."""
+        vagas = self.vagas
+        partes = []
+        while vagas and vagas[0][0] is not None:
+            partes.append(vagas.popleft()[0])
+        if partes and not self.encerrada:
+            self.escritor.write(("\n".join(partes) + "\n").encode("utf-8"))
+
+
+class AgrupadorLotes:
+    """
+    Junta leituras de várias conexões e as classifica em lote.
+
+    O lote fecha quando a janela expira, quando atinge lote_maximo ou
+    quando não há mais conexão ociosa (sem leitura pendente) que possa
+    contribuir para ele: com um único cliente, ou quando todos os clientes
+    já esperam resposta, a classificação é feita na hora, sem espera.
+    Linhas que uma conexão enviou sem esperar resposta e que já chegaram
+    juntas (mais=True em submeter()) entram todas antes desse fechamento,
+    então um cliente sozinho que envia em sequência também forma lotes.
+
+    Example:
+        >>> agrupador = AgrupadorLotes(janela=200e-6, lote_maximo=64)
+        >>> conexao = agrupador.conectar(escritor)
+        >>> agrupador.submeter((1.80, -0.03, 0.67), conexao)
+    """
+
+    def __init__(self, janela=JANELA_PADRAO_US * 1e-6, lote_maximo=LOTE_MAXIMO_PADRAO):
+        if lote_maximo < 1:
+            raise ValueError("lote_maximo deve ser positivo")
+
+        self.janela = janela
+        self.lote_maximo = lote_maximo
+        self.conexoes = 0
+        self.ociosas = 0
+
+        self._lote = []
+        self._prazo = 0.0
+        self._geracao = 0
+        self._temporizador = None
+
+        self.profundidade_maxima = 0
+        self.tamanhos_lote = [0] * (lote_maximo + 1)
+        self._latencia = mp._Histograma()
+
+    def conectar(self, escritor):
+        """Registra uma conexão; o retorno é passado a submeter()."""
+        self.conexoes += 1
+        self.ociosas += 1
+        return _Conexao(escritor)
+
+    def desconectar(self, conexao):
+        """Remove uma conexão registrada por conectar()."""
+        self.conexoes -= 1
+        if not conexao.vagas:
+            self.ociosas -= 1
+        conexao.encerrada = True
+        if self._lote and self.ociosas <= 0:
+            self._fechar_lote()
+
+    def submeter(self, leitura, conexao, mais=False):
+        """
+        Adiciona uma leitura ao lote em formação.
+
+        A resposta é escrita na conexão quando o lote for processado.
+
+        Args:
+            leitura (tuple): (corrente_max, corrente_min, corrente_media)
+            conexao (_Conexao): Retorno de conectar()
+            mais (bool): A conexão já tem outras linhas recebidas, que vêm
+                em seguida; o lote não fecha por falta de conexões ociosas
+                antes delas (só por lote_maximo ou pela janela)
+        """
+        if not conexao.vagas:
+            self.ociosas -= 1
+        vaga = conexao.reservar()
+
+        lote = self._lote
+        lote.append((leitura, vaga, conexao, time.perf_counter_ns()))
+        if len(lote) > self.profundidade_maxima:
+            self.profundidade_maxima = len(lote)
+
+        if len(lote) >= self.lote_maximo or (self.ociosas <= 0 and not mais):
+            self._fechar_lote()
+        elif len(lote) == 1:
+            self._abrir_janela()
+
+    def responder(self, texto, conexao):
+        """Resposta imediata, mantida na ordem das leituras pendentes."""
+        conexao.reservar(texto)
+        conexao.descarregar()
+
+    def _abrir_janela(self):
+        laco = asyncio.get_running_loop()
+        self._prazo = laco.time() + self.janela
+        if self.janela >= _RESOLUCAO_ESPERA:
+            self._temporizador = laco.call_later(self.janela, self._fechar_lote)
+        else:
+            laco.call_soon(self._verificar_janela, self._geracao)
+
+    def _verificar_janela(self, geracao):
+        """Fecha o lote quando a janela expira; senão, cede a vez e volta."""
+        if geracao != self._geracao or not self._lote:
+            return
+        laco = asyncio.get_running_loop()
+        if laco.time() >= self._prazo or self.ociosas <= 0:
+            self._fechar_lote()
+        else:
+            # Os leitores das conexões rodam antes da próxima verificação
+            laco.call_soon(self._verificar_janela, geracao)
+
+    def _fechar_lote(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        self._geracao += 1
+
+        pedidos, self._lote = self._lote, []
+        if pedidos:
+            self._processar(pedidos)
+
+    def _processar(self, pedidos):
+        """Classifica um lote e escreve as respostas nas conexões."""
+        try:
+            if len(pedidos) == 1:
+                # Cliente único: evita montar arrays para uma leitura
+                predicao = mp.prever(*pedidos[0][0])
+                resultados = [predicao]
+            else:
+                leituras = np.array([pedido[0] for pedido in pedidos], dtype=np.float64)
+                predicao = mp.prever_lote(leituras[:, 0], leituras[:, 1], leituras[:, 2])
+                classes, prob_baixa, prob_alta = predicao
+                resultados = list(
+                    zip(classes.tolist(), prob_baixa.tolist(), prob_alta.tolist())
+                )
+            versoes = [predicao.versao] * len(pedidos)
+        except Exception:
+            # Uma leitura problemática não derruba o lote: cada cliente
+            # recebe a própria resposta (ou o próprio ERRO)
+            resultados = [_prever_leitura(pedido[0]) for pedido in pedidos]
+            versoes = [getattr(r, "versao", None) for r in resultados]
+
+        agora = time.perf_counter_ns()
+        conexoes = {}
+        for (_, vaga, conexao, chegada), resultado, versao in zip(pedidos, resultados, versoes):
+            if isinstance(resultado, str):
+                vaga[0] = resultado
+            elif conexao.com_versao:
+                vaga[0] = mp.formatar_saida(*resultado, versao=versao or mp.SEM_VERSAO)
+            else:
+                vaga[0] = mp.formatar_saida(*resultado)
+            conexoes[id(conexao)] = conexao
+            self._latencia.registrar(agora - chegada)
+
+        for conexao in conexoes.values():
+            conexao.descarregar()
+            if not conexao.vagas and not conexao.encerrada:
+                self.ociosas += 1
+
+        self.tamanhos_lote[len(pedidos)] += 1
+
+    def estatisticas(self):
+        """
+        Retorna um retrato do agrupamento.
+
+        Returns:
+            dict: {'conexoes', 'ociosas', 'fila', 'fila_max', 'lotes',
+                'leituras', 'lote_medio', 'tamanhos_lote': {tamanho: lotes},
+                'latencia_us': {'p50', 'p90', 'p99', 'p999', 'max'},
+                'versao_modelo'}
+        """
+        lotes = sum(self.tamanhos_lote)
+        leituras = sum(n * c for n, c in enumerate(self.tamanhos_lote))
+        h = self._latencia
+        return {
+            "conexoes": self.conexoes,
+            "ociosas": self.ociosas,
+            "fila": len(self._lote),
+            "fila_max": self.profundidade_maxima,
+            "lotes": lotes,
+            "leituras": leituras,
+            "lote_medio": leituras / lotes if lotes else 0.0,
+            "tamanhos_lote": {
+                str(n): c for n, c in enumerate(self.tamanhos_lote) if c
+            },
+            "latencia_us": {
+                "p50": h.percentil(50) / 1000.0,
+                "p90": h.percentil(90) / 1000.0,
+                "p99": h.percentil(99) / 1000.0,
+                "p999": h.percentil(99.9) / 1000.0,
+                "max": h.maximo_ns / 1000.0,
+            },
+            "versao_modelo": mp.versao_modelo(),
+        }
+
+
+def _atender_linha(texto, conexao, agrupador, mais):
+    """Uma linha não vazia de requisição: comando, ERRO ou leitura."""
+    comando = texto.upper()
+    if comando == COMANDO_ESTATISTICAS:
+        agrupador.responder(json.dumps(agrupador.estatisticas()), conexao)
+    elif comando == COMANDO_VERSAO:
+        conexao.com_versao = True
+        agrupador.responder(mp.versao_modelo() or mp.SEM_VERSAO, conexao)
+    else:
+        try:
+            leitura = mp.interpretar_linha(texto)
+        except ValueError as e:
+            agrupador.responder("ERRO: {}".format(e), conexao)
+        else:
+            agrupador.submeter(leitura, conexao, mais)
+
+
+async def _atender_cliente(leitor, escritor, agrupador):
+    """Atende uma conexão até o cliente fechá-la."""
+    # Cada read() devolve tudo o que já chegou: as linhas enviadas sem
+    # esperar resposta entram todas no mesmo lote; as respostas voltam na
+    # ordem de chegada.
+    conexao = agrupador.conectar(escritor)
+    pendente = b""
+    descartando = False
+    try:
+        while True:
+            bloco = await leitor.read(_TAMANHO_LEITURA)
+            if bloco:
+                pendente += bloco
+                if descartando:
+                    # Resto de uma linha longa demais: um único ERRO por ela
+                    fim = pendente.find(b"\n")
+                    if fim < 0:
+                        pendente = b""
+                        continue
+                    pendente, descartando = pendente[fim + 1:], False
+                    agrupador.responder("ERRO: linha muito longa", conexao)
+                corte = pendente.rfind(b"\n") + 1
+                if corte == 0:
+                    if len(pendente) > _TAMANHO_LEITURA:
+                        pendente, descartando = b"", True
+                    continue
+                completas, pendente = pendente[:corte], pendente[corte:]
+            else:
+                # EOF: a última linha vale mesmo sem "\n" final
+                if descartando:
+                    agrupador.responder("ERRO: linha muito longa", conexao)
+                completas, pendente = pendente, b""
+
+            textos = [
+                texto
+                for texto in completas.decode("utf-8", errors="replace").split("\n")
+                if texto.strip()
+            ]
+            for i, texto in enumerate(textos):
+                _atender_linha(texto.strip(), conexao, agrupador, i < len(textos) - 1)
+
+            await escritor.drain()
+            if not bloco:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        agrupador.desconectar(conexao)
+        escritor.close()
+
+
+async def servir(
+    host=HOST_PADRAO,
+    porta=PORTA_PADRAO,
+    caminho_socket=None,
+    janela=JANELA_PADRAO_US * 1e-6,
+    lote_maximo=LOTE_MAXIMO_PADRAO,
+):
+    """
+    Inicia o servidor e atende conexões indefinidamente.
+
+    Args:
+        host (str): Endereço TCP (ignorado se caminho_socket for dado)
+        porta (int): Porta TCP
+        caminho_socket (str, opcional): Caminho de socket Unix
+        janela (float): Espera máxima (s) para completar um lote
+        lote_maximo (int): Leituras por lote
+    """
+    # Carregar o modelo antes de aceitar conexões: a primeira leitura já é
+    # rápida e um modelo ausente é reportado na inicialização.
+    mp.carregar_motor()
+
+    agrupador = AgrupadorLotes(janela, lote_maximo)
+
+    async def atender(leitor, escritor):
+        await _atender_cliente(leitor, escritor, agrupador)
+
+    if caminho_socket:
+        servidor = await asyncio.start_unix_server(atender, caminho_socket)
+        print("Servidor de predição em {}".format(caminho_socket), flush=True)
+    else:
+        servidor = await asyncio.start_server(atender, host, porta)
+        print("Servidor de predição em {}:{}".format(host, porta), flush=True)
+
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main():
+    """Função principal: interpreta argumentos e inicia o servidor."""
+    parser = argparse.ArgumentParser(description="Servidor de predição de potência")
+    parser.add_argument("--host", default=HOST_PADRAO, help="Endereço TCP")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO, help="Porta TCP")
+    parser.add_argument("--socket", dest="caminho_socket", help="Socket Unix")
+    parser.add_argument(
+        "--janela-us",
+        type=float,
+        default=JANELA_PADRAO_US,
+        help="Espera máxima para completar um lote, em µs (0 = sem espera)",
+    )
+    parser.add_argument(
+        "--lote-maximo",
+        type=int,
+        default=LOTE_MAXIMO_PADRAO,
+        help="Leituras por lote",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(
+            servir(
+                args.host,
+                args.porta,
+                args.caminho_socket,
+                args.janela_us * 1e-6,
+                args.lote_maximo,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+    except FileNotFoundError as e:
+        print("ERRO: {}".format(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -178,7 +178,1317 @@ try:
 except Exception as e:
     print(f"   ⚠️ Não foi possível testar via linha de comando: {e}")
 
-# 6. Resumo final
+# 6. Motor linear (sem sklearn) contra o pipeline real
+print("\n[6] Comparando motor_linear com o pipeline sklearn...")
+from motor_linear import ModeloLinear, calcular_atributos
+
+motor = ModeloLinear.de_pipeline(modelo)
+
+# Leituras do dataset + pontos aleatórios cobrindo a faixa dos sensores
+rng = np.random.default_rng(42)
+n_aleatorias = 5000
+maxs = np.concatenate([df["corrente_max_A"], rng.uniform(-0.5, 11.0, n_aleatorias)])
+mins = np.concatenate([df["corrente_min_A"], rng.uniform(-0.5, 0.5, n_aleatorias)])
+medias = np.concatenate([df["corrente_media_A"], rng.uniform(0.3, 1.0, n_aleatorias)])
+
+atributos = pd.DataFrame(
+    calcular_atributos(maxs, mins, medias),
+    columns=[
+        "corrente_max_A",
+        "corrente_min_A",
+        "corrente_media_A",
+        "amplitude_corrente",
+        "razao_max_media",
+    ],
+)
+probs_ref = modelo.predict_proba(atributos)
+# A classe segue as probabilidades (empate em 50% → Alta). SVC.predict usa
+# a decisão bruta e pode discordar de predict_proba perto da fronteira.
+classes_ref = (probs_ref[:, 1] >= probs_ref[:, 0]).astype(int)
+divergentes_svc = int((modelo.predict(atributos).astype(int) != classes_ref).sum())
+
+classes_lote, baixa_lote, alta_lote = motor.prever_lote(maxs, mins, medias)
+erro_lote = max(
+    np.abs(baixa_lote - probs_ref[:, 0]).max(),
+    np.abs(alta_lote - probs_ref[:, 1]).max(),
+)
+
+erro_unitario = 0.0
+classes_ok = bool((classes_lote == classes_ref).all())
+for i in range(0, len(maxs), 50):
+    classe_i, baixa_i, alta_i = motor.prever(maxs[i], mins[i], medias[i])
+    classes_ok = classes_ok and classe_i == classes_ref[i]
+    erro_unitario = max(
+        erro_unitario,
+        abs(baixa_i - probs_ref[i, 0]),
+        abs(alta_i - probs_ref[i, 1]),
+    )
+
+if classes_ok and erro_lote < 1e-9 and erro_unitario < 1e-9:
+    print(f"   ✅ {len(maxs)} leituras: erro máx. lote={erro_lote:.2e}, "
+          f"unitário={erro_unitario:.2e}")
+    print(f"   ℹ️  SVC.predict discorda de predict_proba em {divergentes_svc} "
+          f"leituras (o motor segue as probabilidades)")
+else:
+    print(f"   ❌ Divergência: classes_ok={classes_ok}, erro lote={erro_lote:.2e}, "
+          f"unitário={erro_unitario:.2e}")
+    sys.exit(1)
+
+# Artefato JSON (sem pickle) deve reproduzir o mesmo motor
+if os.path.exists("modelo_svm_potencia.json"):
+    artefato = ModeloLinear.de_artefato("modelo_svm_potencia.json")
+    _, baixa_art, alta_art = artefato.prever_lote(maxs, mins, medias)
+    erro_artefato = np.abs(alta_art - probs_ref[:, 1]).max()
+    if erro_artefato < 1e-9:
+        print(f"   ✅ modelo_svm_potencia.json: erro máx.={erro_artefato:.2e}")
+    else:
+        print(f"   ❌ modelo_svm_potencia.json diverge do .sav ({erro_artefato:.2e})")
+        sys.exit(1)
+
+# Denominador nulo (media == -1e-6): ±inf como no NumPy, sem ZeroDivisionError
+bordas = np.array([[1.5, 0.0, -1e-6], [-1.5, 0.0, -1e-6], [1.80, -0.03, 0.67]] * 10)
+classes_b, baixa_b, alta_b = motor.prever_lote(bordas[:, 0], bordas[:, 1], bordas[:, 2])
+bordas_ok = all(
+    np.allclose(motor.prever(*bordas[i].tolist()), (classes_b[i], baixa_b[i], alta_b[i]),
+                rtol=0, atol=1e-12)
+    and motor.prever(*bordas[i].tolist())[0] == classes_b[i]
+    for i in range(3)
+)
+if bordas_ok:
+    print("   ✅ media == -1e-6: caminho escalar == vetorizado (razão ±inf)")
+else:
+    print("   ❌ Divisão por zero: caminho escalar diverge do vetorizado")
+    sys.exit(1)
+
+# O artefato só é servido enquanto corresponde ao .sav (retreino troca o .sav)
+import json
+import shutil
+import tempfile
+import modelo_predicao as mp
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+diretorio_original = os.getcwd()
+with tempfile.TemporaryDirectory() as pasta:
+    for nome in (mp.CAMINHO_MODELO, mp.CAMINHO_ARTEFATO):
+        shutil.copy2(nome, pasta)
+    os.chdir(pasta)
+    mp.usar_registro(None)
+    mp.invalidar_modelo()
+    try:
+        with open(mp.CAMINHO_ARTEFATO, "rb") as arquivo:
+            json_original = arquivo.read()
+        sha_original = ModeloLinear.de_artefato(mp.CAMINHO_ARTEFATO).sav_sha256
+        os.utime(mp.CAMINHO_MODELO)  # mtime novo, mesmo conteúdo: artefato vale
+        mesmo_ok = (mp.carregar_motor().sav_sha256 == sha_original
+                    and mp.prever(1.80, -0.03, 0.67) == motor.prever(1.80, -0.03, 0.67))
+
+        retreinado = make_pipeline(
+            StandardScaler(), SVC(kernel="linear", C=0.01, probability=True, random_state=0)
+        ).fit(atributos.iloc[:len(df)], df["potencia"])
+        joblib.dump(retreinado, mp.CAMINHO_MODELO)
+        esperado = retreinado.predict_proba(atributos.iloc[:200])[:, 1]
+        obtido = [mp.prever(maxs[i], mins[i], medias[i])[2] for i in range(200)]
+        with open(mp.CAMINHO_ARTEFATO, "rb") as arquivo:
+            json_intacto = arquivo.read() == json_original
+        troca_ok = (np.abs(np.array(obtido) - esperado).max() < 1e-9
+                    and mp.carregar_motor().sav_sha256 not in (None, sha_original)
+                    and json_intacto and sorted(os.listdir(".")) == sorted(
+                        (mp.CAMINHO_MODELO, mp.CAMINHO_ARTEFATO)))
+    finally:
+        os.chdir(diretorio_original)
+        mp.usar_registro()
+        mp.invalidar_modelo()
+
+# O artefato versionado não guarda nada da máquina onde foi exportado
+with open(mp.CAMINHO_ARTEFATO, "r", encoding="utf-8") as arquivo:
+    campos_artefato = set(json.load(arquivo))
+mesmo_ok = mesmo_ok and not any("mtime" in campo for campo in campos_artefato)
+
+if mesmo_ok and troca_ok:
+    print("   ✅ Artefato acompanha o .sav: mesmo conteúdo → JSON; .sav trocado → "
+          "predições do .sav novo, sem regravar o JSON")
+else:
+    print(f"   ❌ Artefato x .sav: mesmo_ok={mesmo_ok}, troca_ok={troca_ok}, "
+          f"campos={sorted(campos_artefato)}")
+    sys.exit(1)
+
+# 7. Orçamento de tempo de importação das CLIs
+print("\n[7] Verificando tempo de importação das CLIs (-X importtime)...")
+
+# Módulos que não podem ser carregados no caminho quente de inferência
+MODULOS_PROIBIDOS = ("pandas", "sklearn", "joblib", "scipy")
+# Soma máxima (ms) das importações de nível superior, incluindo o site
+ORCAMENTO_IMPORTACAO_MS = 150
+
+for script in ["predicao_labview.py", "modelo_predicao.py", "usar_modelo.py"]:
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", script, "1.80", "-0.03", "0.67"],
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+
+    # Linhas: "import time: <próprio> | <acumulado> | <indentação><módulo>"
+    importados = []
+    tempo_ms = 0.0
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, acumulado, nome = linha[len("import time:"):].split("|")
+        importados.append(nome.strip())
+        if not nome[1:].startswith(" "):  # importação de nível superior
+            tempo_ms += int(acumulado) / 1000
+
+    proibidos = sorted(
+        m for m in importados if m.split(".")[0] in MODULOS_PROIBIDOS
+    )
+
+    if resultado.returncode != 0 or not resultado.stdout.startswith("1|"):
+        print(f"   ❌ {script} falhou: {resultado.stdout.strip()}")
+        sys.exit(1)
+    if proibidos:
+        print(f"   ❌ {script} importa {', '.join(proibidos[:5])}")
+        sys.exit(1)
+    if tempo_ms > ORCAMENTO_IMPORTACAO_MS:
+        print(f"   ❌ {script}: importações levaram {tempo_ms:.1f} ms "
+              f"(orçamento {ORCAMENTO_IMPORTACAO_MS} ms)")
+        sys.exit(1)
+
+    print(f"   ✅ {script}: importações em {tempo_ms:.1f} ms, "
+          f"{len(importados)} módulos")
+
+# 8. Anel de memória compartilhada (produtor -> preditor em outro processo)
+print("\n[8] Testando anel de memória compartilhada...")
+from anel_compartilhado import AnelCompartilhado, iniciar_preditor, produzir_e_coletar
+
+leituras = np.column_stack((maxs, mins, medias))
+anel_entrada = AnelCompartilhado.criar(capacidade=1024)  # pequeno: força a volta
+anel_saida = AnelCompartilhado.criar(capacidade=256)
+try:
+    preditor = iniciar_preditor(anel_entrada, anel_saida)
+    resultados = produzir_e_coletar(leituras, anel_entrada, anel_saida, preditor,
+                                    bloco=333)
+    preditor.join(timeout=30)
+finally:
+    anel_entrada.fechar()
+    anel_saida.fechar()
+
+# Preditor que morre sem publicar nada: o produtor desiste em vez de girar
+from multiprocessing import Process
+import time
+
+anel_entrada = AnelCompartilhado.criar(capacidade=1024)
+anel_saida = AnelCompartilhado.criar(capacidade=256)
+try:
+    morto = Process(target=sys.exit, args=(3,), daemon=True)
+    morto.start()
+    inicio_morto = time.perf_counter()
+    try:
+        produzir_e_coletar(leituras, anel_entrada, anel_saida, morto, bloco=333)
+        erro_morto = None
+    except RuntimeError as erro:
+        erro_morto = str(erro)
+    duracao_morto = time.perf_counter() - inicio_morto
+finally:
+    anel_entrada.fechar()
+    anel_saida.fechar()
+morte_ok = (erro_morto is not None and "exitcode=3" in erro_morto
+            and duracao_morto < 10)
+
+erro_anel = np.abs(resultados[:, 2] - probs_ref[:, 1]).max()
+
+# Sem barreira de memória em Python: fora de x86 o anel é recusado
+import platform
+import anel_compartilhado as ac
+
+arquitetura_ok = True
+for maquina, aceita in (("x86_64", True), ("AMD64", True), ("i686", True),
+                        ("aarch64", False), ("arm64", False), ("ppc64le", False),
+                        ("riscv64", False)):
+    try:
+        ac._conferir_arquitetura(maquina)
+        arquitetura_ok = arquitetura_ok and aceita
+    except RuntimeError:
+        arquitetura_ok = arquitetura_ok and not aceita
+maquina_real = platform.machine
+platform.machine = lambda: "aarch64"
+try:
+    AnelCompartilhado.criar(capacidade=16)
+    arquitetura_ok = False
+except RuntimeError:
+    pass
+finally:
+    platform.machine = maquina_real
+
+if (preditor.exitcode == 0 and (resultados[:, 0] == classes_ref).all() and erro_anel < 1e-9
+        and arquitetura_ok and morte_ok):
+    print(f"   ✅ {len(resultados)} leituras pelo anel, ordem e valores preservados; "
+          f"recusado fora de x86; preditor morto detectado em {duracao_morto:.2f} s")
+else:
+    print(f"   ❌ Anel divergiu (exitcode={preditor.exitcode}, erro={erro_anel:.2e}, "
+          f"arquitetura_ok={arquitetura_ok}, preditor_morto={erro_morto!r})")
+    sys.exit(1)
+
+# 9. Servidor com agrupamento em lotes (várias conexões simultâneas)
+print("\n[9] Testando servidor com agrupamento em lotes...")
+import asyncio
+import json
+import servidor_predicao as sp
+
+
+async def _consultar_servidor(n_conexoes, por_conexao):
+    agrupador = sp.AgrupadorLotes(janela=200e-6, lote_maximo=64)
+
+    async def atender(leitor, escritor):
+        await sp._atender_cliente(leitor, escritor, agrupador)
+
+    servidor = await asyncio.start_server(atender, "127.0.0.1", 0)
+    porta = servidor.sockets[0].getsockname()[1]
+
+    async def cliente(indice):
+        leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+        linhas = [
+            f"{float(maxs[i])!r}|{float(mins[i])!r}|{float(medias[i])!r}"
+            for i in range(indice, n_conexoes * por_conexao, n_conexoes)
+        ]
+        linhas.insert(len(linhas) // 2, "abc")  # erro no meio, ordem mantida
+        escritor.write(("\n".join(linhas) + "\n").encode())
+        respostas = [(await leitor.readline()).decode().strip() for _ in linhas]
+        escritor.close()
+        return respostas
+
+    respostas = await asyncio.gather(*(cliente(k) for k in range(n_conexoes)))
+    estatisticas = agrupador.estatisticas()
+    servidor.close()
+    await servidor.wait_closed()
+    return respostas, estatisticas
+
+
+n_conexoes, por_conexao = 8, 250
+respostas, estatisticas = asyncio.run(_consultar_servidor(n_conexoes, por_conexao))
+# Uma conexão só, enviando em sequência sem esperar: também forma lotes
+respostas_unica, estatisticas_unica = asyncio.run(_consultar_servidor(1, 400))
+
+servidor_ok = True
+for k, linhas in enumerate(respostas):
+    servidor_ok = servidor_ok and linhas.pop(len(linhas) // 2).startswith("ERRO")
+    for i, linha in zip(range(k, n_conexoes * por_conexao, n_conexoes), linhas):
+        classe, _, alta = linha.split("|")
+        servidor_ok = servidor_ok and int(classe) == classes_ref[i]
+        servidor_ok = servidor_ok and abs(float(alta) - probs_ref[i, 1]) < 1e-6
+
+linhas_unica = respostas_unica[0]
+servidor_ok = servidor_ok and linhas_unica.pop(len(linhas_unica) // 2).startswith("ERRO")
+for i, linha in enumerate(linhas_unica):
+    classe, _, alta = linha.split("|")
+    servidor_ok = servidor_ok and int(classe) == classes_ref[i]
+    servidor_ok = servidor_ok and abs(float(alta) - probs_ref[i, 1]) < 1e-6
+unica_ok = estatisticas_unica["leituras"] == 400 and estatisticas_unica["lote_medio"] > 1
+
+if servidor_ok and unica_ok and estatisticas["leituras"] == n_conexoes * por_conexao:
+    print(f"   ✅ {n_conexoes} conexões, {estatisticas['leituras']} leituras em "
+          f"{estatisticas['lotes']} lotes (média {estatisticas['lote_medio']:.1f}); "
+          f"1 conexão em sequência: média {estatisticas_unica['lote_medio']:.1f} por lote")
+else:
+    print(f"   ❌ Respostas do servidor divergem: {json.dumps(estatisticas)}, "
+          f"uma conexão: {json.dumps(estatisticas_unica)}")
+    sys.exit(1)
+
+# 10. Detector de mudança de regime (histerese + permanência)
+print("\n[10] Testando detector de mudança de regime...")
+from detector_regime import DetectorRegime
+
+# Regimes de 200 amostras com ruído forte: a classe instantânea oscila
+rng_regime = np.random.default_rng(7)
+regimes = np.repeat([0, 1, 0, 1, 1, 0], 200)
+probs_regime = np.clip(0.2 + 0.6 * regimes + rng_regime.normal(0, 0.25, regimes.size), 0, 1)
+instantes = np.arange(regimes.size) * 1e-3
+
+unitario = DetectorRegime(alfa=0.1, permanencia_minima=0.005)
+eventos_unitarios = []
+for p, t in zip(probs_regime.tolist(), instantes.tolist()):
+    evento = unitario.atualizar(p, t)
+    if evento:
+        eventos_unitarios.append(evento)
+em_lote = DetectorRegime(alfa=0.1, permanencia_minima=0.005)
+eventos_lote = em_lote.atualizar_lote(probs_regime[:333], instantes[:333])
+eventos_lote += em_lote.atualizar_lote(probs_regime[333:], instantes[333:])
+
+oscilacoes = int((np.diff(probs_regime >= 0.5) != 0).sum())
+mudancas = [(e.de, e.para) for e in eventos_unitarios]
+if eventos_unitarios == eventos_lote and mudancas == [(0, 1), (1, 0), (0, 1), (1, 0)]:
+    print(f"   ✅ 4 mudanças confirmadas (classe instantânea oscilou {oscilacoes} vezes); "
+          f"lote == unitário")
+else:
+    print(f"   ❌ Eventos inesperados: {mudancas} (lote igual: {eventos_unitarios == eventos_lote})")
+    sys.exit(1)
+
+# 11. Memoização de prever() sobre leituras quantizadas
+print("\n[11] Testando memoização de prever()...")
+import modelo_predicao as mp
+
+mp.ativar_memoizacao(resolucao=0.01, capacidade=64)
+try:
+    leituras_memo = np.round(np.column_stack((maxs, mins, medias))[:200], 2).tolist()
+    memo_ok = True
+    # 50 leituras repetidas (acertos) e depois 200 distintas (descartes)
+    for leitura in leituras_memo[:50] * 2 + leituras_memo:
+        esperado = motor.prever(*leitura)
+        obtido = mp.prever(*leitura)
+        memo_ok = memo_ok and obtido[0] == esperado[0]
+        memo_ok = memo_ok and abs(obtido[2] - esperado[2]) < 1e-9
+    # Leituras que caem na mesma célula compartilham o resultado
+    memo_ok = memo_ok and mp.prever(1.801, -0.029, 0.6702) == mp.prever(1.80, -0.03, 0.67)
+    est = mp.estatisticas_memoizacao()
+finally:
+    mp.desativar_memoizacao()
+
+if memo_ok and est["descartes"] > 0 and est["tamanho"] == 64 and est["acertos"] >= 50:
+    print(f"   ✅ {est['acertos']} acertos, {est['falhas']} falhas, "
+          f"{est['descartes']} descartes (LRU de {est['capacidade']})")
+else:
+    print(f"   ❌ Memoização divergiu: ok={memo_ok}, {est}")
+    sys.exit(1)
+
+# 12. Tabela de decisão pré-calculada (grade reduzida em diretório temporário)
+print("\n[12] Testando tabela de decisão pré-calculada...")
+import tempfile
+import gerar_tabela_decisao as gtd
+
+with tempfile.TemporaryDirectory() as pasta:
+    caminho_tabela = os.path.join(pasta, "tabela.json")
+    eixos = gtd.criar_eixos({
+        "corrente_max_A": (1.0, 11.0),
+        "corrente_min_A": (-0.35, 0.05),
+        "corrente_media_A": (0.40, 0.70),
+    })
+    gtd.gerar_tabela(motor, eixos, caminho_tabela)
+    tabela = mp.TabelaDecisao.de_arquivo(caminho_tabela)
+
+    relatorio = gtd.verificar_tabela(
+        tabela, modelo, df[["corrente_max_A", "corrente_min_A", "corrente_media_A"]].values,
+        amostras=20000,
+    )
+
+    # Fora da grade: resposta do modelo; unitário == lote
+    fora = [(20.0, 0.0, 0.5), (1.5, -0.9, 0.5), (1.5, 0.0, 0.95)]
+    fora_ok = all(tabela.prever(*l) == motor.prever(*l) for l in fora)
+    amostra = np.round(np.column_stack((maxs, mins, medias))[:500], 2)
+    classes_t, _, alta_t = tabela.prever_lote(amostra[:, 0], amostra[:, 1], amostra[:, 2])
+    unitario_ok = True
+    for i in range(len(amostra)):
+        classe_i, _, alta_i = tabela.prever(*amostra[i])
+        unitario_ok = unitario_ok and classe_i == classes_t[i]
+        unitario_ok = unitario_ok and abs(alta_i - alta_t[i]) < 1e-12
+    del tabela
+
+    # Só a tabela do modelo atual é aceita; a de outro modelo cai no modelo
+    motor_atual = mp._carregar_motor_padrao()
+    sha_atual = motor_atual.sav_sha256
+    cabecalho_tab = json.load(open(caminho_tabela, encoding="utf-8"))
+    cabecalho_tab["modelo_sha256"] = sha_atual
+    cabecalho_tab["verificacao"] = relatorio
+    gtd._gravar_cabecalho(caminho_tabela, cabecalho_tab)
+    hash_ok = mp.carregar_tabela(caminho_tabela).modelo_sha256 == sha_atual
+    # Reprovada na verificação (ou sem ela) e de outro modelo: recusadas
+    for chave, valor in (("verificacao", {**relatorio, "ok": False}), ("verificacao", None),
+                         ("modelo_sha256", "0" * 64)):
+        gtd._gravar_cabecalho(caminho_tabela, {**cabecalho_tab, chave: valor})
+        try:
+            mp.carregar_tabela(caminho_tabela)
+            hash_ok = False
+        except ValueError:
+            pass
+    # prever_tabela(): a tabela só responde pelo modelo que prever() usa
+    # agora (inclusive versão do registro); senão responde esse modelo
+    import time
+    from registro_modelos import RegistroModelos
+
+    leitura_t = (1.80, -0.03, 0.67)
+    registro_t = RegistroModelos(os.path.join(pasta, "registro"))
+    dados_outro = ModeloLinear.de_artefato("modelo_svm_potencia.json").para_dict()
+    dados_outro["intercepto"] += 3.0
+    dados_outro["dataset_sha256"] = "f" * 64
+    dados_outro["sav_sha256"] = "e" * 64
+    ModeloLinear.de_dict(dados_outro).salvar(os.path.join(pasta, "outro.json"))
+    caminho_padrao, mp.CAMINHO_TABELA = mp.CAMINHO_TABELA, caminho_tabela
+    try:
+        # Tabela de outro .sav: o modelo responde exato (a tabela quantizaria)
+        cabecalho_tab["modelo_sha256"] = "0" * 64
+        gtd._gravar_cabecalho(caminho_tabela, cabecalho_tab)
+        recusada = mp.prever_tabela(*leitura_t)
+        hash_ok = (hash_ok and tuple(recusada) == motor_atual.prever(*leitura_t)
+                   and recusada.versao is None)
+
+        # Tabela do .sav atual: responde ela, inclusive com o registro na
+        # mesma versão do modelo (e informa a versão)
+        cabecalho_tab["modelo_sha256"] = sha_atual
+        gtd._gravar_cabecalho(caminho_tabela, cabecalho_tab)
+        da_tabela = mp.prever_tabela(*leitura_t)
+        v_mesmo = registro_t.publicar("modelo_svm_potencia.json")
+        mp.usar_registro(registro_t.pasta, intervalo=0.01)
+        mesmo_modelo = mp.prever_tabela(*leitura_t)
+        hash_ok = (hash_ok and tuple(da_tabela) != motor_atual.prever(*leitura_t)
+                   and np.allclose(da_tabela, motor_atual.prever(*leitura_t), atol=1e-5)
+                   and tuple(mesmo_modelo) == tuple(da_tabela) and mesmo_modelo.versao == v_mesmo)
+
+        # Registro em outra versão do modelo: tabela recusada, resposta de prever()
+        v_outro = registro_t.publicar(os.path.join(pasta, "outro.json"))
+        time.sleep(0.02)
+        try:
+            mp.carregar_tabela()
+            hash_ok = False
+        except ValueError:
+            pass
+        via_registro = mp.prever_tabela(*leitura_t)
+        hash_ok = (hash_ok and tuple(via_registro) == tuple(mp.prever(*leitura_t))
+                   and via_registro.versao == v_outro != v_mesmo)
+    finally:
+        mp.usar_registro()
+        mp.CAMINHO_TABELA = caminho_padrao
+        mp.invalidar_modelo()
+
+    # Regerar troca os arquivos: quem já mapeou a tabela segue com a antiga,
+    # inteira; uma geração que falha não toca na tabela publicada
+    antiga = mp.TabelaDecisao.de_arquivo(caminho_tabela)
+    classes_antigas = np.array(antiga._classe)
+    dados_outro = motor.para_dict()
+    dados_outro["intercepto"] += 3.0
+    gtd.gerar_tabela(ModeloLinear.de_dict(dados_outro), eixos, caminho_tabela)
+    nova = mp.TabelaDecisao.de_arquivo(caminho_tabela)
+    troca_ok = (np.array_equal(np.array(antiga._classe), classes_antigas)
+                and not np.array_equal(np.array(nova._classe), classes_antigas))
+    conteudo_publicado = [open(os.path.join(pasta, nome), "rb").read()
+                          for nome in ("tabela.json", "tabela.npy")]
+    quebrado = ModeloLinear.de_dict(motor.para_dict())
+    quebrado.probabilidades_lote = lambda decisoes: 1 / 0
+    try:
+        gtd.gerar_tabela(quebrado, eixos, caminho_tabela)
+        troca_ok = False
+    except ZeroDivisionError:
+        pass
+    arquivos_tabela = sorted(n for n in os.listdir(pasta) if n.startswith("tabela"))
+    troca_ok = (troca_ok and arquivos_tabela == ["tabela.json", "tabela.npy"]
+                and conteudo_publicado == [open(os.path.join(pasta, nome), "rb").read()
+                                           for nome in ("tabela.json", "tabela.npy")])
+    del antiga, nova
+
+if relatorio["ok"] and fora_ok and unitario_ok and hash_ok and troca_ok:
+    print(f"   ✅ {relatorio['celulas']} células conferidas com o pipeline, "
+          f"erro máx.={relatorio['erro_max_prob']:.2e}; fallback fora da grade "
+          f"e recusa de tabela de outro modelo OK; regerar troca os arquivos atomicamente")
+else:
+    print(f"   ❌ Tabela divergiu: {relatorio}, fora_ok={fora_ok}, "
+          f"unitario_ok={unitario_ok}, hash_ok={hash_ok}, troca_ok={troca_ok}")
+    sys.exit(1)
+
+print("\n[13] Testando treino incremental...")
+import treino_incremental as ti
+
+with tempfile.TemporaryDirectory() as pasta:
+    linhas_dataset = open("dataset.xls", encoding="utf-8").read().splitlines()
+    estado = ti.novo_estado()
+    incorporadas = 0
+    for k in range(4):
+        caminho_lote = os.path.join(pasta, f"lote{k}.csv")
+        with open(caminho_lote, "w", encoding="utf-8") as arquivo:
+            arquivo.write("\n".join(linhas_dataset[k::4]) + "\n")
+        incorporadas += ti.incorporar_arquivo(estado, caminho_lote)
+    repetido = ti.incorporar_arquivo(estado, caminho_lote)
+
+    caminho_artefato = os.path.join(pasta, "incremental.json")
+    ti.exportar(estado, caminho_artefato)
+    motor_inc = ModeloLinear.de_artefato(caminho_artefato)
+    X_inc, y_inc = ti.ler_tudo(["dataset.xls"])
+    deriva = ti.relatorio_deriva(motor_inc, X_inc, y_inc)
+
+    # Artefato próprio, com o hash dos lotes; publicado, vira versão rastreável
+    import time
+    from registro_modelos import RegistroModelos
+    versao_inc = RegistroModelos(os.path.join(pasta, "registro")).publicar(caminho_artefato)
+    hash_ok = (ti.CAMINHO_ARTEFATO != mp.CAMINHO_ARTEFATO
+               and motor_inc.dataset_sha256 == ti.hash_lotes(estado) is not None
+               and versao_inc == "0001-" + motor_inc.dataset_sha256[:12])
+
+if (incorporadas == len(linhas_dataset) and repetido is None and hash_ok
+        and deriva["acuracia_incremental"] >= 0.95
+        and deriva["concordancia_classes"] >= 0.95):
+    print(f"   ✅ {incorporadas} amostras em 4 lotes: acurácia "
+          f"{deriva['acuracia_incremental']:.1%}, concordância com o ajuste em lote "
+          f"{deriva['concordancia_classes']:.1%}; publicado como {versao_inc}")
+else:
+    print(f"   ❌ Treino incremental: incorporadas={incorporadas}, "
+          f"repetido={repetido}, hash_ok={hash_ok}, deriva={deriva}")
+    sys.exit(1)
+
+print("\n[14] Testando treino no modo grande (LinearSVC + Platt em holdout)...")
+import treinar_modelo as tm
+
+rng = np.random.default_rng(0)
+base = df[["corrente_max_A", "corrente_min_A", "corrente_media_A"]].values
+sorteio = rng.integers(0, len(df), 50000)
+leituras = base[sorteio] + rng.normal(0, [0.05, 0.01, 0.01], (sorteio.size, 3))
+fases_grande = []
+motor_grande, holdout = tm.treinar_grande(
+    calcular_atributos(*leituras.T), df["potencia"].values[sorteio], fases=fases_grande
+)
+
+with tempfile.TemporaryDirectory() as pasta:
+    caminho_grande = os.path.join(pasta, "grande.json")
+    motor_grande.salvar(caminho_grande)
+    relido = ModeloLinear.de_artefato(caminho_grande)
+classes_g, _, _ = relido.prever_lote(*base.T)
+acuracia_grande = float((classes_g == df["potencia"].values).mean())
+releitura_ok = all(
+    relido.prever(*l) == motor_grande.prever(*l) for l in base.tolist()
+)
+fases_ok = [f["fase"] for f in fases_grande] == ["divisao", "ajuste", "calibracao"]
+
+# CLI: só JSON + info; um .sav de treino anterior (outro modelo) sai
+with tempfile.TemporaryDirectory() as pasta:
+    shutil.copy2("dataset.xls", pasta)
+    with open(os.path.join(pasta, tm.ARQUIVO_MODELO), "wb") as arquivo:
+        arquivo.write(b"treino anterior")
+    cli_grande = subprocess.run(
+        [sys.executable, os.path.abspath("treinar_modelo.py"), "--modo", "grande",
+         "--cache", ""], cwd=pasta, capture_output=True, text=True, timeout=300,
+    )
+    arquivos_grande = sorted(os.listdir(pasta))
+fases_ok = fases_ok and cli_grande.returncode == 0 and arquivos_grande == [
+    "dataset.xls", tm.ARQUIVO_INFO, "modelo_potencia.json"]
+
+# Sem /proc nem resource (Windows): pico fica None e a tabela mostra "-"
+import builtins
+import contextlib
+import io
+abrir_original, importar_original = builtins.open, builtins.__import__
+
+def _abrir_sem_proc(arquivo, *args, **kwargs):
+    if str(arquivo).startswith("/proc/"):
+        raise OSError("sem /proc")
+    return abrir_original(arquivo, *args, **kwargs)
+
+def _importar_sem_resource(nome, *args, **kwargs):
+    if nome == "resource":
+        raise ImportError("sem resource")
+    return importar_original(nome, *args, **kwargs)
+
+builtins.open, builtins.__import__ = _abrir_sem_proc, _importar_sem_resource
+try:
+    fases_sem_pico = []
+    with tm.medir_fase(fases_sem_pico, "ajuste"):
+        pass
+finally:
+    builtins.open, builtins.__import__ = abrir_original, importar_original
+tabela_fases = io.StringIO()
+with contextlib.redirect_stdout(tabela_fases):
+    tm.imprimir_fases(fases_sem_pico)
+fases_ok = fases_ok and fases_sem_pico[0]["pico_mb"] is None and (
+    tabela_fases.getvalue().splitlines()[2].split()[-1] == "-")
+
+if acuracia_grande >= 0.95 and releitura_ok and fases_ok and holdout.size == 5000:
+    print(f"   ✅ 50000 amostras: acurácia no dataset {acuracia_grande:.1%}, "
+          f"Platt A={motor_grande.platt_a:.3f} B={motor_grande.platt_b:.3f}; "
+          f"artefato relido idêntico; .sav anterior removido na exportação; "
+          f"sem resource o pico aparece como '-'")
+else:
+    print(f"   ❌ Modo grande: acurácia={acuracia_grande}, releitura_ok={releitura_ok}, "
+          f"fases={fases_grande}, holdout={holdout.size}, arquivos={arquivos_grande}, "
+          f"sem_pico={fases_sem_pico}")
+    sys.exit(1)
+
+print("\n[15] Testando seleção de modelo em paralelo (memória compartilhada)...")
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+X_sel = calcular_atributos(*base.T)
+candidatos = [{"modo": "padrao", "kernel": k, "C": c}
+              for k in ("linear", "rbf") for c in (0.1, 1.0)]
+serial, melhor_serial = tm.selecionar_modelo(X_sel, df["potencia"].values, candidatos, jobs=1)
+paralelo, melhor_paralelo = tm.selecionar_modelo(X_sel, df["potencia"].values, candidatos, jobs=2)
+referencia = cross_val_score(
+    tm._criar_estimador(candidatos[1]), X_sel, df["potencia"].values,
+    cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42), scoring="f1",
+)
+
+iguais = all(np.array_equal(a["scores"], b["scores"]) for a, b in zip(serial, paralelo))
+if iguais and melhor_serial == melhor_paralelo and np.allclose(serial[1]["scores"], referencia):
+    print(f"   ✅ {len(candidatos)} candidatos x 5 dobras: serial == 2 processos == "
+          f"cross_val_score; melhor: {paralelo[melhor_paralelo]['candidato']}")
+else:
+    print(f"   ❌ Seleção divergiu: iguais={iguais}, melhor={melhor_serial}/{melhor_paralelo}, "
+          f"scores={serial[1]['scores']} vs {referencia}")
+    sys.exit(1)
+
+print("\n[16] Testando leitura do dataset em blocos (float32/int8 + cache .npy)...")
+import time
+from carregar_dataset import ler_dataset
+
+with tempfile.TemporaryDirectory() as pasta:
+    caminho_csv = os.path.join(pasta, "leituras.csv")
+    with open("dataset.xls", encoding="utf-8") as origem:
+        conteudo = origem.read()
+    with open(caminho_csv, "w", encoding="utf-8") as destino:
+        destino.write(conteudo * 3)
+
+    X_b, y_b = ler_dataset(caminho_csv, tamanho_bloco=10)
+    esperado = np.tile(calcular_atributos(*base.T), (3, 1))
+    leitura_ok = (X_b.dtype == np.float32 and y_b.dtype == np.int8
+                  and np.allclose(X_b, esperado, rtol=1e-6)
+                  and np.array_equal(y_b, np.tile(df["potencia"].values, 3)))
+
+    pasta_cache = os.path.join(pasta, "cache")
+    ler_dataset(caminho_csv, cache=pasta_cache)
+    inicio = time.perf_counter()
+    X_c, y_c = ler_dataset(caminho_csv, cache=pasta_cache)
+    duracao_cache = time.perf_counter() - inicio
+    cache_ok = (isinstance(X_c, np.memmap) and np.array_equal(X_c, X_b)
+                and np.array_equal(y_c, y_b))
+    del X_c, y_c
+
+    # CSV alterado: o cache é refeito
+    with open(caminho_csv, "a", encoding="utf-8") as destino:
+        destino.write(conteudo)
+    X_n, _ = ler_dataset(caminho_csv, cache=pasta_cache)
+    invalidacao_ok = len(X_n) == 4 * len(df)
+    del X_n
+
+if leitura_ok and cache_ok and invalidacao_ok:
+    print(f"   ✅ {len(X_b)} linhas em blocos de 10 == calcular_atributos; "
+          f"cache aberto em {duracao_cache * 1000:.2f} ms e refeito após alteração")
+else:
+    print(f"   ❌ Leitura: leitura_ok={leitura_ok}, cache_ok={cache_ok}, "
+          f"invalidacao_ok={invalidacao_ok}")
+    sys.exit(1)
+
+print("\n[17] Testando cache do treino (chaves por conteúdo + despejo LRU)...")
+from cache_treino import CacheTreino
+
+with tempfile.TemporaryDirectory() as pasta:
+    caminho_csv = os.path.join(pasta, "dataset.xls")
+    with open("dataset.xls", "rb") as origem, open(caminho_csv, "wb") as destino:
+        destino.write(origem.read())
+    comando = [sys.executable, "-X", "importtime", os.path.abspath("treinar_modelo.py"),
+               "--jobs", "1", "--cache", os.path.join(pasta, "cache")]
+
+    execucoes = []
+    for _ in range(2):
+        inicio = time.perf_counter()
+        resultado = subprocess.run(comando, cwd=pasta, capture_output=True, text=True,
+                                   timeout=300)
+        duracao = time.perf_counter() - inicio
+        if resultado.returncode != 0:
+            print(f"   ❌ treinar_modelo.py falhou: {resultado.stderr[-500:]}")
+            sys.exit(1)
+        with open(os.path.join(pasta, "modelo_potencia.json"), "rb") as arquivo:
+            artefato = arquivo.read()
+        importados = {linha.split("|")[-1].strip().split(".")[0]
+                      for linha in resultado.stderr.splitlines()
+                      if linha.startswith("import time:")}
+        execucoes.append((duracao, artefato, importados & set(MODULOS_PROIBIDOS)))
+
+    (_, artefato_1, _), (duracao_2, artefato_2, proibidos_2) = execucoes
+    reexecucao_ok = duracao_2 < 1.0 and artefato_1 == artefato_2 and not proibidos_2
+
+    # Mesmo conteúdo com mtime novo: mesma chave; conteúdo novo: outra chave
+    cache = CacheTreino(os.path.join(pasta, "cache"))
+    sha_antes = cache.hash_dataset(caminho_csv)
+    os.utime(caminho_csv, (time.time() + 10, time.time() + 10))
+    sha_tocado = cache.hash_dataset(caminho_csv)
+    with open(caminho_csv, "a", encoding="utf-8") as destino:
+        destino.write("1,1.8,-0.03,0.67\n")
+    chave_ok = sha_antes == sha_tocado != cache.hash_dataset(caminho_csv)
+
+    # Limite de 1 kB: cada entrada nova despeja as menos recentes
+    pequeno = CacheTreino(os.path.join(pasta, "pequeno"), limite_mb=1 / 1024)
+    for i in range(3):
+        with pequeno.gravar(f"e{i}") as entrada:
+            with open(os.path.join(entrada, "dados.bin"), "wb") as arquivo:
+                arquivo.write(bytes(600))
+    despejo_ok = [nome for _, _, nome in pequeno.entradas()] == ["e2"]
+
+if reexecucao_ok and chave_ok and despejo_ok:
+    print(f"   ✅ Reexecução sem mudanças em {duracao_2:.2f} s, artefato idêntico e "
+          f"sem sklearn/pandas; chave pelo conteúdo; despejo LRU")
+else:
+    print(f"   ❌ Cache: {duracao_2:.2f} s, artefato igual={artefato_1 == artefato_2}, "
+          f"proibidos={sorted(proibidos_2)}, chave_ok={chave_ok}, despejo_ok={despejo_ok}")
+    sys.exit(1)
+
+print("\n[18] Testando varredura de k do k-NN (uma consulta de vizinhos por dobra)...")
+from selecao_knn import varrer_k, varrer_k_referencia
+
+X_knn = calcular_atributos(*base.T)
+y_knn = df["potencia"].values
+# Base sintética maior e com ruído: F1 diferente para cada k
+gerador = np.random.default_rng(0)
+X_ruido = gerador.normal(size=(2000, 5))
+y_ruido = (X_ruido[:, 0] + 0.5 * X_ruido[:, 1] + gerador.normal(size=2000) > 0).astype(int)
+
+knn_ok = True
+for X_v, y_v, valores_k in [(X_knn, y_knn, range(3, 16)), (X_ruido, y_ruido, range(1, 41))]:
+    inicio = time.perf_counter()
+    resultados_knn, melhor_k = varrer_k(X_v, y_v, valores_k)
+    duracao_knn = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    referencia_knn, melhor_ref = varrer_k_referencia(X_v, y_v, valores_k)
+    duracao_ref = time.perf_counter() - inicio
+    knn_ok &= melhor_k == melhor_ref and all(
+        np.allclose(resultados_knn[k], referencia_knn[k]) for k in valores_k
+    )
+
+if knn_ok:
+    print(f"   ✅ Tabelas de F1 e melhor k iguais ao cross_val_score; 2000 amostras x "
+          f"40 k em {duracao_knn:.2f} s (laço: {duracao_ref:.2f} s)")
+else:
+    print(f"   ❌ Varredura de k divergiu: melhor {melhor_k} vs {melhor_ref}")
+    sys.exit(1)
+
+print("\n[19] Testando registro de modelos (troca a quente e reversão)...")
+import threading
+from registro_modelos import RegistroModelos
+
+with tempfile.TemporaryDirectory() as pasta:
+    registro = RegistroModelos(os.path.join(pasta, "registro"))
+    v1 = registro.publicar("modelo_svm_potencia.json", sav="modelo_svm_potencia.sav")
+
+    # Segunda versão: mesmo modelo com o viés deslocado (outra resposta)
+    dados_v2 = ModeloLinear.de_artefato("modelo_svm_potencia.json").para_dict()
+    dados_v2["intercepto"] += 3.0
+    dados_v2["dataset_sha256"] = "f" * 64
+    caminho_v2 = os.path.join(pasta, "v2.json")
+    ModeloLinear.de_dict(dados_v2).salvar(caminho_v2)
+    v2 = registro.publicar(caminho_v2, ativar=False)
+
+    esperado_v = {v: ModeloLinear.de_artefato(os.path.join(registro.pasta_versoes, v,
+                                                           "modelo.json")).prever(1.2, -0.02, 0.5)
+                  for v in (v1, v2)}
+    mp.usar_registro(registro.pasta, intervalo=0.01)
+    vistas, erros, parar = [], [], threading.Event()
+
+    def consultar():
+        while not parar.is_set():
+            try:
+                resultado = mp.prever(1.2, -0.02, 0.5)
+                if tuple(resultado) != esperado_v[resultado.versao]:
+                    erros.append(("divergente", resultado.versao))
+                vistas.append(resultado.versao)
+            except Exception as e:  # noqa: BLE001 - toda falha conta
+                erros.append(repr(e))
+
+    threads = [threading.Thread(target=consultar) for _ in range(3)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    registro.ativar(v2)
+    time.sleep(0.1)
+    corte = len(vistas)
+    registro.reverter()
+    time.sleep(0.1)
+    parar.set()
+    for t in threads:
+        t.join()
+
+    versao_apos_reverter = mp.versao_modelo()
+    mp.usar_registro()
+    mp.invalidar_modelo()
+
+nomes_ok = v1.startswith("0001-") and v2 == "0002-ffffffffffff"
+troca_ok = v2 in vistas[:corte] and vistas[-1] == v1 and versao_apos_reverter == v1
+if nomes_ok and troca_ok and not erros and mp.prever(1.2, -0.02, 0.5).versao is None:
+    print(f"   ✅ {len(vistas)} predições em 3 threads, sem erro; {v1} → {v2} → {v1} "
+          f"(reversão) e cada resultado com a versão que o produziu")
+else:
+    print(f"   ❌ Registro: nomes_ok={nomes_ok}, troca_ok={troca_ok}, erros={erros[:3]}")
+    sys.exit(1)
+
+print("\n[20] Testando motor multicanal (estado struct-of-arrays)...")
+from motor_canais import MotorCanais, prever_canais
+from detector_regime import DetectorRegime
+
+gerador = np.random.default_rng(1)
+n_canais, ciclos = 12, 150
+# Canais entre uma leitura Baixa e uma Alta: o regime oscila
+rotulos = df["potencia"].values
+centro = (base[gerador.choice(np.flatnonzero(rotulos == 0), n_canais)]
+          + base[gerador.choice(np.flatnonzero(rotulos == 1), n_canais)]) / 2
+bloco = centro[None] + gerador.normal(0, [1.5, 0.03, 0.03], size=(ciclos, n_canais, 3))
+bloco[7, 2] = np.nan  # canal sem dado em um ciclo
+
+canais = MotorCanais(n_canais)
+por_ciclo = [canais.atualizar(bloco[t]) for t in range(ciclos)]
+canais_bloco = MotorCanais(n_canais)
+resultado_bloco = canais_bloco.atualizar_bloco(bloco)
+
+# Referência: prever() e um DetectorRegime por canal, leitura a leitura
+detectores = [DetectorRegime(periodo=1.0) for _ in range(n_canais)]
+transicoes = np.zeros(n_canais, dtype=np.int64)
+canais_ok = True
+for t in range(ciclos):
+    for c in range(n_canais):
+        if np.isnan(bloco[t, c]).any():
+            canais_ok &= por_ciclo[t][0][c] == -1 and np.isnan(por_ciclo[t][2][c])
+            continue
+        classe, _, prob_alta = mp.prever(*bloco[t, c])
+        canais_ok &= (classe == por_ciclo[t][0][c] == resultado_bloco[0][t, c]
+                      and abs(prob_alta - por_ciclo[t][2][c]) < 1e-9)
+        transicoes[c] += detectores[c].atualizar(prob_alta) is not None
+
+estado_ok = (np.array_equal(canais.transicoes, transicoes)
+             and canais.regime.tolist() == [d.regime for d in detectores]
+             and np.allclose(canais.prob_suavizada, [d.prob_suavizada for d in detectores])
+             and canais.invalidas.sum() == 1 and canais.leituras.sum() == ciclos * n_canais - 1
+             and all(np.array_equal(getattr(canais, nome), getattr(canais_bloco, nome))
+                     for nome in ("classe", "regime", "leituras", "altas", "transicoes")))
+classes_no, _, _, regimes_no = prever_canais(bloco[0])
+no_ok = classes_no == resultado_bloco[0][0].tolist() and len(regimes_no) == n_canais
+
+if canais_ok and estado_ok and no_ok:
+    print(f"   ✅ {n_canais} canais x {ciclos} ciclos == prever() + DetectorRegime por canal "
+          f"({int(transicoes.sum())} transições); NaN ignorado; bloco == ciclo a ciclo")
+else:
+    print(f"   ❌ Multicanal: canais_ok={canais_ok}, estado_ok={estado_ok}, no_ok={no_ok}")
+    sys.exit(1)
+
+print("\n[21] Testando preditor unitário (saída reaproveitada)...")
+import tracemalloc
+
+preditor = mp.criar_preditor()
+motor = mp.carregar_motor()
+amostra = base[gerador.choice(len(base), 500)].tolist()
+iguais = all(
+    tuple(preditor.prever(*leitura)) == motor.prever(*leitura) == tuple(mp.prever(*leitura))
+    for leitura in amostra
+)
+preditor.entrada[:] = amostra[0]
+buffer_ok = (preditor.avaliar() is preditor.saida
+             and preditor.prever(*amostra[1]) is preditor.saida
+             and tuple(preditor.avaliar()) == motor.prever(*amostra[0])
+             and type(preditor.saida[0]) is int)
+
+# Versão do motor de carregar_motor(); atualizar() segue o modelo atual
+motor_outro = ModeloLinear.de_dict(motor.para_dict())
+motor_outro.versao_modelo = "teste-outra"
+versao_ok = preditor.versao == motor.versao_modelo and not preditor.atualizar()
+preditor_outro = type(preditor)(motor, resolver=lambda: motor_outro)
+versao_ok = (versao_ok and preditor_outro.atualizar() and preditor_outro.motor is motor_outro
+             and preditor_outro.versao == "teste-outra" and not preditor_outro.atualizar())
+
+
+def _alocacao(funcao, chamadas=2000):
+    """(memória retida, pico) em bytes durante `chamadas` chamadas."""
+    funcao()
+    tracemalloc.start()
+    antes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _ in range(chamadas):
+        funcao()
+    depois, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return depois - antes, pico - antes
+
+
+x_max, x_min, x_media = amostra[2]
+retido, pico = _alocacao(lambda: preditor.prever(x_max, x_min, x_media))
+_, pico_prever = _alocacao(lambda: mp.prever(x_max, x_min, x_media))
+# Só a sobra do próprio laço de medição (frames e floats reciclados)
+alocacao_ok = retido <= 256 and pico <= 512 and pico < pico_prever
+
+if iguais and buffer_ok and versao_ok and alocacao_ok:
+    print(f"   ✅ {len(amostra)} leituras == motor.prever() == prever(); mesmo buffer "
+          f"a cada chamada; classe int; versão via carregar_motor(); "
+          f"2000 chamadas: {retido} B retidos, pico {pico} B "
+          f"(prever(): {pico_prever} B)")
+else:
+    print(f"   ❌ Preditor: iguais={iguais}, buffer_ok={buffer_ok}, versao_ok={versao_ok}, "
+          f"retido={retido}, pico={pico}, pico_prever={pico_prever}")
+    sys.exit(1)
+
+print("\n[22] Testando modo --stream (linhas inválidas e bordas)...")
+entrada_fluxo = (b"1.80,-0.03,0.67\r\n"    # CRLF
+                 b"\r\n"                    # vazia
+                 b"abc,1,2\n"                # não numérica
+                 b"1,2\n"                    # faltando valor
+                 b"nan,0,0.5\n"              # NaN
+                 b"1.5,0,-0.000001\n"        # denominador nulo na razão
+                 b"1.13|-0.01|0.47")          # sem \n final
+n_linhas_fluxo = 7
+for script in ["modelo_predicao.py", "usar_modelo.py"]:
+    resultado = subprocess.run(
+        [sys.executable, script, "--stream"], input=entrada_fluxo,
+        capture_output=True, timeout=30,
+    )
+    saida_fluxo = resultado.stdout.decode().splitlines()
+    esperados = {0: motor.prever(1.80, -0.03, 0.67), 6: motor.prever(1.13, -0.01, 0.47)}
+    fluxo_ok = (
+        resultado.returncode == 0
+        and len(saida_fluxo) == n_linhas_fluxo
+        and all(saida_fluxo[i].startswith("ERRO") for i in (1, 2, 3, 4))
+        and saida_fluxo[5] == mp.formatar_saida(*motor.prever(1.5, 0.0, -0.000001))
+        and all(saida_fluxo[i] == mp.formatar_saida(*esperados[i]) for i in esperados)
+    )
+    if fluxo_ok:
+        print(f"   ✅ {script} --stream: {n_linhas_fluxo} linhas → {len(saida_fluxo)} "
+              f"respostas, código 0")
+    else:
+        print(f"   ❌ {script} --stream (código {resultado.returncode}): {saida_fluxo} "
+              f"{resultado.stderr.decode()[-300:]}")
+        sys.exit(1)
+
+print("\n[23] Testando recusa de leituras não finitas (NaN/inf)...")
+from anel_compartilhado import _prever_por_leitura
+
+
+def _recusa(funcao, *args):
+    """True se a chamada levanta ValueError."""
+    try:
+        funcao(*args)
+    except ValueError:
+        return True
+    return False
+
+
+invalidas = [(np.nan, 0.0, 0.5), (1.8, np.inf, 0.5), (1.8, -0.03, -np.inf), (0.0, 0.0, -1e-6)]
+validas_lote = np.array([[1.80, -0.03, 0.67]] * 40)
+recusas_ok = all(
+    _recusa(motor.prever, *leitura) and _recusa(mp.prever, *leitura)
+    and _recusa(mp.criar_preditor().prever, *leitura) and _recusa(mp.prever_detalhado, *leitura)
+    for leitura in invalidas
+)
+for n in (5, 40):  # caminho escalar e vetorizado
+    bloco_nan = validas_lote[:n].copy()
+    bloco_nan[n // 2, 0] = np.nan
+    recusas_ok = recusas_ok and _recusa(motor.prever_lote, *bloco_nan.T)
+    recusas_ok = recusas_ok and _recusa(mp.prever_lote, *bloco_nan.T)
+recusas_ok = recusas_ok and _recusa(motor.prever_lote, *np.full((30, 3), np.nan).T)
+mp.ativar_memoizacao()
+try:
+    # A memoização avalia a leitura quantizada: a razão 0/0 não chega ao motor
+    recusas_ok = recusas_ok and all(_recusa(mp.prever, *leitura) for leitura in invalidas[:3])
+finally:
+    mp.desativar_memoizacao()
+
+# Quem atende várias leituras recusa só a inválida
+anel_nan = _prever_por_leitura(motor, np.array([[1.80, -0.03, 0.67], [np.nan, 0.0, 0.5]]))
+cli = subprocess.run([sys.executable, "modelo_predicao.py", "nan", "0", "0.5"],
+                     capture_output=True, text=True, timeout=30)
+
+
+async def _servidor_com_nan():
+    agrupador = sp.AgrupadorLotes(janela=200e-6, lote_maximo=64)
+
+    async def atender(leitor, escritor):
+        await sp._atender_cliente(leitor, escritor, agrupador)
+
+    servidor = await asyncio.start_server(atender, "127.0.0.1", 0)
+    leitor, escritor = await asyncio.open_connection(
+        "127.0.0.1", servidor.sockets[0].getsockname()[1])
+    linhas = ["1.80|-0.03|0.67", "nan|0|0.5", "1.13|-0.01|0.47", "inf|0|0.5"]
+    escritor.write(("\n".join(linhas) + "\n").encode())  # mesmo lote
+    respostas = [(await leitor.readline()).decode().strip() for _ in linhas]
+    escritor.close()
+    servidor.close()
+    await servidor.wait_closed()
+    return respostas
+
+
+respostas_nan = asyncio.run(_servidor_com_nan())
+isolamento_ok = (
+    anel_nan[0].tolist() == list(motor.prever(1.80, -0.03, 0.67))
+    and anel_nan[1, 0] == -1 and np.isnan(anel_nan[1, 1:]).all()
+    and cli.returncode == 1 and cli.stdout.startswith("ERRO")
+    and [r.startswith("ERRO") for r in respostas_nan] == [False, True, False, True]
+    and respostas_nan[0] == mp.formatar_saida(*motor.prever(1.80, -0.03, 0.67))
+)
+
+if recusas_ok and isolamento_ok:
+    print("   ✅ NaN/inf (e razão 0/0) → ValueError nos caminhos escalar, vetorizado, "
+          "memoizado e preditor unitário; CLI sai com ERRO; servidor e anel recusam só a leitura")
+else:
+    print(f"   ❌ Não finitos: recusas_ok={recusas_ok}, isolamento_ok={isolamento_ok}, "
+          f"servidor={respostas_nan}, cli={cli.stdout.strip()!r}")
+    sys.exit(1)
+
+print("\n[24] Testando histograma de latências e metricas()...")
+histograma = mp._Histograma()
+for ns, vezes in ((1000, 90), (5000, 9), (1_000_000, 1)):
+    for _ in range(vezes):
+        histograma.registrar(ns)
+# 1000 ns: 2^9..2^10 em 8 faixas de 64 ns -> faixa [960, 1023]; 5000 -> [4608, 5119]
+faixas_ok = (
+    histograma.faixas[63] == 90 and histograma.faixas[81] == 9
+    and histograma.faixas[143] == 1 and sum(histograma.faixas) == 100
+    and (histograma.percentil(50), histograma.percentil(95), histograma.percentil(99),
+         histograma.percentil(100)) == (1023, 5119, 5119, 1_000_000)
+)
+
+# Abaixo de 8 ns as faixas são exatas; acima, o limite superior da faixa de
+# ns fica em [ns, ns * 1,125] e as faixas crescem com ns
+limites_ok = True
+indice_anterior = -1
+for ns in list(range(0, 4096)) + [10**k + d for k in range(4, 13) for d in (-1, 0, 1)]:
+    unico = mp._Histograma()
+    unico.registrar(ns)
+    unico.registrar(2**62)
+    indice = unico.faixas.index(1)
+    limite = unico.percentil(50)
+    limites_ok = limites_ok and indice >= indice_anterior and ns <= limite <= ns * 1.125
+    indice_anterior = indice
+
+mp.zerar_metricas()
+for ns, itens in ((1000, 1), (1000, 3), (5000, 4)):
+    mp._registrar("teste/etapa", ns, itens)
+retrato = mp.metricas()["teste/etapa"]
+mp.ativar_metricas()
+try:
+    for leitura in base[:10].tolist():
+        mp.prever(*leitura)
+    medidas = mp.metricas()
+finally:
+    mp.ativar_metricas(False)
+    mp.zerar_metricas()
+metricas_ok = (
+    retrato["chamadas"] == 3 and retrato["itens"] == 8
+    and abs(retrato["media_us"] - 7000 / 3 / 1000) < 1e-12
+    and retrato["p50_us"] == 1.023 and retrato["p99_us"] == 5.0
+    and retrato["max_us"] == 5.0
+    and all(medidas[f"prever/{etapa}"]["chamadas"] == 10
+            for etapa in ("carregar_motor", "decisao", "probabilidades", "total"))
+    and mp.metricas() == {}
+)
+
+if faixas_ok and limites_ok and metricas_ok:
+    print(f"   ✅ Faixas e p50/p95/p99 conferidos com latências conhecidas; limite da faixa "
+          f"<= 12,5% acima da medida; metricas() com {len(medidas)} etapas de prever()")
+else:
+    print(f"   ❌ Histograma: faixas_ok={faixas_ok}, limites_ok={limites_ok}, "
+          f"metricas_ok={metricas_ok}, retrato={retrato}")
+    sys.exit(1)
+
+print("\n[25] Testando janelas de corrente (visão com strides x laço simples)...")
+import janelas_corrente as jc
+
+
+def _janelas_laco(amostras, tamanho, passo):
+    """max/min/média de cada janela completa, em laço Python."""
+    maxs, mins, medias = [], [], []
+    for inicio in range(0, len(amostras) - tamanho + 1, passo):
+        janela = [float(x) for x in amostras[inicio:inicio + tamanho]]
+        maxs.append(max(janela))
+        mins.append(min(janela))
+        medias.append(sum(janela) / tamanho)
+    return maxs, mins, medias
+
+
+sinal = gerador.normal(0.5, 0.4, 1003)
+janelas_ok = True
+for amostras, tamanho, passo in (
+    (sinal, 50, None), (sinal, 50, 1), (sinal, 50, 7), (sinal, 10, 25),
+    (sinal.astype(np.float32), 64, 3), (sinal[:30], 50, 2), (sinal[:50], 50, 4),
+):
+    esperado = _janelas_laco(amostras, tamanho, passo or tamanho)
+    obtido = jc.estatisticas_janelas(amostras, tamanho, passo)
+    janelas_ok = janelas_ok and all(
+        len(o) == len(e) and o.dtype == np.float64 and np.allclose(o, e, rtol=0, atol=1e-12)
+        for o, e in zip(obtido, esperado)
+    )
+
+# Visão sem cópia; matriz 2-D usada como está; sinal curto -> nenhuma janela
+visao = jc.visao_janelas(sinal, 50, 7)
+matriz = sinal[:1000].reshape(20, 50)
+classes_curto, _, alta_curto = jc.prever_janelas(sinal[:30], 50)
+classes_j, _, alta_j = jc.prever_janelas(matriz)
+classes_ref_j, _, alta_ref_j = mp.prever_lote(
+    matriz.max(axis=1), matriz.min(axis=1), matriz.mean(axis=1))
+visao_ok = (
+    np.shares_memory(visao, sinal) and visao.shape == ((1003 - 50) // 7 + 1, 50)
+    and len(classes_curto) == 0 and len(alta_curto) == 0
+    and classes_j.tolist() == classes_ref_j.tolist() and np.allclose(alta_j, alta_ref_j)
+)
+for argumentos in ((sinal,), (sinal, 0), (sinal, 50, 0), (matriz, 10), (sinal.reshape(1, 1, -1), 5)):
+    try:
+        jc.visao_janelas(*argumentos)
+        visao_ok = False
+    except ValueError:
+        pass
+
+if janelas_ok and visao_ok:
+    print("   ✅ max/min/média == laço Python (passo 1, 7, 25 > janela, float32, "
+          "sinal menor que a janela); visão sem cópia; prever_janelas == prever_lote")
+else:
+    print(f"   ❌ Janelas: janelas_ok={janelas_ok}, visao_ok={visao_ok}")
+    sys.exit(1)
+
+print("\n[26] Testando cliente do servidor (socket Unix, TCP e fallback local)...")
+import socket
+import time
+import cliente_predicao as cp
+
+leitura_cliente = (1.80, -0.03, 0.67)
+esperado_cliente = mp.formatar_saida(*mp.prever(*leitura_cliente))
+ambiente_cliente = {k: v for k, v in os.environ.items() if not k.startswith("PREDICAO_")}
+
+
+def _cliente_cli(**variaveis):
+    return subprocess.run(
+        [sys.executable, "cliente_predicao.py", *map(str, leitura_cliente)],
+        capture_output=True, text=True, timeout=120, env={**ambiente_cliente, **variaveis},
+    )
+
+
+with tempfile.TemporaryDirectory() as pasta:
+    caminho_sock = os.path.join(pasta, "predicao.sock")
+    servidor = subprocess.Popen(
+        [sys.executable, "servidor_predicao.py", "--socket", caminho_sock],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        limite = time.monotonic() + 60
+        while not os.path.exists(caminho_sock) and time.monotonic() < limite:
+            time.sleep(0.05)
+        with cp.ClientePredicao(caminho_socket=caminho_sock) as cliente:
+            respostas_sock = [cliente.consultar(*leitura_cliente), cliente.consultar("nan", 0, 0.5)]
+            tupla_sock = cliente.prever(*leitura_cliente)
+        cli_sock = _cliente_cli(PREDICAO_SOCKET=caminho_sock)
+    finally:
+        servidor.terminate()
+        servidor.wait(timeout=30)
+
+    # Servidor fora do ar (socket sem servidor e porta TCP livre): predição local
+    with socket.socket() as livre:
+        livre.bind(("127.0.0.1", 0))
+        porta_livre = livre.getsockname()[1]
+    try:
+        cp.ClientePredicao(caminho_socket=os.path.join(pasta, "ausente.sock"))
+        recusa_ok = False
+    except OSError:
+        recusa_ok = True
+    cli_sem_sock = _cliente_cli(PREDICAO_SOCKET=os.path.join(pasta, "ausente.sock"))
+    cli_sem_tcp = _cliente_cli(PREDICAO_PORTA=str(porta_livre))
+
+cliente_ok = (
+    respostas_sock[0] == esperado_cliente and respostas_sock[1].startswith("ERRO")
+    and type(tupla_sock[0]) is int and mp.formatar_saida(*tupla_sock) == esperado_cliente
+    and cli_sock.returncode == 0 and cli_sock.stdout.strip() == esperado_cliente
+)
+fallback_ok = recusa_ok and all(
+    r.returncode == 0 and r.stdout.strip() == esperado_cliente for r in (cli_sem_sock, cli_sem_tcp)
+)
+
+if cliente_ok and fallback_ok:
+    print("   ✅ Ida e volta pelo socket Unix (classe + ERRO); CLI com PREDICAO_SOCKET; "
+          "sem servidor (Unix e TCP) a CLI prevê localmente com a mesma saída")
+else:
+    print(f"   ❌ Cliente: cliente_ok={cliente_ok}, fallback_ok={fallback_ok}, "
+          f"respostas={respostas_sock}, cli={cli_sock.stdout!r}, "
+          f"sem_sock={cli_sem_sock.stdout!r}, sem_tcp={cli_sem_tcp.stdout!r}")
+    sys.exit(1)
+
+print("\n[27] Testando campo de versão opcional nas saídas de texto...")
+import io
+import usar_modelo as um
+
+
+async def _servidor_com_versao():
+    agrupador = sp.AgrupadorLotes(janela=0.05, lote_maximo=64)
+
+    async def atender(leitor, escritor):
+        await sp._atender_cliente(leitor, escritor, agrupador)
+
+    servidor = await asyncio.start_server(atender, "127.0.0.1", 0)
+    porta = servidor.sockets[0].getsockname()[1]
+    com, sem = [await asyncio.open_connection("127.0.0.1", porta) for _ in range(2)]
+    com[1].write(b"VERSAO\n")
+    respostas = [(await com[0].readline()).decode().strip()]
+    # As duas conexões no mesmo lote: só a que pediu recebe a versão
+    com[1].write(b"1.80|-0.03|0.67\nnan|0|0.5\n")
+    sem[1].write(b"1.80|-0.03|0.67\n")
+    respostas += [(await com[0].readline()).decode().strip() for _ in range(2)]
+    respostas.append((await sem[0].readline()).decode().strip())
+    for _, escritor in (com, sem):
+        escritor.close()
+    servidor.close()
+    await servidor.wait_closed()
+    return respostas
+
+
+leitura_v = (1.80, -0.03, 0.67)
+base_v = mp.formatar_saida(*motor.prever(*leitura_v))
+with tempfile.TemporaryDirectory() as pasta:
+    registro = RegistroModelos(os.path.join(pasta, "registro"))
+    versao_v = registro.publicar("modelo_svm_potencia.json", sav="modelo_svm_potencia.sav")
+    mp.usar_registro(registro.pasta, intervalo=0.01)
+    try:
+        lote_v = mp._responder_lote(["1.80,-0.03,0.67", "abc"], mp.carregar_motor(), True)
+        leitura_fd, escrita_fd = os.pipe()
+        os.write(escrita_fd, b"1.80,-0.03,0.67\n1,2\n")
+        os.close(escrita_fd)
+        saida_v = io.StringIO()
+        mp.processar_fluxo(leitura_fd, saida_v, com_versao=True)
+        os.close(leitura_fd)
+        servidor_v = asyncio.run(_servidor_com_versao())
+        unitario_v = sp.responder("1.80|-0.03|0.67", com_versao=True)
+        potencia_v = um.prever_potencia(*leitura_v)
+    finally:
+        mp.usar_registro()
+        mp.invalidar_modelo()
+
+# usar_modelo --versao imprime a versão do motor que fez a predição, mesmo
+# que o registro troque de versão logo depois (carregar_motor() seguinte)
+motores_v = [ModeloLinear.de_dict(dict(motor.para_dict(), versao_modelo=v))
+             for v in ("0001-antiga", "0002-nova")]
+carregar_original, argv_original = um.carregar_motor, sys.argv
+um.carregar_motor = lambda: motores_v.pop(0)
+sys.argv = ["usar_modelo.py", "--versao", *map(str, leitura_v)]
+saida_troca = io.StringIO()
+try:
+    with contextlib.redirect_stdout(saida_troca):
+        um.main()
+finally:
+    um.carregar_motor, sys.argv = carregar_original, argv_original
+
+com_registro_ok = (
+    mp.formatar_saida(1, 0.25, 0.75, versao=None) == "1|0.250000|0.750000"
+    and lote_v[0] == f"{base_v}|{versao_v}" and lote_v[1].startswith("ERRO")
+    and saida_v.getvalue().splitlines()[0] == f"{base_v}|{versao_v}"
+    and saida_v.getvalue().splitlines()[1].startswith("ERRO")
+    and servidor_v[0] == versao_v and servidor_v[1] == f"{base_v}|{versao_v}"
+    and servidor_v[2].startswith("ERRO") and servidor_v[3] == base_v
+    and unitario_v == f"{base_v}|{versao_v}"
+    and tuple(potencia_v) == motor.prever(*leitura_v) and potencia_v.versao == versao_v
+    and saida_troca.getvalue().strip() == f"{base_v}|Alta Potência|0001-antiga"
+)
+
+# CLIs fora do registro: quarto campo "-" só com --versao
+ambiente_v = {k: v for k, v in os.environ.items() if not k.startswith("PREDICAO_")}
+ambiente_v["PREDICAO_SOCKET"] = os.path.join(tempfile.gettempdir(), "sem-servidor.sock")
+clis_v = [
+    subprocess.run([sys.executable, *comando], input=entrada, capture_output=True,
+                   text=True, timeout=120, env=ambiente_v)
+    for comando, entrada in (
+        (["modelo_predicao.py", "--versao", *map(str, leitura_v)], None),
+        (["usar_modelo.py", "--versao", *map(str, leitura_v)], None),
+        (["cliente_predicao.py", "--versao", *map(str, leitura_v)], None),
+        (["modelo_predicao.py", "--stream", "--versao"], "1.80,-0.03,0.67\n"),
+        (["usar_modelo.py", "--stream"], "1.80,-0.03,0.67\n"),
+    )
+]
+saidas_v = [r.stdout.strip() for r in clis_v]
+cli_v_ok = all(r.returncode == 0 for r in clis_v) and saidas_v == [
+    f"{base_v}|-", f"{base_v}|Alta Potência|-", f"{base_v}|-", f"{base_v}|-", base_v,
+]
+
+if com_registro_ok and cli_v_ok:
+    print(f"   ✅ Versão {versao_v} como quarto campo só quando pedida (--versao, "
+          f"comando VERSAO por conexão); sem pedido, formato de 3 campos inalterado")
+else:
+    print(f"   ❌ Campo de versão: com_registro_ok={com_registro_ok}, cli_v_ok={cli_v_ok}, "
+          f"lote={lote_v}, servidor={servidor_v}, clis={saidas_v}, "
+          f"usar_modelo={saida_troca.getvalue().strip()!r}")
+    sys.exit(1)
+
+# 28. Resumo final
 print("\n" + "=" * 70)
 print("RESUMO DOS TESTES")
 print("=" * 70)
@@ -187,6 +1497,28 @@ print("✅ Bibliotecas Python: OK")
 print("✅ Carregamento do modelo: OK")
 print(f"✅ Predições: {taxa_acerto:.1f}% de acerto")
 print("✅ Script usar_modelo.py: OK")
+print("✅ Motor linear (sem sklearn): OK")
+print("✅ Orçamento de importação das CLIs: OK")
+print("✅ Anel de memória compartilhada: OK")
+print("✅ Servidor com agrupamento em lotes: OK")
+print("✅ Detector de mudança de regime: OK")
+print("✅ Memoização de prever(): OK")
+print("✅ Tabela de decisão pré-calculada: OK")
+print("✅ Treino incremental: OK")
+print("✅ Treino no modo grande: OK")
+print("✅ Seleção de modelo em paralelo: OK")
+print("✅ Leitura do dataset em blocos: OK")
+print("✅ Cache do treino: OK")
+print("✅ Varredura de k do k-NN: OK")
+print("✅ Registro de modelos: OK")
+print("✅ Motor multicanal: OK")
+print("✅ Preditor unitário: OK")
+print("✅ Modo --stream: OK")
+print("✅ Recusa de leituras não finitas: OK")
+print("✅ Histograma de latências: OK")
+print("✅ Janelas de corrente: OK")
+print("✅ Cliente do servidor (socket Unix e fallback): OK")
+print("✅ Campo de versão opcional: OK")
 print("\n" + "=" * 70)
 print("🎉 TODOS OS TESTES PASSARAM!")
 print("🚀 MODELO PRONTO PARA INTEGRAÇÃO COM LABVIEW!")
@@ -2,166 +2,990 @@
 Script para treinar modelo de classificação de potência elétrica
 e salvá-lo em formato .sav para integração com LabVIEW
 
+Modos:
+    padrao  StandardScaler + SVC(kernel="linear", probability=True) com
+            validação cruzada 5-fold (dataset.xls e bases pequenas)
+    grande  StandardScaler + LinearSVC (liblinear, primal) com calibração de
+            Platt em um holdout separado. Escala linearmente com o número de
+            linhas: sem a CV interna de probability=True e sem a CV externa.
+            Gera só o artefato JSON (mesma ordem de atributos e mesma saída
+            CLASSE|PROB_BAIXA|PROB_ALTA), sem .sav; para servi-lo, publique
+            no registro (python3 registro_modelos.py publicar <artefato>).
+
+Cada fase informa o tempo de parede e o pico de memória residente.
+
+Seleção de modelo: --busca-C (e, no modo padrao, --kernels) avalia cada
+candidato por StratifiedKFold, com as tarefas (candidato, dobra)
+distribuídas em --jobs processos que leem X, y e as dobras da memória
+compartilhada.
+
+Cache (.cache_treino/, ver cache_treino.py): atributos, dobras, scores da
+CV e modelo ajustado ficam guardados sob chaves formadas pelo SHA-256 do
+dataset, pelos hiperparâmetros e pelas versões das bibliotecas. Repetir o
+treino sem mudanças vai direto à exportação, sem importar sklearn/pandas.
+
+Uso:
+    python3 treinar_modelo.py
+    python3 treinar_modelo.py --modo grande --dataset leituras_2025.csv
+    python3 treinar_modelo.py --busca-C 0.01 0.1 1 10 100 --kernels linear rbf --jobs 8
+
 Autor: APS 1 - Projeto de Aprendizado de Máquina
 Data: 2025
 """
 
-import pandas as pd
-import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.svm import SVC
-from sklearn.pipeline import make_pipeline
-from sklearn.model_selection import cross_val_score, StratifiedKFold
-from sklearn.metrics import classification_report, confusion_matrix
-import joblib
+import argparse
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
 import warnings
+from contextlib import contextmanager
+
+import numpy as np
+
+from cache_treino import CacheTreino, LIMITE_MB, PASTA_CACHE, versoes_bibliotecas
+from carregar_dataset import COLUNAS_CSV, gravar_npy, ler_dataset
+from modelo_predicao import COLUNAS_ATRIBUTOS
+from motor_linear import ModeloLinear, sha256_arquivo
 warnings.filterwarnings('ignore')
 
-print("="*70)
-print("TREINAMENTO DO MODELO - CLASSIFICAÇÃO DE POTÊNCIA ELÉTRICA")
-print("="*70)
+# sklearn, pandas e joblib são importados só nas etapas que treinam: um
+# acerto de cache não paga essas importações.
+
+ARQUIVO_MODELO = "modelo_potencia.sav"
+ARQUIVO_INFO = "modelo_info.sav"
+N_DOBRAS = 5
+SEMENTE = 42
+# Entra nas chaves do cache: incrementar quando o treino mudar de resultado
+VERSAO_TREINO = 1
+
 
 # ============================================================================
-# 1. CARREGAR E PRÉ-PROCESSAR DADOS
+# MEDIÇÃO DAS FASES
 # ============================================================================
-print("\n[1/5] Carregando dataset...")
 
-caminho = "dataset.xls"
-colunas = ['potencia', 'corrente_max_A', 'corrente_min_A', 'corrente_media_A']
-df = pd.read_csv(caminho, header=None, names=colunas)
+def _pico_memoria_mb():
+    """Pico de memória residente (VmHWM) do processo, em MB; None se indisponível."""
+    try:
+        with open("/proc/self/status", "r") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    # Sem /proc: ru_maxrss (kB no Linux) é o pico desde o início do processo.
+    # resource só existe em POSIX; no Windows o pico fica sem medição.
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _zerar_pico_memoria():
+    """Reinicia o VmHWM (Linux >= 4.0); sem suporte, o pico é acumulado."""
+    try:
+        with open("/proc/self/clear_refs", "w") as arquivo:
+            arquivo.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def medir_fase(fases, nome):
+    """
+    Registra tempo de parede e pico de memória residente de um trecho.
+
+    Args:
+        fases (list): Recebe um dict {'fase', 'segundos', 'pico_mb'}
+        nome (str): Nome da fase
+    """
+    _zerar_pico_memoria()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        fases.append({
+            "fase": nome,
+            "segundos": time.perf_counter() - inicio,
+            "pico_mb": _pico_memoria_mb(),
+        })
+
+
+def imprimir_fases(fases):
+    """Tabela de tempo e memória por fase."""
+    print(f"\n   {'Fase':<14} {'Tempo (s)':>10} {'Pico RSS (MB)':>14}")
+    for fase in fases:
+        pico = "-" if fase["pico_mb"] is None else f"{fase['pico_mb']:.1f}"
+        print(f"   {fase['fase']:<14} {fase['segundos']:>10.3f} {pico:>14}")
+    print(f"   {'total':<14} {sum(f['segundos'] for f in fases):>10.3f}")
 
-print(f"   ✓ Dataset carregado: {df.shape[0]} amostras, {df.shape[1]} colunas")
-print(f"   ✓ Distribuição de classes:")
-print(f"      - Baixa Potência (0): {(df['potencia']==0).sum()} amostras")
-print(f"      - Alta Potência (1): {(df['potencia']==1).sum()} amostras")
 
 # ============================================================================
-# 2. ENGENHARIA DE ATRIBUTOS
+# CALIBRAÇÃO DE PLATT (MODO GRANDE)
 # ============================================================================
-print("\n[2/5] Criando atributos derivados...")
 
-# Criar atributos derivados
-df["amplitude_corrente"] = df["corrente_max_A"] - df["corrente_min_A"]
-df["razao_max_media"] = df["corrente_max_A"] / (df["corrente_media_A"] + 1e-6)
+def ajustar_platt(decisoes, positivos, max_iter=100):
+    """
+    Ajusta a sigmoide de Platt P(positivo | f) = 1 / (1 + exp(A*f + B)).
+
+    Reproduz sigmoid_train() do libsvm (Newton com busca de passo e alvos
+    suavizados), vetorizado em NumPy.
+
+    Args:
+        decisoes (numpy.ndarray): Valores de decisão f (N,)
+        positivos (numpy.ndarray): True onde a amostra é da classe positiva
+
+    Returns:
+        tuple: (A, B)
+    """
+    f = np.asarray(decisoes, dtype=np.float64)
+    positivos = np.asarray(positivos, dtype=bool)
+    n_pos = int(positivos.sum())
+    n_neg = positivos.size - n_pos
+
+    alvo = np.where(positivos, (n_pos + 1.0) / (n_pos + 2.0), 1.0 / (n_neg + 2.0))
+    A, B = 0.0, math.log((n_neg + 1.0) / (n_pos + 1.0))
+
+    def objetivo(A, B):
+        f_ab = f * A + B
+        return float(np.sum(np.where(
+            f_ab >= 0,
+            alvo * f_ab + np.log1p(np.exp(-np.abs(f_ab))),
+            (alvo - 1) * f_ab + np.log1p(np.exp(-np.abs(f_ab))),
+        )))
+
+    valor = objetivo(A, B)
+    for _ in range(max_iter):
+        f_ab = f * A + B
+        e = np.exp(-np.abs(f_ab))
+        p = np.where(f_ab >= 0, e / (1 + e), 1 / (1 + e))
+        d2 = p * (1 - p)
+        h11 = float(np.dot(f * f, d2)) + 1e-12
+        h22 = float(d2.sum()) + 1e-12
+        h21 = float(np.dot(f, d2))
+        d1 = alvo - p
+        g1 = float(np.dot(f, d1))
+        g2 = float(d1.sum())
+        if abs(g1) < 1e-5 and abs(g2) < 1e-5:
+            break
+
+        det = h11 * h22 - h21 * h21
+        dA = -(h22 * g1 - h21 * g2) / det
+        dB = -(-h21 * g1 + h11 * g2) / det
+        gd = g1 * dA + g2 * dB
+
+        passo = 1.0
+        while passo >= 1e-10:
+            novo = objetivo(A + passo * dA, B + passo * dB)
+            if novo < valor + 0.0001 * passo * gd:
+                A, B, valor = A + passo * dA, B + passo * dB, novo
+                break
+            passo /= 2.0
+        else:
+            break
+
+    return A, B
+
+
+def dividir_estratificado(y, fracao, semente=42):
+    """
+    Divisão estratificada treino/holdout só com vetores de índices.
+
+    Returns:
+        tuple: (indices_treino, indices_holdout), ambos ordenados
+    """
+    rng = np.random.default_rng(semente)
+    holdout = []
+    for classe in np.unique(y):
+        indices = np.flatnonzero(y == classe)
+        rng.shuffle(indices)
+        holdout.append(indices[:max(1, int(round(fracao * indices.size)))])
+    holdout = np.sort(np.concatenate(holdout))
+    marcador = np.ones(y.size, dtype=bool)
+    marcador[holdout] = False
+    return np.flatnonzero(marcador), holdout
+
+
+def treinar_grande(X, y, C=1.0, fracao_calibracao=0.1, semente=42, fases=None):
+    """
+    LinearSVC primal + Platt em holdout, devolvendo o motor de inferência.
+
+    O LinearSVC com dual=False (Newton no primal do liblinear) custa O(N)
+    por iteração e converge em poucas iterações quando há muito mais
+    amostras que atributos; o SVC do libsvm é superlinear em N.
+
+    O escalonador e o LinearSVC são ajustados na parte de treino; a
+    sigmoide é ajustada nas decisões do holdout, na convenção do libsvm
+    (decisão com sinal invertido, classe 0 positiva), então o motor gerado
+    se comporta exatamente como um artefato exportado do SVC.
+
+    Args:
+        X (numpy.ndarray): Atributos (N x 5) na ordem de COLUNAS_ATRIBUTOS
+        y (numpy.ndarray): Rótulos 0/1 (N,)
+        C (float): Regularização do LinearSVC
+        fracao_calibracao (float): Fração estratificada reservada à calibração
+        semente (int): Semente da divisão
+        fases (list, opcional): Recebe as medições de medir_fase()
+
+    Returns:
+        tuple: (ModeloLinear, indices_calibracao)
+    """
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import LinearSVC
+
+    fases = fases if fases is not None else []
+
+    with medir_fase(fases, "divisao"):
+        treino, calibracao = dividir_estratificado(y, fracao_calibracao, semente)
 
-print(f"   ✓ Atributos criados: amplitude_corrente, razao_max_media")
+    with medir_fase(fases, "ajuste"):
+        X_treino = X[treino]
+        escalonador = StandardScaler().fit(X_treino)
+        escalonador.transform(X_treino, copy=False)
+        svm = LinearSVC(C=C, dual=False, random_state=semente)
+        svm.fit(X_treino, y[treino])
+        del X_treino
 
-# Separar features e target
-X = df.drop(columns=["potencia"])
-y = df["potencia"]
+    with medir_fase(fases, "calibracao"):
+        motor = ModeloLinear(
+            media=escalonador.mean_, escala=escalonador.scale_,
+            coef=svm.coef_[0], intercepto=svm.intercept_[0],
+            platt_a=0.0, platt_b=0.0, classes=svm.classes_,
+            atributos=COLUNAS_ATRIBUTOS,
+        )
+        decisoes = motor.decisao_lote(X[calibracao])
+        motor.platt_a, motor.platt_b = ajustar_platt(
+            -decisoes, y[calibracao] == svm.classes_[0]
+        )
+
+    return motor, calibracao
 
-print(f"   ✓ Features (X): {X.shape}")
-print(f"   ✓ Target (y): {y.shape}")
-print(f"\n   Atributos utilizados:")
-for i, col in enumerate(X.columns, 1):
-    print(f"      {i}. {col}")
 
 # ============================================================================
-# 3. TREINAR MODELO
+# SELEÇÃO DE MODELO (CV PARALELA)
 # ============================================================================
-print("\n[3/5] Treinando modelo SVM Linear...")
-
-# Criar pipeline com StandardScaler + SVM
-modelo = make_pipeline(
-    StandardScaler(),
-    SVC(kernel="linear", C=1, probability=True, random_state=42)
-)
-
-# Validação cruzada para avaliar desempenho
-cv = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-scores = cross_val_score(modelo, X, y, cv=cv, scoring="f1")
-
-print(f"   ✓ Validação cruzada (5-fold):")
-print(f"      - F1-score médio: {scores.mean():.4f}")
-print(f"      - Desvio padrão: {scores.std():.4f}")
-print(f"      - Scores individuais: {[f'{s:.4f}' for s in scores]}")
-
-# Treinar modelo final em todo o dataset
-print(f"\n   Treinando modelo final em todo o dataset...")
-modelo.fit(X, y)
-print(f"   ✓ Modelo treinado com sucesso!")
-
-# Avaliar no dataset completo (para referência)
-y_pred = modelo.predict(X)
-print(f"\n   Desempenho no dataset completo:")
-print(classification_report(y, y_pred, 
-                          target_names=["Baixa Potência", "Alta Potência"],
-                          digits=3))
+
+# Arrays do processo trabalhador (anexados à memória compartilhada)
+_compartilhado = {}
+
+
+class _ArraysCompartilhados:
+    """
+    Copia arrays NumPy para blocos de multiprocessing.shared_memory.
+
+    Os trabalhadores anexam os mesmos blocos pelo nome, sem cópia nem
+    pickle dos dados; o processo pai libera os blocos ao sair do with.
+    """
+
+    def __init__(self, **arrays):
+        from multiprocessing import shared_memory
+
+        self.blocos = []
+        self.descricao = {}
+        for nome, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            bloco = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=bloco.buf)[...] = array
+            self.blocos.append(bloco)
+            self.descricao[nome] = (bloco.name, array.shape, array.dtype.str)
+
+    def __enter__(self):
+        return self.descricao
+
+    def __exit__(self, *excecao):
+        for bloco in self.blocos:
+            bloco.close()
+            bloco.unlink()
+
+
+def _anexar_compartilhado(descricao):
+    """Inicializador do trabalhador: cria visões sobre os blocos do pai."""
+    from multiprocessing import shared_memory
+
+    for nome, (bloco_nome, forma, tipo) in descricao.items():
+        bloco = shared_memory.SharedMemory(name=bloco_nome, track=False)
+        _compartilhado["_bloco_" + nome] = bloco
+        _compartilhado[nome] = np.ndarray(forma, np.dtype(tipo), buffer=bloco.buf)
+
+
+def _criar_estimador(candidato, semente=SEMENTE):
+    """Pipeline de um candidato {'modo', 'kernel', 'C'} (sem probabilidades)."""
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+
+    if candidato["modo"] == "grande":
+        from sklearn.svm import LinearSVC
+
+        svm = LinearSVC(C=candidato["C"], dual=False, random_state=semente)
+    else:
+        # probability=True não muda predict(); na CV só custaria a CV interna
+        svm = SVC(kernel=candidato["kernel"], C=candidato["C"], random_state=semente)
+    return make_pipeline(StandardScaler(), svm)
+
+
+def _avaliar_dobra(tarefa):
+    """Ajusta um candidato em uma dobra; roda no trabalhador (ou no pai)."""
+    from sklearn.metrics import f1_score
+
+    indice_candidato, candidato, dobra = tarefa
+    X, y, dobras = _compartilhado["X"], _compartilhado["y"], _compartilhado["dobras"]
+    teste = dobras == dobra
+
+    inicio = time.perf_counter()
+    modelo = _criar_estimador(candidato).fit(X[~teste], y[~teste])
+    f1 = f1_score(y[teste], modelo.predict(X[teste]))
+    return indice_candidato, dobra, f1, time.perf_counter() - inicio
+
+
+def atribuir_dobras(y, n_dobras=N_DOBRAS, semente=SEMENTE):
+    """Dobra (0..n_dobras-1) de cada amostra no StratifiedKFold embaralhado."""
+    from sklearn.model_selection import StratifiedKFold
+
+    dobras = np.empty(len(y), dtype=np.int8)
+    cv = StratifiedKFold(n_splits=n_dobras, shuffle=True, random_state=semente)
+    for k, (_, teste) in enumerate(cv.split(np.zeros(len(y)), y)):
+        dobras[teste] = k
+    return dobras
+
+
+def selecionar_modelo(X, y, candidatos, n_dobras=N_DOBRAS, jobs=1, semente=SEMENTE,
+                      dobras=None):
+    """
+    Validação cruzada estratificada de vários candidatos em paralelo.
+
+    Cada par (candidato, dobra) é uma tarefa do pool de processos. A
+    matriz de atributos, os rótulos e a atribuição de dobras vão uma única
+    vez para a memória compartilhada; as tarefas levam só os índices.
+
+    Args:
+        X (array-like): Atributos (N x 5)
+        y (array-like): Rótulos 0/1 (N,)
+        candidatos (list): Dicts {'modo', 'kernel', 'C'}
+        n_dobras (int): Dobras do StratifiedKFold
+        jobs (int): Processos (1 = no próprio processo; <= 0 = todos os núcleos)
+        semente (int): Semente do embaralhamento das dobras
+        dobras (numpy.ndarray, opcional): Saída de atribuir_dobras() já pronta
+
+    Returns:
+        tuple: (resultados, indice_melhor). Cada resultado tem
+            'candidato', 'scores', 'f1_medio', 'f1_desvio' e 'segundos'
+            (soma dos ajustes nas dobras)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    X = np.asarray(X)
+    if X.dtype not in (np.float32, np.float64):
+        X = X.astype(np.float64)
+    y = np.asarray(y, dtype=np.int8)
+    if dobras is None:
+        dobras = atribuir_dobras(y, n_dobras, semente)
+
+    tarefas = [(i, c, k) for i, c in enumerate(candidatos) for k in range(n_dobras)]
+    jobs = min(_processos(jobs), len(tarefas))
+
+    if jobs == 1:
+        _compartilhado.update(X=X, y=y, dobras=dobras)
+        try:
+            saidas = [_avaliar_dobra(t) for t in tarefas]
+        finally:
+            _compartilhado.clear()
+    else:
+        with _ArraysCompartilhados(X=X, y=y, dobras=dobras) as descricao:
+            with ProcessPoolExecutor(
+                max_workers=jobs, initializer=_anexar_compartilhado, initargs=(descricao,)
+            ) as pool:
+                saidas = list(pool.map(_avaliar_dobra, tarefas))
+
+    scores = np.zeros((len(candidatos), n_dobras))
+    segundos = np.zeros(len(candidatos))
+    for i, k, f1, duracao in saidas:
+        scores[i, k] = f1
+        segundos[i] += duracao
+
+    resultados = [
+        {
+            "candidato": candidato,
+            "scores": scores[i],
+            "f1_medio": float(scores[i].mean()),
+            "f1_desvio": float(scores[i].std()),
+            "segundos": float(segundos[i]),
+        }
+        for i, candidato in enumerate(candidatos)
+    ]
+    return resultados, escolher_melhor(resultados)
+
+
+def escolher_melhor(resultados):
+    """Maior F1 médio; empate: menor desvio, depois a ordem dos candidatos."""
+    return min(
+        range(len(resultados)),
+        key=lambda i: (-resultados[i]["f1_medio"], resultados[i]["f1_desvio"], i),
+    )
+
+
+def _processos(jobs):
+    """Número de processos pedido (<= 0 = todos os núcleos)."""
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def criar_candidatos(args):
+    """Grade da linha de comando: --busca-C x --kernels (ou só --C)."""
+    valores_C = args.busca_C or [args.C]
+    kernels = ["linear"] if args.modo == "grande" else args.kernels
+    return [{"modo": args.modo, "kernel": k, "C": c} for k in kernels for c in valores_C]
+
+
+def imprimir_selecao(resultados, melhor, jobs=None, segundos_parede=None):
+    """Resumo da seleção: F1 e tempo de ajuste por candidato."""
+    n_dobras = len(resultados[0]["scores"])
+    if jobs is None:
+        print(f"   ✓ {len(resultados)} candidato(s), {n_dobras} dobras (do cache)")
+    else:
+        jobs = min(_processos(jobs), len(resultados) * n_dobras)
+        print(f"   ✓ {len(resultados)} candidato(s), {n_dobras} dobras, "
+              f"{jobs} processo(s), {segundos_parede:.2f} s de parede")
+    print(f"\n   {'Kernel':<8} {'C':>8} {'F1 médio':>9} {'Desvio':>8} {'Tempo (s)':>10}")
+    for i, r in enumerate(resultados):
+        c = r["candidato"]
+        marca = "  ← melhor" if i == melhor else ""
+        print(f"   {c['kernel']:<8} {c['C']:>8g} {r['f1_medio']:>9.4f} "
+              f"{r['f1_desvio']:>8.4f} {r['segundos']:>10.3f}{marca}")
+
 
 # ============================================================================
-# 4. SALVAR MODELO E SCALER
+# ETAPAS COM CACHE
 # ============================================================================
-print("\n[4/5] Salvando modelo...")
-
-# Salvar modelo completo (pipeline)
-modelo_filename = "modelo_potencia.sav"
-joblib.dump(modelo, modelo_filename)
-print(f"   ✓ Modelo salvo em: {modelo_filename}")
-
-# Salvar também informações sobre as features para documentação
-features_info = {
-    'feature_names': list(X.columns),
-    'n_features': X.shape[1],
-    'classes': {0: "Baixa Potência", 1: "Alta Potência"},
-    'model_type': 'SVM Linear (C=1)',
-    'scaler_type': 'StandardScaler'
-}
-
-info_filename = "modelo_info.sav"
-joblib.dump(features_info, info_filename)
-print(f"   ✓ Informações do modelo salvas em: {info_filename}")
+
+class _Contexto:
+    """Cache, chaves e versões de uma execução (cache=None: tudo recalculado)."""
+
+    def __init__(self, args, fases):
+        self.args = args
+        self.cache = CacheTreino(args.cache, args.limite_cache_mb) if args.cache else None
+        self.candidatos = criar_candidatos(args)
+        with medir_fase(fases, "hash"):
+            self.versoes = versoes_bibliotecas()
+            if self.cache is not None:
+                self.sha256 = self.cache.hash_dataset(args.dataset)
+            else:
+                self.sha256 = None
+
+    def chave(self, etapa, **partes):
+        return CacheTreino.chave(
+            etapa, dataset=self.sha256, versoes=self.versoes, versao=VERSAO_TREINO, **partes
+        )
+
+    def chave_modelo(self):
+        args = self.args
+        partes = {"modo": args.modo, "candidatos": self.candidatos,
+                  "n_dobras": N_DOBRAS, "semente": SEMENTE}
+        if args.modo == "grande":
+            partes["fracao_calibracao"] = args.fracao_calibracao
+            partes["selecao"] = bool(args.busca_C)
+        return self.chave("modelo", **partes)
+
+    def abrir(self, chave):
+        return self.cache.abrir(chave) if self.cache is not None else None
+
+
+def carregar_atributos(contexto):
+    """X (float32) e y (int8): do cache de atributos ou lidos do CSV."""
+    args = contexto.args
+    if contexto.cache is None:
+        return ler_dataset(args.dataset)
+
+    chave = contexto.chave("atributos", tipo="float32")
+    entrada = contexto.abrir(chave)
+    if entrada is None:
+        with contexto.cache.gravar(chave) as pasta:
+            gravar_npy(args.dataset, os.path.join(pasta, "X.npy"), os.path.join(pasta, "y.npy"))
+        entrada = os.path.join(contexto.cache.pasta, chave)
+    return (np.load(os.path.join(entrada, "X.npy"), mmap_mode="r"),
+            np.load(os.path.join(entrada, "y.npy"), mmap_mode="r"))
+
+
+def validacao_cruzada(contexto, X, y):
+    """
+    Scores de CV de todos os candidatos, reaproveitando os que estão no cache.
+
+    Returns:
+        tuple: (resultados, melhor, avaliados) — avaliados = quantos
+            candidatos precisaram ser ajustados agora
+    """
+    cache = contexto.cache
+    dobras = None
+    if cache is not None:
+        chave = contexto.chave("dobras", n_dobras=N_DOBRAS, semente=SEMENTE)
+        entrada = cache.abrir(chave)
+        if entrada is None:
+            dobras = atribuir_dobras(y)
+            with cache.gravar(chave) as pasta:
+                np.save(os.path.join(pasta, "dobras.npy"), dobras)
+        else:
+            dobras = np.load(os.path.join(entrada, "dobras.npy"))
+    else:
+        dobras = atribuir_dobras(y)
+
+    resultados = [None] * len(contexto.candidatos)
+    chaves = [contexto.chave("cv", candidato=c, n_dobras=N_DOBRAS, semente=SEMENTE)
+              for c in contexto.candidatos]
+    for i, chave in enumerate(chaves):
+        entrada = contexto.abrir(chave)
+        if entrada is not None:
+            with open(os.path.join(entrada, "cv.json"), "r", encoding="utf-8") as arquivo:
+                resultados[i] = _resultado_de_json(json.load(arquivo))
+
+    faltando = [i for i, r in enumerate(resultados) if r is None]
+    if faltando:
+        novos, _ = selecionar_modelo(
+            X, y, [contexto.candidatos[i] for i in faltando],
+            jobs=contexto.args.jobs, dobras=dobras,
+        )
+        for i, resultado in zip(faltando, novos):
+            resultados[i] = resultado
+            if cache is not None:
+                with cache.gravar(chaves[i]) as pasta:
+                    _gravar_json(os.path.join(pasta, "cv.json"), _resultado_para_json(resultado))
+
+    return resultados, escolher_melhor(resultados), len(faltando)
+
+
+def _resultado_para_json(resultado):
+    return dict(resultado, scores=[float(s) for s in resultado["scores"]])
+
+
+def _resultado_de_json(dados):
+    return dict(dados, scores=np.array(dados["scores"]))
+
+
+def _gravar_json(caminho, dados):
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, indent=2)
+        arquivo.write("\n")
+
+
+def _copiar(origem, destino):
+    """Copia com troca atômica (quem lê o destino nunca vê meio arquivo)."""
+    temporario = destino + ".tmp"
+    shutil.copyfile(origem, temporario)
+    os.replace(temporario, destino)
+
+
+def exportar_entrada(entrada, artefato):
+    """
+    Copia os arquivos de uma entrada de modelo para os destinos finais.
+
+    Um destino que a entrada não tem (o .sav no modo grande, o JSON com
+    kernel não linear) é removido: seria de um treino anterior e
+    descreveria outro modelo que o info.sav recém-gravado.
+
+    Returns:
+        tuple: (gravados, removidos) — destinos, na ordem (modelo .sav,
+            info .sav, JSON)
+    """
+    gravados, removidos = [], []
+    for nome, destino in (("modelo.sav", ARQUIVO_MODELO), ("info.sav", ARQUIVO_INFO),
+                          ("artefato.json", artefato)):
+        origem = os.path.join(entrada, nome)
+        if os.path.exists(origem):
+            _copiar(origem, destino)
+            gravados.append(destino)
+        elif os.path.exists(destino):
+            os.remove(destino)
+            removidos.append(destino)
+    return gravados, removidos
+
+
+def _imprimir_removidos(removidos):
+    for destino in removidos:
+        print(f"   ✓ Removido {destino} (de um treino anterior, outro modelo)")
+
+
+@contextmanager
+def _entrada_modelo(contexto, chave):
+    """
+    Pasta onde o treino grava o modelo: entrada nova do cache, ou pasta
+    temporária (removida após a exportação) quando o cache está desligado.
+    """
+    if contexto.cache is not None:
+        with contexto.cache.gravar(chave) as pasta:
+            yield pasta
+    else:
+        pasta = tempfile.mkdtemp(prefix="treino-")
+        yield pasta
+
+
+def _pasta_final(contexto, chave, pasta_escrita):
+    if contexto.cache is not None:
+        return os.path.join(contexto.cache.pasta, chave)
+    return pasta_escrita
+
 
 # ============================================================================
-# 5. TESTAR CARREGAMENTO E PREDIÇÃO
+# MODO GRANDE
 # ============================================================================
-print("\n[5/5] Testando carregamento do modelo...")
 
-# Carregar modelo
-modelo_carregado = joblib.load(modelo_filename)
-print(f"   ✓ Modelo carregado com sucesso!")
+def treinar_modo_grande(contexto, pasta, fases):
+    """Lê, seleciona C (opcional), ajusta, calibra, avalia e grava na pasta."""
+    import joblib
+    from sklearn.metrics import f1_score
+
+    args = contexto.args
+    with medir_fase(fases, "leitura"):
+        # Atributos calculados durante a leitura (float32, em blocos)
+        X, y = carregar_atributos(contexto)
+    print(f"   ✓ {len(y)} amostras (Baixa: {(y == 0).sum()}, Alta: {(y == 1).sum()})")
 
-# Fazer predição de teste
-exemplo_teste = {
-    'corrente_max_A': 1.80,
-    'corrente_min_A': -0.03,
-    'corrente_media_A': 0.67
-}
+    C = args.C
+    resultados, melhor = None, None
+    if args.busca_C:
+        print("\n   Selecionando C (validação cruzada)...")
+        with medir_fase(fases, "selecao"):
+            inicio = time.perf_counter()
+            resultados, melhor, _ = validacao_cruzada(contexto, X, y)
+        imprimir_selecao(resultados, melhor, args.jobs, time.perf_counter() - inicio)
+        C = resultados[melhor]["candidato"]["C"]
 
-# Criar DataFrame com exemplo
-df_teste = pd.DataFrame([exemplo_teste])
+    print(f"\n[2/4] Treinando LinearSVC (C={C:g}) + Platt em holdout "
+          f"({args.fracao_calibracao:.0%})...")
+    motor, calibracao = treinar_grande(
+        X, y, C=C, fracao_calibracao=args.fracao_calibracao, fases=fases
+    )
+    print(f"   ✓ Platt: A={motor.platt_a:.6f}, B={motor.platt_b:.6f}")
 
-# Calcular atributos derivados
-df_teste['amplitude_corrente'] = df_teste['corrente_max_A'] - df_teste['corrente_min_A']
-df_teste['razao_max_media'] = df_teste['corrente_max_A'] / (df_teste['corrente_media_A'] + 1e-6)
+    print("\n[3/4] Avaliando no holdout de calibração...")
+    with medir_fase(fases, "avaliacao"):
+        prob_baixa, prob_alta = motor.probabilidades_lote(motor.decisao_lote(X[calibracao]))
+        y_pred = motor.classificar_lote(prob_baixa, prob_alta)
+        y_cal = y[calibracao]
+        f1 = float(f1_score(y_cal, y_pred))
+        acuracia = float((y_pred == y_cal).mean())
+    print(f"   ✓ F1 (holdout): {f1:.4f}")
+    print(f"   ✓ Acurácia (holdout): {acuracia:.4f}")
 
-# Garantir mesma ordem de colunas
-df_teste = df_teste[X.columns]
+    motor.dataset_sha256 = contexto.sha256 or sha256_arquivo(args.dataset)
+    motor.salvar(os.path.join(pasta, "artefato.json"))
+    joblib.dump({
+        'feature_names': list(COLUNAS_ATRIBUTOS),
+        'n_features': len(COLUNAS_ATRIBUTOS),
+        'classes': {0: "Baixa Potência", 1: "Alta Potência"},
+        'model_type': f'LinearSVC (C={C:g}) + Platt (holdout)',
+        'scaler_type': 'StandardScaler'
+    }, os.path.join(pasta, "info.sav"))
+    _gravar_json(os.path.join(pasta, "resumo.json"), {
+        "amostras": int(len(y)),
+        "classes": [int((y == 0).sum()), int((y == 1).sum())],
+        "C": C,
+        "platt": [motor.platt_a, motor.platt_b],
+        "f1_holdout": f1,
+        "acuracia_holdout": acuracia,
+        "resultados": [_resultado_para_json(r) for r in resultados] if resultados else None,
+        "melhor": melhor,
+    })
 
-# Fazer predição
-predicao = modelo_carregado.predict(df_teste)[0]
-probabilidades = modelo_carregado.predict_proba(df_teste)[0]
 
-print(f"\n   Teste de predição:")
-print(f"   Entrada: {exemplo_teste}")
-print(f"   Predição: {features_info['classes'][predicao]}")
-print(f"   Probabilidades:")
-print(f"      - Baixa Potência: {probabilidades[0]*100:.1f}%")
-print(f"      - Alta Potência: {probabilidades[1]*100:.1f}%")
+def executar_grande(args):
+    """Treino escalável: lê, ajusta, calibra, avalia no holdout e exporta."""
+    fases = []
+    contexto = _Contexto(args, fases)
+    chave = contexto.chave_modelo()
+
+    print("\n[1/4] Carregando dataset...")
+    entrada = contexto.abrir(chave)
+    if entrada is None:
+        with _entrada_modelo(contexto, chave) as pasta:
+            treinar_modo_grande(contexto, pasta, fases)
+        entrada = _pasta_final(contexto, chave, pasta)
+    else:
+        with open(os.path.join(entrada, "resumo.json"), "r", encoding="utf-8") as arquivo:
+            resumo = json.load(arquivo)
+        print(f"   ✓ Dataset, parâmetros e bibliotecas inalterados: {resumo['amostras']} "
+              f"amostras (SHA-256 {contexto.sha256[:12]}…)")
+        if resumo["resultados"]:
+            imprimir_selecao([_resultado_de_json(r) for r in resumo["resultados"]],
+                             resumo["melhor"])
+        print(f"\n[2/4] Modelo reaproveitado do cache ({chave})")
+        print(f"   ✓ LinearSVC (C={resumo['C']:g}); Platt: A={resumo['platt'][0]:.6f}, "
+              f"B={resumo['platt'][1]:.6f}")
+        print("\n[3/4] Avaliação no holdout de calibração (do cache)...")
+        print(f"   ✓ F1 (holdout): {resumo['f1_holdout']:.4f}")
+        print(f"   ✓ Acurácia (holdout): {resumo['acuracia_holdout']:.4f}")
+
+    print("\n[4/4] Exportando artefato...")
+    try:
+        with medir_fase(fases, "exportacao"):
+            _, removidos = exportar_entrada(entrada, args.artefato)
+    finally:
+        if contexto.cache is None:
+            shutil.rmtree(entrada, ignore_errors=True)
+    print(f"   ✓ Artefato salvo em: {args.artefato}")
+    print(f"   ✓ Informações do modelo salvas em: {ARQUIVO_INFO}")
+    _imprimir_removidos(removidos)
+    print("   (o modo grande não gera .sav; para servir o artefato, publique-o:")
+    print(f"    python3 registro_modelos.py publicar {args.artefato})")
+
+    print("\nTempo e memória por fase:")
+    imprimir_fases(fases)
+
 
 # ============================================================================
-# RESUMO FINAL
+# MODO PADRÃO
 # ============================================================================
-print("\n" + "="*70)
-print("TREINAMENTO CONCLUÍDO COM SUCESSO!")
-print("="*70)
-print(f"\nArquivos gerados:")
-print(f"   1. {modelo_filename} - Modelo treinado (pipeline completo)")
-print(f"   2. {info_filename} - Informações sobre o modelo")
-print(f"\nPara usar no LabVIEW:")
-print(f"   1. Carregue o modelo usando joblib.load('{modelo_filename}')")
-print(f"   2. Prepare os dados de entrada com os 5 atributos na ordem:")
-for i, col in enumerate(X.columns, 1):
-    print(f"      {i}. {col}")
-print(f"   3. Use modelo.predict() para classificação")
-print(f"   4. Use modelo.predict_proba() para probabilidades")
-print("="*70)
+
+def treinar_modo_padrao(contexto, pasta, fases):
+    """Etapas 1 a 3 do fluxo original; grava modelo, info, artefato e resumo."""
+    import joblib
+    import pandas as pd
+    from sklearn.metrics import classification_report
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+    from motor_linear import exportar_artefato
+
+    args = contexto.args
+    caminho = args.dataset
+    with medir_fase(fases, "leitura"):
+        # Leitura em blocos (float32/int8); os atributos derivados são
+        # calculados no lugar, bloco a bloco
+        atributos, rotulos = carregar_atributos(contexto)
+
+    print(f"   ✓ Dataset carregado: {len(rotulos)} amostras, {len(COLUNAS_CSV)} colunas")
+    print(f"   ✓ Distribuição de classes:")
+    print(f"      - Baixa Potência (0): {(rotulos==0).sum()} amostras")
+    print(f"      - Alta Potência (1): {(rotulos==1).sum()} amostras")
+
+    # ========================================================================
+    # 2. ENGENHARIA DE ATRIBUTOS
+    # ========================================================================
+    print("\n[2/5] Criando atributos derivados...")
+
+    with medir_fase(fases, "atributos"):
+        # Nomes das colunas no pipeline (viram os atributos do artefato)
+        X = pd.DataFrame(atributos, columns=list(COLUNAS_ATRIBUTOS))
+        y = pd.Series(rotulos, name="potencia")
+
+    print(f"   ✓ Atributos criados: amplitude_corrente, razao_max_media")
+    print(f"   ✓ Features (X): {X.shape}")
+    print(f"   ✓ Target (y): {y.shape}")
+    print(f"\n   Atributos utilizados:")
+    for i, col in enumerate(X.columns, 1):
+        print(f"      {i}. {col}")
+
+    # ========================================================================
+    # 3. TREINAR MODELO
+    # ========================================================================
+    print("\n[3/5] Treinando modelo SVM...")
+
+    # Validação cruzada de cada candidato (C, kernel), em paralelo
+    with medir_fase(fases, "validacao"):
+        inicio = time.perf_counter()
+        resultados, melhor, avaliados = validacao_cruzada(contexto, atributos, rotulos)
+    if avaliados:
+        imprimir_selecao(resultados, melhor, args.jobs, time.perf_counter() - inicio)
+    else:
+        imprimir_selecao(resultados, melhor)
+
+    escolhido = resultados[melhor]["candidato"]
+    scores = resultados[melhor]["scores"]
+    kernel, C = escolhido["kernel"], escolhido["C"]
+
+    # Criar pipeline com StandardScaler + SVM
+    modelo = make_pipeline(
+        StandardScaler(),
+        SVC(kernel=kernel, C=C, probability=True, random_state=SEMENTE)
+    )
+
+    print(f"\n   ✓ Validação cruzada ({N_DOBRAS}-fold), kernel={kernel}, C={C:g}:")
+    print(f"      - F1-score médio: {scores.mean():.4f}")
+    print(f"      - Desvio padrão: {scores.std():.4f}")
+    print(f"      - Scores individuais: {[f'{s:.4f}' for s in scores]}")
+
+    # Treinar modelo final em todo o dataset
+    print(f"\n   Treinando modelo final em todo o dataset...")
+    with medir_fase(fases, "ajuste"):
+        modelo.fit(X, y)
+    print(f"   ✓ Modelo treinado com sucesso!")
+
+    # Avaliar no dataset completo (para referência)
+    y_pred = modelo.predict(X)
+    relatorio = classification_report(y, y_pred,
+                                      target_names=["Baixa Potência", "Alta Potência"],
+                                      digits=3)
+    print(f"\n   Desempenho no dataset completo:")
+    print(relatorio)
+
+    # Modelo completo (pipeline), informações e artefato compacto (JSON:
+    # sem pickle, sem support vectors, sem sklearn; só para kernel linear)
+    joblib.dump(modelo, os.path.join(pasta, "modelo.sav"))
+    joblib.dump({
+        'feature_names': list(X.columns),
+        'n_features': X.shape[1],
+        'classes': {0: "Baixa Potência", 1: "Alta Potência"},
+        'model_type': f'SVM {kernel} (C={C:g})',
+        'scaler_type': 'StandardScaler'
+    }, os.path.join(pasta, "info.sav"))
+    if kernel == "linear":
+        exportar_artefato(modelo, os.path.join(pasta, "artefato.json"), caminho_dataset=caminho,
+                          caminho_sav=os.path.join(pasta, "modelo.sav"))
+    _gravar_json(os.path.join(pasta, "resumo.json"), {
+        "amostras": int(len(rotulos)),
+        "classes": [int((rotulos == 0).sum()), int((rotulos == 1).sum())],
+        "resultados": [_resultado_para_json(r) for r in resultados],
+        "melhor": melhor,
+        "relatorio": relatorio,
+    })
+
+
+def executar_padrao(args):
+    """Fluxo original: SVC com probability=True e CV 5-fold."""
+    fases = []
+    contexto = _Contexto(args, fases)
+    chave = contexto.chave_modelo()
+
+    # ========================================================================
+    # 1. CARREGAR E PRÉ-PROCESSAR DADOS (ou reaproveitar o cache)
+    # ========================================================================
+    print("\n[1/5] Carregando dataset...")
+
+    entrada = contexto.abrir(chave)
+    if entrada is None:
+        with _entrada_modelo(contexto, chave) as pasta:
+            treinar_modo_padrao(contexto, pasta, fases)
+        entrada = _pasta_final(contexto, chave, pasta)
+    else:
+        with open(os.path.join(entrada, "resumo.json"), "r", encoding="utf-8") as arquivo:
+            resumo = json.load(arquivo)
+        print(f"   ✓ Dataset, parâmetros e bibliotecas inalterados: {resumo['amostras']} "
+              f"amostras (SHA-256 {contexto.sha256[:12]}…)")
+        print(f"      - Baixa Potência (0): {resumo['classes'][0]} amostras")
+        print(f"      - Alta Potência (1): {resumo['classes'][1]} amostras")
+        print(f"\n[2/5] Atributos: reaproveitados do cache")
+        print(f"\n[3/5] Modelo SVM reaproveitado do cache ({chave})")
+        imprimir_selecao([_resultado_de_json(r) for r in resumo["resultados"]],
+                         resumo["melhor"])
+        print(f"\n   Desempenho no dataset completo:")
+        print(resumo["relatorio"])
+
+    # ========================================================================
+    # 4. SALVAR MODELO E SCALER
+    # ========================================================================
+    print("\n[4/5] Salvando modelo...")
+
+    try:
+        with medir_fase(fases, "exportacao"):
+            gravados, removidos = exportar_entrada(entrada, args.artefato)
+    finally:
+        if contexto.cache is None:
+            shutil.rmtree(entrada, ignore_errors=True)
+    modelo_filename, info_filename = ARQUIVO_MODELO, ARQUIVO_INFO
+    artefato_filename = args.artefato
+    print(f"   ✓ Modelo salvo em: {modelo_filename}")
+    print(f"   ✓ Informações do modelo salvas em: {info_filename}")
+    if artefato_filename in gravados:
+        print(f"   ✓ Artefato compacto salvo em: {artefato_filename}")
+    else:
+        print(f"   ⚠ Kernel não linear: o artefato JSON só existe para o kernel linear")
+    _imprimir_removidos(removidos)
+
+    # ========================================================================
+    # 5. TESTAR CARREGAMENTO E PREDIÇÃO
+    # ========================================================================
+    print("\n[5/5] Testando carregamento do modelo...")
+
+    # Fazer predição de teste
+    exemplo_teste = {
+        'corrente_max_A': 1.80,
+        'corrente_min_A': -0.03,
+        'corrente_media_A': 0.67
+    }
+    classes = {0: "Baixa Potência", 1: "Alta Potência"}
+
+    if artefato_filename in gravados:
+        # Artefato JSON: mesmo resultado do pipeline, sem sklearn
+        motor = ModeloLinear.de_artefato(artefato_filename)
+        predicao, prob_baixa, prob_alta = motor.prever(*exemplo_teste.values())
+        print(f"   ✓ Artefato carregado com sucesso!")
+    else:
+        import joblib
+        import pandas as pd
+        from motor_linear import calcular_atributos
+
+        modelo_carregado = joblib.load(modelo_filename)
+        print(f"   ✓ Modelo carregado com sucesso!")
+        df_teste = pd.DataFrame(
+            calcular_atributos(*([v] for v in exemplo_teste.values())),
+            columns=list(COLUNAS_ATRIBUTOS),
+        )
+        predicao = modelo_carregado.predict(df_teste)[0]
+        prob_baixa, prob_alta = modelo_carregado.predict_proba(df_teste)[0]
+
+    print(f"\n   Teste de predição:")
+    print(f"   Entrada: {exemplo_teste}")
+    print(f"   Predição: {classes[int(predicao)]}")
+    print(f"   Probabilidades:")
+    print(f"      - Baixa Potência: {prob_baixa*100:.1f}%")
+    print(f"      - Alta Potência: {prob_alta*100:.1f}%")
+
+    print("\nTempo e memória por fase:")
+    imprimir_fases(fases)
+
+    # ========================================================================
+    # RESUMO FINAL
+    # ========================================================================
+    print("\n" + "="*70)
+    print("TREINAMENTO CONCLUÍDO COM SUCESSO!")
+    print("="*70)
+    print(f"\nArquivos gerados:")
+    print(f"   1. {modelo_filename} - Modelo treinado (pipeline completo)")
+    print(f"   2. {info_filename} - Informações sobre o modelo")
+    print(f"   3. {artefato_filename} - Artefato compacto (JSON, sem pickle)")
+    print(f"\nPara usar no LabVIEW:")
+    print(f"   1. Carregue o modelo usando joblib.load('{modelo_filename}')")
+    print(f"   2. Prepare os dados de entrada com os 5 atributos na ordem:")
+    for i, col in enumerate(COLUNAS_ATRIBUTOS, 1):
+        print(f"      {i}. {col}")
+    print(f"   3. Use modelo.predict() para classificação")
+    print(f"   4. Use modelo.predict_proba() para probabilidades")
+    print("="*70)
+
+
+def main():
+    """Função principal: escolhe o modo de treino."""
+    parser = argparse.ArgumentParser(description="Treina o modelo de potência")
+    parser.add_argument("--modo", choices=("padrao", "grande"), default="padrao",
+                        help="padrao: SVC + CV 5-fold; grande: LinearSVC + Platt em holdout")
+    parser.add_argument("--dataset", default="dataset.xls", help="CSV rotulado (4 colunas)")
+    parser.add_argument("--artefato", default="modelo_potencia.json", help="Artefato JSON")
+    parser.add_argument("--C", type=float, default=1.0, help="Regularização do SVM")
+    parser.add_argument("--fracao-calibracao", type=float, default=0.1,
+                        help="Holdout de calibração no modo grande")
+    parser.add_argument("--busca-C", type=float, nargs="+", metavar="C",
+                        help="Valores de C avaliados por validação cruzada")
+    parser.add_argument("--kernels", nargs="+", default=["linear"],
+                        choices=("linear", "rbf", "poly", "sigmoid"),
+                        help="Kernels avaliados no modo padrao")
+    parser.add_argument("--jobs", type=int, default=-1,
+                        help="Processos da validação cruzada (-1 = todos os núcleos)")
+    parser.add_argument("--cache", default=PASTA_CACHE, metavar="PASTA",
+                        help="Cache do treino (vazio = sem cache)")
+    parser.add_argument("--limite-cache-mb", type=float, default=LIMITE_MB,
+                        help="Tamanho máximo do cache; as entradas mais antigas saem")
+    args = parser.parse_args()
+
+    print("="*70)
+    print("TREINAMENTO DO MODELO - CLASSIFICAÇÃO DE POTÊNCIA ELÉTRICA")
+    print("="*70)
+
+    if args.modo == "grande":
+        executar_grande(args)
+    else:
+        executar_padrao(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Atualização incremental do modelo, sem retreinar sobre o dataset inteiro.
+
+Cada execução recebe apenas os lotes rotulados novos (mesmo formato CSV de
+4 colunas do dataset.xls: potencia, corrente_max_A, corrente_min_A,
+corrente_media_A) e:
+
+    1. Atualiza um StandardScaler incremental (partial_fit: média e
+       variância acumuladas, sem guardar as amostras)
+    2. Atualiza um classificador linear por SGD (perda logística,
+       partial_fit) com algumas épocas sobre o lote novo
+    3. Regrava o artefato do modelo incremental (modelo_incremental.json,
+       troca atômica), separado do modelo_svm_potencia.json implantado;
+       com --publicar, o artefato vira uma versão nova do registro de
+       modelos e quem está servindo passa a usá-la sem reiniciar
+
+O custo depende do tamanho do lote novo, não do histórico. O estado do
+treino (escalonador + SGD + arquivos já vistos) fica em modelo_incremental.sav.
+O artefato registra em dataset_sha256 o hash da sequência de lotes
+incorporados (SHA-256 dos SHA-256 de cada arquivo, em ordem).
+
+O artefato tem a mesma ordem de atributos e a mesma semântica de saída
+(CLASSE|PROB_BAIXA|PROB_ALTA): a decisão linear é a do SGD e a sigmoide é a
+própria perda logística (platt_a = -1, platt_b = 0).
+
+Com --deriva, o modelo incremental é comparado com um ajuste em lote
+completo (StandardScaler + LogisticRegression com a mesma regularização)
+sobre os arquivos de referência.
+
+Uso:
+    python3 treino_incremental.py novos.csv [mais.csv ...]
+    python3 treino_incremental.py novos.csv --deriva dataset.xls novos.csv
+    python3 treino_incremental.py --reiniciar dataset.xls
+    python3 treino_incremental.py novos.csv --publicar
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+from carregar_dataset import ler_blocos
+from modelo_predicao import COLUNAS_ATRIBUTOS
+from motor_linear import ModeloLinear, sha256_arquivo
+from registro_modelos import PASTA_REGISTRO, RegistroModelos
+
+
+CAMINHO_ESTADO = "modelo_incremental.sav"
+CAMINHO_ARTEFATO = "modelo_incremental.json"
+CLASSES = np.array([0, 1])
+
+# Regularização L2 do SGD (e da referência em lote, para comparar iguais)
+ALFA_PADRAO = 1e-4
+
+
+def ler_csv(caminho, tamanho_bloco=1 << 20):
+    """
+    Lê um CSV rotulado em blocos.
+
+    Yields:
+        tuple: (X, y) com X (N x 5) na ordem do pipeline e y (N,) int
+    """
+    for X, y in ler_blocos(caminho, np.float64, tamanho_bloco):
+        yield X, y.astype(np.int64)
+
+
+def ler_tudo(caminhos):
+    """Concatena (X, y) de vários CSVs."""
+    partes = [parte for caminho in caminhos for parte in ler_csv(caminho)]
+    if not partes:
+        return np.empty((0, len(COLUNAS_ATRIBUTOS))), np.empty(0, dtype=np.int64)
+    return np.concatenate([p[0] for p in partes]), np.concatenate([p[1] for p in partes])
+
+
+def novo_estado(alfa=ALFA_PADRAO, semente=42):
+    """Estado vazio: escalonador e SGD ainda sem dados."""
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    return {
+        "escalonador": StandardScaler(),
+        "classificador": SGDClassifier(
+            loss="log_loss", alpha=alfa, learning_rate="optimal", random_state=semente
+        ),
+        "amostras": 0,
+        "arquivos": [],
+    }
+
+
+def carregar_estado(caminho=CAMINHO_ESTADO):
+    """Lê o estado salvo, ou cria um novo se ainda não existir."""
+    if os.path.exists(caminho):
+        return joblib.load(caminho)
+    return novo_estado()
+
+
+def salvar_estado(estado, caminho=CAMINHO_ESTADO):
+    """Grava o estado do treino (troca atômica)."""
+    temporario = caminho + ".tmp"
+    joblib.dump(estado, temporario)
+    os.replace(temporario, caminho)
+
+
+def atualizar(estado, X, y, epocas=5, semente=0):
+    """
+    Incorpora um lote rotulado ao estado.
+
+    O escalonador é atualizado primeiro, e o SGD passa `epocas` vezes
+    (em ordem embaralhada) pelo lote já padronizado.
+
+    Args:
+        estado (dict): Retorno de carregar_estado()/novo_estado()
+        X (numpy.ndarray): Atributos (N x 5)
+        y (numpy.ndarray): Rótulos (N,)
+        epocas (int): Passadas sobre o lote
+        semente (int): Semente do embaralhamento
+    """
+    if len(X) == 0:
+        return
+
+    escalonador = estado["escalonador"]
+    escalonador.partial_fit(X)
+    Xp = escalonador.transform(X)
+
+    rng = np.random.default_rng(semente + estado["amostras"])
+    for _ in range(epocas):
+        ordem = rng.permutation(len(Xp))
+        estado["classificador"].partial_fit(Xp[ordem], y[ordem], classes=CLASSES)
+
+    estado["amostras"] += len(X)
+
+
+def incorporar_arquivo(estado, caminho, epocas=5):
+    """
+    Incorpora um CSV rotulado inteiro, bloco a bloco.
+
+    Arquivos já incorporados (mesmo SHA-256) são ignorados, então repetir
+    a mesma execução não conta os dados duas vezes.
+
+    Returns:
+        int ou None: Linhas incorporadas, ou None se o arquivo já constava
+    """
+    sha256 = sha256_arquivo(caminho)
+    if any(item["sha256"] == sha256 for item in estado["arquivos"]):
+        return None
+
+    linhas = 0
+    for X, y in ler_csv(caminho):
+        atualizar(estado, X, y, epocas=epocas)
+        linhas += len(X)
+    estado["arquivos"].append(
+        {"arquivo": os.path.basename(caminho), "sha256": sha256, "linhas": linhas}
+    )
+    return linhas
+
+
+def hash_lotes(estado):
+    """
+    SHA-256 da sequência de arquivos incorporados (ordem de incorporação).
+
+    Returns:
+        str ou None: None se nenhum arquivo foi incorporado
+    """
+    if not estado["arquivos"]:
+        return None
+    h = hashlib.sha256()
+    for item in estado["arquivos"]:
+        h.update(item["sha256"].encode("ascii"))
+    return h.hexdigest()
+
+
+def para_motor(estado):
+    """
+    Converte o estado no motor de inferência (mesmo formato do artefato).
+
+    Returns:
+        ModeloLinear: Decisão do SGD; probabilidades pela sigmoide logística;
+            dataset_sha256 = hash_lotes(estado)
+    """
+    escalonador = estado["escalonador"]
+    classificador = estado["classificador"]
+    return ModeloLinear(
+        media=escalonador.mean_,
+        escala=escalonador.scale_,
+        coef=classificador.coef_[0],
+        intercepto=float(classificador.intercept_[0]),
+        platt_a=-1.0,
+        platt_b=0.0,
+        classes=(0, 1),
+        atributos=COLUNAS_ATRIBUTOS,
+        dataset_sha256=hash_lotes(estado),
+    )
+
+
+def exportar(estado, caminho=CAMINHO_ARTEFATO):
+    """Regrava o artefato incremental (troca atômica) e retorna o motor."""
+    motor = para_motor(estado)
+    temporario = caminho + ".tmp"
+    motor.salvar(temporario)
+    os.replace(temporario, caminho)
+    return motor
+
+
+def relatorio_deriva(motor, X, y, alfa=ALFA_PADRAO):
+    """
+    Compara o modelo incremental com um ajuste em lote completo.
+
+    A referência é StandardScaler + LogisticRegression com regularização
+    equivalente à do SGD (C = 1 / (alfa * N)), ajustada em todo (X, y).
+
+    Returns:
+        dict: {'amostras', 'concordancia_classes', 'diferenca_prob_media',
+            'diferenca_prob_max', 'cosseno_pesos', 'acuracia_incremental',
+            'acuracia_lote'}
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    referencia = make_pipeline(
+        StandardScaler(), LogisticRegression(C=1.0 / (alfa * len(X)), max_iter=1000)
+    )
+    referencia.fit(X, y)
+    prob_ref = referencia.predict_proba(X)[:, 1]
+    classes_ref = (prob_ref >= 0.5).astype(np.int64)
+
+    decisoes = motor.decisao_lote(X)
+    _, prob_inc = motor.probabilidades_lote(decisoes)
+    classes_inc = (prob_inc >= 0.5).astype(np.int64)
+
+    # Pesos no espaço original (escalonador incorporado)
+    pesos_inc = np.array(motor.pesos)
+    pesos_ref = referencia[-1].coef_[0] / referencia[0].scale_
+    cosseno = float(
+        pesos_inc @ pesos_ref / (np.linalg.norm(pesos_inc) * np.linalg.norm(pesos_ref))
+    )
+
+    return {
+        "amostras": int(len(X)),
+        "concordancia_classes": float((classes_inc == classes_ref).mean()),
+        "diferenca_prob_media": float(np.abs(prob_inc - prob_ref).mean()),
+        "diferenca_prob_max": float(np.abs(prob_inc - prob_ref).max()),
+        "cosseno_pesos": cosseno,
+        "acuracia_incremental": float((classes_inc == y).mean()),
+        "acuracia_lote": float((classes_ref == y).mean()),
+    }
+
+
+def main():
+    """Função principal: incorpora os CSVs novos e regrava o artefato."""
+    parser = argparse.ArgumentParser(description="Atualização incremental do modelo")
+    parser.add_argument("csvs", nargs="+", help="Lotes rotulados novos (4 colunas)")
+    parser.add_argument("--estado", default=CAMINHO_ESTADO, help="Estado do treino")
+    parser.add_argument("--artefato", default=CAMINHO_ARTEFATO, help="Artefato JSON")
+    parser.add_argument("--publicar", nargs="?", const=PASTA_REGISTRO, metavar="PASTA",
+                        help="Publica o artefato no registro de modelos (e o ativa)")
+    parser.add_argument("--epocas", type=int, default=5, help="Passadas por lote")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Descarta o estado salvo antes de atualizar")
+    parser.add_argument("--deriva", nargs="+", metavar="CSV",
+                        help="Compara com um ajuste em lote sobre estes arquivos")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    estado = novo_estado() if args.reiniciar else carregar_estado(args.estado)
+
+    for caminho in args.csvs:
+        if not os.path.exists(caminho):
+            print("ERRO: Arquivo não encontrado: {}".format(caminho))
+            sys.exit(1)
+
+        linhas = incorporar_arquivo(estado, caminho, args.epocas)
+        if linhas is None:
+            print("   - {}: já incorporado, ignorado".format(caminho))
+        else:
+            print("   ✓ {}: {} linhas".format(caminho, linhas))
+
+    salvar_estado(estado, args.estado)
+    exportar(estado, args.artefato)
+    duracao = time.perf_counter() - inicio
+    print("✅ {} atualizado em {:.2f} s ({} amostras no total)".format(
+        args.artefato, duracao, estado["amostras"]))
+    if args.publicar:
+        versao = RegistroModelos(args.publicar).publicar(args.artefato)
+        print("✓ Publicado no registro: {} (atual)".format(versao))
+
+    if args.deriva:
+        X, y = ler_tudo(args.deriva)
+        motor = ModeloLinear.de_artefato(args.artefato)
+        relatorio = relatorio_deriva(motor, X, y, estado["classificador"].alpha)
+        print("\nDeriva em relação ao ajuste em lote ({} amostras):".format(
+            relatorio["amostras"]))
+        print("   Concordância de classes: {:.2%}".format(relatorio["concordancia_classes"]))
+        print("   |Δ prob_alta| média / máx.: {:.4f} / {:.4f}".format(
+            relatorio["diferenca_prob_media"], relatorio["diferenca_prob_max"]))
+        print("   Cosseno entre pesos: {:.4f}".format(relatorio["cosseno_pesos"]))
+        print("   Acurácia incremental / lote: {:.2%} / {:.2%}".format(
+            relatorio["acuracia_incremental"], relatorio["acuracia_lote"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,19 @@ Script para usar o modelo SVM de classificação de potência.
 Compatível com Python 3.6+
 
 Uso:
-    python usar_modelo.py <corrente_max> <corrente_min> <corrente_media>
+    python usar_modelo.py [--versao] <corrente_max> <corrente_min> <corrente_media>
+    python usar_modelo.py --stream [--versao]
 
 Exemplo:
     python usar_modelo.py 1.80 -0.03 0.67
+    python usar_modelo.py --stream < leituras.csv
+
+No modo --stream, o processo lê registros "max,min,media" da entrada padrão
+(um por linha) e escreve uma linha CLASSE|PROB_BAIXA|PROB_ALTA por registro,
+permitindo manter um único pipe aberto durante toda a aquisição.
+
+Com --versao, cada resultado ganha no fim o campo |VERSAO: a versão do
+modelo no registro ("-" para modelos fora dele).
 
 Para integração com LabVIEW:
     - LabVIEW chama este script via System Exec.vi
@@ -17,8 +26,8 @@ Para integração com LabVIEW:
 """
 
 import sys
-import joblib
-import pandas as pd
+
+from modelo_predicao import SEM_VERSAO, Predicao, carregar_motor, processar_fluxo
 
 
 def prever_potencia(corrente_max, corrente_min, corrente_media):
@@ -42,64 +51,65 @@ def prever_potencia(corrente_max, corrente_min, corrente_media):
         Probabilidade de Baixa Potência (0-1)
     prob_alta : float
         Probabilidade de Alta Potência (0-1)
+
+    O resultado é um Predicao: `.versao` traz a versão do modelo que o
+    produziu (None fora do registro).
     """
-    # Carregar modelo
-    modelo = joblib.load("modelo_svm_potencia.sav")
-
-    # Calcular atributos derivados
-    amplitude = corrente_max - corrente_min
-    razao = corrente_max / (corrente_media + 1e-6)
-
-    # Criar DataFrame com ordem correta das colunas
-    entrada = pd.DataFrame(
-        [[corrente_max, corrente_min, corrente_media, amplitude, razao]],
-        columns=[
-            "corrente_max_A",
-            "corrente_min_A",
-            "corrente_media_A",
-            "amplitude_corrente",
-            "razao_max_media",
-        ],
+    # Carregar motor de inferência (reaproveitado entre chamadas no mesmo
+    # processo); não importa pandas nem sklearn
+    motor = carregar_motor()
+
+    # Predição (atributos derivados calculados pelo motor)
+    return Predicao(
+        motor.prever(float(corrente_max), float(corrente_min), float(corrente_media)),
+        motor.versao_modelo,
     )
 
-    # Predição
-    classe = int(modelo.predict(entrada)[0])
-    probabilidades = modelo.predict_proba(entrada)[0]
-
-    prob_baixa = float(probabilidades[0])
-    prob_alta = float(probabilidades[1])
-
-    return classe, prob_baixa, prob_alta
-
 
 def main():
     """Função principal para uso via linha de comando."""
 
+    argumentos = [a for a in sys.argv[1:] if a != "--versao"]
+    com_versao = len(argumentos) != len(sys.argv) - 1
+
+    # Modo contínuo: um registro por linha na entrada padrão
+    if argumentos == ["--stream"]:
+        try:
+            processar_fluxo(com_versao=com_versao)
+        except FileNotFoundError:
+            print("ERRO: Arquivo 'modelo_svm_potencia.sav' não encontrado!")
+            sys.exit(1)
+        return
+
     # Verificar argumentos
-    if len(sys.argv) != 4:
+    if len(argumentos) != 3:
         print("ERRO: Número incorreto de argumentos!")
         print("\nUso:")
-        print("  python usar_modelo.py <corrente_max> <corrente_min> <corrente_media>")
+        print("  python usar_modelo.py [--versao] <corrente_max> <corrente_min> <corrente_media>")
+        print("  python usar_modelo.py --stream [--versao]   (registros max,min,media via stdin)")
         print("\nExemplo:")
         print("  python usar_modelo.py 1.80 -0.03 0.67")
         sys.exit(1)
 
     try:
         # Ler argumentos
-        corrente_max = float(sys.argv[1])
-        corrente_min = float(sys.argv[2])
-        corrente_media = float(sys.argv[3])
+        corrente_max = float(argumentos[0])
+        corrente_min = float(argumentos[1])
+        corrente_media = float(argumentos[2])
 
         # Fazer predição
-        classe, prob_baixa, prob_alta = prever_potencia(
-            corrente_max, corrente_min, corrente_media
-        )
+        predicao = prever_potencia(corrente_max, corrente_min, corrente_media)
+        classe, prob_baixa, prob_alta = predicao
 
         # Saída formatada para LabVIEW
-        # Formato: CLASSE|PROB_BAIXA|PROB_ALTA|NOME_CLASSE
+        # Formato: CLASSE|PROB_BAIXA|PROB_ALTA|NOME_CLASSE[|VERSAO]
         nome_classe = "Baixa Potência" if classe == 0 else "Alta Potência"
+        linha = f"{classe}|{prob_baixa:.6f}|{prob_alta:.6f}|{nome_classe}"
+        if com_versao:
+            # Versão do motor que fez esta predição, não uma nova consulta
+            linha += "|{}".format(predicao.versao or SEM_VERSAO)
 
-        print(f"{classe}|{prob_baixa:.6f}|{prob_alta:.6f}|{nome_classe}")
+        print(linha)
 
     except FileNotFoundError:
         print("ERRO: Arquivo 'modelo_svm_potencia.sav' não encontrado!")